@@ -1,21 +1,71 @@
 import os
 from datetime import timedelta
 
-from flask import Flask, session
+from flask import Flask, request, session
 from flask_sslify import SSLify
 from dotenv import load_dotenv
 
 from i18n.i18n import I18n
+from lib.assets import AssetManifest
+from lib.compression import CompressionMiddleware, \
+                            COMPRESSION_MIN_SIZE, \
+                            COMPRESSION_GZIP_LEVEL, \
+                            COMPRESSION_BROTLI_QUALITY, \
+                            COMPRESSION_MIMETYPES
 from lib.entry_state import should_show_entry_state
-from lib.markdown import markdown
+from lib.metrics import configure_metrics
+from lib.sessions import configure_session_store, \
+                         SESSION_STORE_PATH, \
+                         SESSION_STORE_MAX_SIZE
+from lib.templates import configure_template_cache, TEMPLATE_CACHE_DIRECTORY
+from lib.markdown import markdown, \
+                         configure_markdown_engine, \
+                         configure_markdown_cache, \
+                         DEFAULT_ENGINE, \
+                         MARKDOWN_CACHE, \
+                         MARKDOWN_CACHE_MAX_SIZE, \
+                         MARKDOWN_CACHE_MAX_BYTES
 
 from routes.base import before_request, format_meta_title, parameterized_url
 from routes.errors import pretty_json, wrap_errors
+from routes.page_cache import configure_page_cache, \
+                              PAGE_CACHE, \
+                              PAGE_CACHE_TTL, \
+                              PAGE_CACHE_MAX_SIZE, \
+                              PAGE_CACHE_MAX_BYTES
 
+from routes.assets import assets
+from routes.ready import ready
+from routes.metrics import metrics
 from routes.index import index
 from routes.courses import courses
 from routes.imprint import imprint
 from routes.settings import settings
+from routes.webhooks import webhooks
+from services.contentful import Contentful, \
+                                METADATA_CACHE, \
+                                INDEX_CACHE, \
+                                VALIDATION_CACHE, \
+                                REVISION_INDEX, \
+                                METADATA_CACHE_TTL, \
+                                METADATA_CACHE_MAX_SIZE, \
+                                INDEX_TTL, \
+                                INDEX_MAX_SIZE, \
+                                INDEX_MAX_STALE, \
+                                POOL_MAX_SIZE, \
+                                POOL_IDLE_TIMEOUT, \
+                                POOL_CONNECTIONS, \
+                                VALIDATION_TTL, \
+                                VALIDATION_ERROR_TTL, \
+                                VALIDATION_CACHE_MAX_SIZE
+from services.mirror import SYNC_INTERVAL
+from services.revisions import REVISION_INDEX_TTL, REVISION_INDEX_MAX_SIZE
+from services.upstream import configure_upstream_budget, \
+                             parse_budgets, \
+                             UPSTREAM_CALL_BUDGET
+from services.concurrency import configure_concurrency, \
+                                 UPSTREAM_WORKERS, \
+                                 UPSTREAM_TIMEOUT
 
 
 DEFAULT_PORT = 3000
@@ -49,17 +99,170 @@ app.config['REMEMBER_COOKIE_HTTPONLY'] = True
 # Set session timeout to 2 days
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=2)
 
+# Keep sessions on the server, the cookie only holding their ID
+configure_session_store(
+    app,
+    store=os.environ.get('SESSION_STORE', 'cookie'),
+    path=os.environ.get('SESSION_STORE_PATH', SESSION_STORE_PATH),
+    max_size=int(os.environ.get(
+        'SESSION_STORE_MAX_SIZE',
+        SESSION_STORE_MAX_SIZE
+    ))
+)
+
 
 # Make session cookie-based
 def set_session_permanency():
-    session.permanent = True
+    # Fingerprinted assets are cached publicly and must not set cookies,
+    # neither do load balancer readiness checks and metric scrapes
+    # need a session.
+    if request.blueprint in ['assets', 'ready', 'metrics']:
+        return
+    if request.endpoint == 'static':
+        return
+    # Setting it again would mark the session modified,
+    # and store it on every request.
+    if not session.permanent:
+        session.permanent = True
+
+
+# Configure Contentful locales and space metadata caching
+Contentful.configure_metadata_cache(
+    ttl=int(os.environ.get(
+        'CONTENTFUL_METADATA_CACHE_TTL',
+        METADATA_CACHE_TTL
+    )),
+    max_size=int(os.environ.get(
+        'CONTENTFUL_METADATA_CACHE_MAX_SIZE',
+        METADATA_CACHE_MAX_SIZE
+    ))
+)
+
+# Configure course, category and landing page slug indexes
+Contentful.configure_index(
+    ttl=int(os.environ.get('CONTENTFUL_INDEX_TTL', INDEX_TTL)),
+    max_size=int(os.environ.get('CONTENTFUL_INDEX_MAX_SIZE', INDEX_MAX_SIZE)),
+    max_stale=int(os.environ.get(
+        'CONTENTFUL_INDEX_MAX_STALE',
+        INDEX_MAX_STALE
+    ))
+)
+
+# Configure the published revisions used for draft and pending changes states
+Contentful.configure_revision_index(
+    ttl=int(os.environ.get(
+        'CONTENTFUL_REVISION_INDEX_TTL',
+        REVISION_INDEX_TTL
+    )),
+    max_size=int(os.environ.get(
+        'CONTENTFUL_REVISION_INDEX_MAX_SIZE',
+        REVISION_INDEX_MAX_SIZE
+    ))
+)
+
+# Configure the pool of Contentful services, kept per credentials
+Contentful.configure_pool(
+    max_size=int(os.environ.get('CONTENTFUL_POOL_MAX_SIZE', POOL_MAX_SIZE)),
+    idle_timeout=int(os.environ.get(
+        'CONTENTFUL_POOL_IDLE_TIMEOUT',
+        POOL_IDLE_TIMEOUT
+    )),
+    connections=int(os.environ.get(
+        'CONTENTFUL_POOL_CONNECTIONS',
+        POOL_CONNECTIONS
+    ))
+)
+
+# Configure caching of credential validations
+Contentful.configure_validation_cache(
+    ttl=int(os.environ.get('CONTENTFUL_VALIDATION_TTL', VALIDATION_TTL)),
+    error_ttl=int(os.environ.get(
+        'CONTENTFUL_VALIDATION_ERROR_TTL',
+        VALIDATION_ERROR_TTL
+    )),
+    max_size=int(os.environ.get(
+        'CONTENTFUL_VALIDATION_CACHE_MAX_SIZE',
+        VALIDATION_CACHE_MAX_SIZE
+    ))
+)
+
+# Configure concurrent Contentful queries within a request
+configure_concurrency(
+    max_workers=int(os.environ.get(
+        'CONTENTFUL_CONCURRENCY',
+        os.environ.get('GUNICORN_THREADS', UPSTREAM_WORKERS)
+    )),
+    timeout=float(os.environ.get('CONTENTFUL_TIMEOUT', UPSTREAM_TIMEOUT))
+)
 
+# Serve entries from Sync API mirrors instead of querying the APIs
+Contentful.configure_mirror(
+    enabled=os.environ.get('CONTENTFUL_MIRROR', 'disabled') == 'enabled',
+    sync_interval=int(os.environ.get(
+        'CONTENTFUL_MIRROR_SYNC_INTERVAL',
+        SYNC_INTERVAL
+    ))
+)
+
+# Drop cached content on Contentful webhooks carrying this secret
+app.config['CONTENTFUL_WEBHOOK_SECRET'] = os.environ.get(
+    'CONTENTFUL_WEBHOOK_SECRET',
+    None
+)
+
+# Serve rendered pages from memory until their content changes
+configure_page_cache(
+    enabled=os.environ.get('PAGE_CACHE', 'disabled') == 'enabled',
+    ttl=int(os.environ.get('PAGE_CACHE_TTL', PAGE_CACHE_TTL)),
+    max_size=int(os.environ.get('PAGE_CACHE_MAX_SIZE', PAGE_CACHE_MAX_SIZE)),
+    max_bytes=int(os.environ.get('PAGE_CACHE_MAX_BYTES', PAGE_CACHE_MAX_BYTES))
+)
 
 # Register Markdown engine
+configure_markdown_engine(os.environ.get('MARKDOWN_ENGINE', DEFAULT_ENGINE))
+configure_markdown_cache(
+    max_size=int(os.environ.get(
+        'MARKDOWN_CACHE_MAX_SIZE',
+        MARKDOWN_CACHE_MAX_SIZE
+    )),
+    max_bytes=int(os.environ.get(
+        'MARKDOWN_CACHE_MAX_BYTES',
+        MARKDOWN_CACHE_MAX_BYTES
+    ))
+)
 app.add_template_filter(markdown)
 
+# Link static files to their content hashed copies, if built
+app.url_defaults(AssetManifest.load(STATIC_FOLDER_PATH).url_defaults)
+
+# Time requests and their phases, before any other request hook runs
+configure_metrics(
+    app,
+    enabled=os.environ.get('METRICS', 'disabled') == 'enabled',
+    caches={
+        'page': PAGE_CACHE,
+        'markdown': MARKDOWN_CACHE,
+        'metadata': METADATA_CACHE,
+        'index': INDEX_CACHE,
+        'validation': VALIDATION_CACHE,
+        'revisions': REVISION_INDEX.cache
+    }
+)
+
+# Count Contentful queries per request, reporting budget overruns,
+# repeated queries and N+1 patterns, by default only in development
+configure_upstream_budget(
+    app,
+    mode=os.environ.get(
+        'UPSTREAM_BUDGET',
+        'warn' if app.debug else 'disabled'
+    ),
+    default=int(os.environ.get('UPSTREAM_CALL_BUDGET', UPSTREAM_CALL_BUDGET)),
+    routes=parse_budgets(os.environ.get('UPSTREAM_CALL_BUDGETS', ''))
+)
+
 # Register HTTPS Extension
-SSLify(app)
+SSLify(app, skips=['ready', 'metrics'])
 app.config['PREFERRED_URL_SCHEME'] = 'https'
 
 # Register I18n engine
@@ -70,10 +273,20 @@ app.before_request(set_session_permanency)
 app.before_request(before_request)
 
 # Request Route Middleware
+app.register_blueprint(assets)
+app.register_blueprint(ready)
+app.register_blueprint(metrics)
 app.register_blueprint(index)
 app.register_blueprint(courses)
 app.register_blueprint(imprint)
 app.register_blueprint(settings)
+app.register_blueprint(webhooks)
+
+# Load compiled templates from the bytecode cache, if built
+configure_template_cache(
+    app,
+    os.environ.get('TEMPLATE_CACHE_DIRECTORY', TEMPLATE_CACHE_DIRECTORY)
+)
 
 # Register Helpers
 app.add_template_global(format_meta_title)
@@ -81,6 +294,28 @@ app.add_template_global(parameterized_url)
 app.add_template_global(should_show_entry_state)
 app.add_template_filter(pretty_json)
 
+# Compress responses for clients accepting it
+if os.environ.get('COMPRESSION', 'enabled') == 'enabled':
+    app.wsgi_app = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=int(os.environ.get(
+            'COMPRESSION_MIN_SIZE',
+            COMPRESSION_MIN_SIZE
+        )),
+        mimetypes=os.environ.get(
+            'COMPRESSION_MIMETYPES',
+            ','.join(COMPRESSION_MIMETYPES)
+        ).split(','),
+        gzip_level=int(os.environ.get(
+            'COMPRESSION_GZIP_LEVEL',
+            COMPRESSION_GZIP_LEVEL
+        )),
+        brotli_quality=int(os.environ.get(
+            'COMPRESSION_BROTLI_QUALITY',
+            COMPRESSION_BROTLI_QUALITY
+        ))
+    )
+
 # Generic error handlers
 @app.errorhandler(404)
 @wrap_errors
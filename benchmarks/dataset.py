@@ -0,0 +1,255 @@
+"""Datasets served by the Contentful stand-in of the route benchmarks,
+in the Sync API format: entries and assets with fields for every locale.
+Either built, shaped like the example app space, or recorded from a
+live space.
+
+Usage:
+
+    python -m benchmarks.dataset recorded.json
+"""
+
+import io
+import json
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from benchmarks.markdown_engines import load_corpus
+
+
+LOCALES = [('en-US', None), ('de-DE', 'en-US')]
+CATEGORIES = 3
+COURSES = 6
+LESSONS_PER_COURSE = 4
+
+
+def link(link_id, link_type='Entry'):
+    return {'sys': {'type': 'Link', 'linkType': link_type, 'id': link_id}}
+
+
+def localized(value, translated=None):
+    """Returns field values for every locale, German ones being optional."""
+
+    values = {'en-US': value}
+    if translated is not None:
+        values['de-DE'] = translated
+    return values
+
+
+def entry(entry_id, content_type, fields, created_at):
+    return {
+        'sys': {
+            'id': entry_id,
+            'type': 'Entry',
+            'revision': 1,
+            'createdAt': created_at,
+            'updatedAt': created_at,
+            'contentType': link(content_type, 'ContentType')
+        },
+        'fields': fields
+    }
+
+
+def asset(asset_id, title, created_at):
+    return {
+        'sys': {
+            'id': asset_id,
+            'type': 'Asset',
+            'revision': 1,
+            'createdAt': created_at,
+            'updatedAt': created_at
+        },
+        'fields': {
+            'title': localized(title),
+            'file': localized({
+                'url': '//images.ctfassets.net/benchmark/{0}.png'.format(
+                    asset_id
+                ),
+                'fileName': '{0}.png'.format(asset_id),
+                'contentType': 'image/png',
+                'details': {
+                    'size': 1024,
+                    'image': {'width': 800, 'height': 600}
+                }
+            })
+        }
+    }
+
+
+def build_dataset():
+    """Returns the space, its locales and every entry and asset."""
+
+    corpus = load_corpus()
+    items = []
+
+    def created_at(index):
+        return '2017-12-{0:02d}T00:00:00.000Z'.format(1 + index % 28)
+
+    for index in range(COURSES + 1):
+        items.append(asset(
+            'image-{0}'.format(index),
+            'Image {0}'.format(index),
+            created_at(index)
+        ))
+
+    for index in range(CATEGORIES):
+        items.append(entry('category-{0}'.format(index), 'category', {
+            'title': localized(
+                'Category {0}'.format(index),
+                'Kategorie {0}'.format(index)
+            ),
+            'slug': localized('category-{0}'.format(index))
+        }, created_at(index)))
+
+    for course_index in range(COURSES):
+        lesson_ids = []
+        for lesson_index in range(LESSONS_PER_COURSE):
+            lesson_id = 'lesson-{0}-{1}'.format(course_index, lesson_index)
+            lesson_ids.append(lesson_id)
+            module_ids = [
+                lesson_id + '-copy',
+                lesson_id + '-image',
+                lesson_id + '-snippets'
+            ]
+            items.append(entry(module_ids[0], 'lessonCopy', {
+                'title': localized('Copy'),
+                'copy': localized(corpus[lesson_index % len(corpus)])
+            }, created_at(lesson_index)))
+            items.append(entry(module_ids[1], 'lessonImage', {
+                'title': localized('Image'),
+                'image': localized(
+                    link('image-{0}'.format(course_index), 'Asset')
+                ),
+                'caption': localized('Caption {0}'.format(lesson_index))
+            }, created_at(lesson_index)))
+            items.append(entry(module_ids[2], 'lessonCodeSnippets', {
+                'title': localized('Snippets'),
+                'curl': localized(
+                    'curl https://cdn.contentful.com/spaces/benchmark/entries'
+                ),
+                'javascript': localized(
+                    "client.getEntries().then(console.log)"
+                ),
+                'python': localized("client.entries()"),
+                'ruby': localized("client.entries")
+            }, created_at(lesson_index)))
+            items.append(entry(lesson_id, 'lesson', {
+                'title': localized(
+                    'Lesson {0}'.format(lesson_index),
+                    'Lektion {0}'.format(lesson_index)
+                ),
+                'slug': localized('lesson-{0}'.format(lesson_index)),
+                'modules': localized([
+                    link(module_id) for module_id in module_ids
+                ])
+            }, created_at(lesson_index)))
+
+        items.append(entry('course-{0}'.format(course_index), 'course', {
+            'title': localized(
+                'Course {0}'.format(course_index),
+                'Kurs {0}'.format(course_index)
+            ),
+            'slug': localized('course-{0}'.format(course_index)),
+            'image': localized(
+                link('image-{0}'.format(course_index), 'Asset')
+            ),
+            'shortDescription': localized(corpus[0]),
+            'description': localized(corpus[course_index % len(corpus)]),
+            'duration': localized(30 + course_index),
+            'skillLevel': localized('beginner'),
+            'lessons': localized([
+                link(lesson_id) for lesson_id in lesson_ids
+            ]),
+            'categories': localized([
+                link('category-{0}'.format(course_index % CATEGORIES))
+            ])
+        }, created_at(course_index)))
+
+    items.append(entry('home-hero', 'layoutHeroImage', {
+        'title': localized('Hero'),
+        'headline': localized('Learn Contentful', 'Contentful lernen'),
+        'backgroundImage': localized(
+            link('image-{0}'.format(COURSES), 'Asset')
+        )
+    }, created_at(0)))
+    items.append(entry('home-copy', 'layoutCopy', {
+        'title': localized('Copy'),
+        'headline': localized('Getting started'),
+        'copy': localized(corpus[1 % len(corpus)]),
+        'ctaTitle': localized('View courses'),
+        'ctaLink': localized('/courses'),
+        'visualStyle': localized('Emphasized')
+    }, created_at(0)))
+    items.append(entry('home-highlighted', 'layoutHighlightedCourse', {
+        'title': localized('Highlighted course'),
+        'course': localized(link('course-0'))
+    }, created_at(0)))
+    items.append(entry('home', 'layout', {
+        'title': localized('Home'),
+        'slug': localized('home'),
+        'contentModules': localized([
+            link('home-hero'),
+            link('home-copy'),
+            link('home-highlighted')
+        ])
+    }, created_at(0)))
+
+    return {
+        'space': {
+            'sys': {'type': 'Space', 'id': None},
+            'name': 'Benchmark space'
+        },
+        'locales': LOCALES,
+        'items': items
+    }
+
+
+def load_dataset(dataset_path=None):
+    """Returns the dataset recorded at dataset_path, or the built one."""
+
+    if dataset_path is None:
+        return build_dataset()
+    with io.open(dataset_path, encoding='utf-8') as dataset_file:
+        return json.load(dataset_file)
+
+
+def record_dataset(client):
+    """Returns the dataset of a live space, through an initial sync."""
+
+    items = []
+    page = client.sync({'initial': True})
+    items.extend(item.raw for item in page.items)
+    while page.next_page_url:
+        page = page.next(client)
+        items.extend(item.raw for item in page.items)
+
+    return {
+        'space': client.space().raw,
+        'locales': [
+            (locale.code, locale.fallback_code)
+            for locale in sorted(
+                client.locales(),
+                key=lambda locale: not locale.default
+            )
+        ],
+        'items': items
+    }
+
+
+if __name__ == '__main__':
+    from services.contentful import Contentful
+
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+    client = Contentful.create_client(
+        os.environ['CONTENTFUL_SPACE_ID'],
+        os.environ['CONTENTFUL_DELIVERY_TOKEN'],
+        host=os.environ.get('CONTENTFUL_HOST', None)
+    )
+    with io.open(sys.argv[1], 'w', encoding='utf-8') as dataset_file:
+        json.dump(
+            record_dataset(client),
+            dataset_file,
+            indent=2,
+            sort_keys=True
+        )
@@ -0,0 +1,80 @@
+"""Measures markdown engine throughput on the tests/fixtures/markdown corpus.
+
+Usage:
+
+    python -m benchmarks.markdown_engines [--iterations 200]
+"""
+
+import argparse
+import io
+import time
+from glob import glob
+from os import path
+
+from lib.markdown import ENGINES
+
+
+CORPUS_PATH = path.join(
+    path.dirname(__file__), '..', 'tests', 'fixtures', 'markdown'
+)
+
+
+def load_corpus():
+    """Returns the markdown source of every corpus document."""
+
+    documents = []
+    for source_path in sorted(glob(path.join(CORPUS_PATH, '*.md'))):
+        with io.open(source_path, encoding='utf-8') as source:
+            documents.append(source.read())
+    return documents
+
+
+def measure(engine, documents, iterations):
+    """Renders all documents iterations times, bypassing the filter cache.
+
+    :return: Tuple of documents per second and source megabytes per second.
+    """
+
+    size = sum(len(document.encode('utf-8')) for document in documents)
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        for document in documents:
+            engine.render(document)
+    elapsed = time.perf_counter() - started_at
+
+    return (
+        len(documents) * iterations / elapsed,
+        size * iterations / elapsed / 1024 / 1024
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    documents = load_corpus()
+    print('{0} documents, {1} iterations'.format(
+        len(documents),
+        args.iterations
+    ))
+
+    baseline = None
+    for name in sorted(ENGINES):
+        documents_per_second, megabytes_per_second = measure(
+            ENGINES[name](),
+            documents,
+            args.iterations
+        )
+        if baseline is None:
+            baseline = documents_per_second
+        print('{0:<12} {1:>10.0f} docs/s {2:>8.2f} MB/s {3:>7.1f}x'.format(
+            name,
+            documents_per_second,
+            megabytes_per_second,
+            documents_per_second / baseline
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,398 @@
+"""Replays a JSONL log of requests against the app, in-process through
+the test client or over HTTP against a running server, and reports
+throughput, latency percentiles per route and Contentful requests per
+request.
+
+Every line of the log is a request:
+
+    {"method": "GET", "path": "/courses", "query": {"locale": "de-DE"},
+     "session": {"space_id": "...", "delivery_token": "..."},
+     "timestamp": 1514764800.5}
+
+Only `path` is required. The session is signed with `SESSION_SECRET`,
+so over HTTP the server must share it. Timestamps are in seconds, and
+requests are sent as far apart as logged, divided by `--speed`.
+Contentful requests are only counted in-process, per request including
+those of upstream worker threads. Queries no request made, like
+background index refreshes, are reported as background calls.
+
+Usage:
+
+    python -m benchmarks.replay traffic.jsonl [--url http://localhost:3000]
+                                [--concurrency 8] [--speed 1]
+                                [--standin] [--dataset recorded.json]
+                                [--output results.json]
+"""
+
+import argparse
+import io
+import json
+import logging
+import sys
+import threading
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask.sessions import SecureCookieSessionInterface
+from werkzeug.exceptions import HTTPException
+
+from benchmarks.routes import BASE_URL, percentile
+from services.contentful import KeepAliveClient
+from services.upstream import UpstreamRecorder, set_current_recorder
+
+
+DEFAULT_CONCURRENCY = 8
+# Replays at the logged pace, 0 sends every request right away.
+DEFAULT_SPEED = 1.0
+
+Record = namedtuple(
+    'Record',
+    ['method', 'path', 'query', 'session', 'timestamp']
+)
+Result = namedtuple('Result', ['route', 'status', 'milliseconds', 'calls'])
+
+log = logging.getLogger(__name__)
+_upstream = {'calls': 0}
+_upstream_lock = threading.Lock()
+
+
+def load_log(lines):
+    """Returns the records of a JSONL request log, skipping blank lines.
+
+    :param lines: Iterable of JSON lines.
+    :return: List of Record.
+    """
+
+    records = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        data = json.loads(line)
+        records.append(Record(
+            data.get('method', 'GET').upper(),
+            data['path'],
+            data.get('query') or {},
+            data.get('session') or {},
+            data.get('timestamp', None)
+        ))
+    return records
+
+
+def count_upstream_calls():
+    """Counts the requests sent to Contentful from any thread,
+    read with `upstream_calls`.
+    """
+
+    original = KeepAliveClient._http_get
+    if getattr(original, 'counted', False):
+        return
+
+    def _http_get(self, url, query):
+        with _upstream_lock:
+            _upstream['calls'] += 1
+        return original(self, url, query)
+
+    _http_get.counted = True
+    KeepAliveClient._http_get = _http_get
+
+
+def upstream_calls():
+    with _upstream_lock:
+        return _upstream['calls']
+
+
+def session_cookie(app, session):
+    """Returns a Cookie header value holding the session, signed like
+    the app signs cookie sessions, or None for empty sessions.
+    Server side session stores take these over.
+    """
+
+    if not session:
+        return None
+    serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+    value = serializer.dumps(dict(session))
+    return '{0}={1}'.format(app.session_cookie_name, value)
+
+
+def route_for(app):
+    """Returns a function mapping records to their URL rule,
+    or their path when no rule matches.
+    """
+
+    adapter = app.url_map.bind('localhost')
+
+    def route(record):
+        try:
+            rule, _ = adapter.match(
+                record.path,
+                method=record.method,
+                return_rule=True
+            )
+        except HTTPException:
+            return record.path
+        return rule.rule
+
+    return route
+
+
+def in_process_sender(app):
+    """Returns a function sending records through the app test client."""
+
+    # Without cookies, only the logged session is sent.
+    client = app.test_client(use_cookies=False)
+
+    def send(record):
+        cookie = session_cookie(app, record.session)
+        response = client.open(
+            record.path,
+            method=record.method,
+            query_string=record.query,
+            headers={'Cookie': cookie} if cookie else {},
+            base_url=BASE_URL
+        )
+        return response.status_code
+
+    return send
+
+
+def http_sender(app, base_url):
+    """Returns a function sending records to a running server,
+    with a connection pool per thread.
+    """
+
+    local = threading.local()
+
+    def send(record):
+        if getattr(local, 'session', None) is None:
+            local.session = requests.Session()
+        cookie = session_cookie(app, record.session)
+        response = local.session.request(
+            record.method,
+            base_url.rstrip('/') + record.path,
+            params=record.query,
+            headers={'Cookie': cookie} if cookie else {},
+            allow_redirects=False
+        )
+        return response.status_code
+
+    return send
+
+
+def replay(records, send, route=None, concurrency=DEFAULT_CONCURRENCY,
+           speed=DEFAULT_SPEED, count_calls=False):
+    """Sends every record, keeping their logged spacing divided by speed.
+
+    :param records: List of Record.
+    :param send: Function sending a record, returning the status code.
+    :param route: (optional) Function returning the route of a record,
+                  defaults to its path.
+    :param concurrency: Maximum amount of requests in flight.
+    :param speed: Time compression factor, 0 sends without waiting.
+    :param count_calls: Whether to count the Contentful queries of each
+                        request, only when sent in-process. With
+                        `count_upstream_calls`, queries made outside of
+                        requests are counted as well.
+    :return: Summary, see `summarize`.
+    """
+
+    route = route or (lambda record: record.path)
+    counted_total = count_calls and getattr(
+        KeepAliveClient._http_get,
+        'counted',
+        False
+    )
+    calls_before = upstream_calls()
+    results = []
+    lock = threading.Lock()
+
+    def play(record, record_route):
+        # Upstream worker threads record into the recorder of the request.
+        recorder = UpstreamRecorder() if count_calls else None
+        set_current_recorder(recorder)
+        started_at = time.perf_counter()
+        try:
+            status = send(record)
+        except Exception:
+            log.exception('Replay of %s failed', record.path)
+            status = None
+        finally:
+            set_current_recorder(None)
+        result = Result(
+            record_route,
+            status,
+            (time.perf_counter() - started_at) * 1000,
+            None if recorder is None else len(recorder.calls)
+        )
+        with lock:
+            results.append(result)
+
+    timestamps = [
+        record.timestamp for record in records
+        if record.timestamp is not None
+    ]
+    first_timestamp = min(timestamps) if timestamps else None
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for record in records:
+            if speed and record.timestamp is not None:
+                due = (record.timestamp - first_timestamp) / speed
+                delay = due - (time.perf_counter() - started_at)
+                if delay > 0:
+                    time.sleep(delay)
+            executor.submit(play, record, route(record))
+
+    background_calls = None
+    if counted_total:
+        request_calls = sum(result.calls for result in results)
+        background_calls = upstream_calls() - calls_before - request_calls
+    return summarize(
+        results,
+        time.perf_counter() - started_at,
+        background_calls
+    )
+
+
+def summarize(results, seconds, background_calls=None):
+    """Returns throughput and errors overall, with latency percentiles,
+    errors and mean Contentful requests per route, when counted.
+
+    :param results: List of Result.
+    :param seconds: Duration of the replay.
+    :param background_calls: (optional) Contentful requests made outside
+                             of replayed requests.
+    """
+
+    def is_error(result):
+        return result.status is None or result.status >= 500
+
+    by_route = defaultdict(list)
+    for result in results:
+        by_route[result.route].append(result)
+
+    routes = {}
+    for route, route_results in sorted(by_route.items()):
+        samples = [result.milliseconds for result in route_results]
+        counted = [
+            result.calls for result in route_results
+            if result.calls is not None
+        ]
+        counted = counted if len(counted) == len(route_results) else None
+        routes[route] = {
+            'requests': len(route_results),
+            'errors': len([
+                result for result in route_results if is_error(result)
+            ]),
+            'p50_ms': round(percentile(samples, 0.5), 2),
+            'p90_ms': round(percentile(samples, 0.9), 2),
+            'p99_ms': round(percentile(samples, 0.99), 2),
+            'calls': (
+                None if counted is None
+                else round(sum(counted) / len(counted), 2)
+            )
+        }
+
+    return {
+        'requests': len(results),
+        'errors': len([result for result in results if is_error(result)]),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(results) / seconds, 2) if seconds else None,
+        'background_calls': background_calls,
+        'routes': routes
+    }
+
+
+def report(summary):
+    print('{0} requests in {1}s, {2} per second, {3} errors'.format(
+        summary['requests'],
+        summary['seconds'],
+        summary['throughput'],
+        summary['errors']
+    ))
+    if summary['background_calls'] is not None:
+        print('{0} Contentful requests made in the background'.format(
+            summary['background_calls']
+        ))
+    print('{0:<48} {1:>8} {2:>6} {3:>8} {4:>8} {5:>8} {6:>6}'.format(
+        'route', 'requests', 'errors', 'p50 ms', 'p90 ms', 'p99 ms', 'calls'
+    ))
+    for route, metrics in summary['routes'].items():
+        print((
+            '{0:<48} {1:>8} {2:>6} {3:>8.2f} {4:>8.2f} {5:>8.2f} {6:>6}'
+        ).format(
+            route,
+            metrics['requests'],
+            metrics['errors'],
+            metrics['p50_ms'],
+            metrics['p90_ms'],
+            metrics['p99_ms'],
+            '-' if metrics['calls'] is None else metrics['calls']
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('log', help='JSONL request log')
+    parser.add_argument(
+        '--url',
+        help='Replays over HTTP against this server instead of in-process'
+    )
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--speed', type=float, default=DEFAULT_SPEED)
+    parser.add_argument(
+        '--standin',
+        action='store_true',
+        help='Serves content from a local stand-in'
+    )
+    parser.add_argument(
+        '--dataset',
+        help='Recorded dataset for the stand-in, see benchmarks.dataset'
+    )
+    parser.add_argument(
+        '--output',
+        help='Writes the summary to this JSON file'
+    )
+    args = parser.parse_args()
+
+    with io.open(args.log, encoding='utf-8') as log_file:
+        records = load_log(log_file)
+
+    standin = None
+    if args.standin:
+        from benchmarks.dataset import load_dataset
+        from benchmarks.routes import start_standin
+        standin = start_standin(load_dataset(args.dataset))
+
+    try:
+        from app import app
+        if args.url:
+            send = http_sender(app, args.url)
+        else:
+            count_upstream_calls()
+            send = in_process_sender(app)
+        summary = replay(
+            records,
+            send,
+            route_for(app),
+            args.concurrency,
+            args.speed,
+            count_calls=not args.url
+        )
+    finally:
+        if standin is not None:
+            standin.stop()
+
+    report(summary)
+
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2, sort_keys=True)
+
+    sys.exit(1 if summary['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
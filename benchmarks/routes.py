@@ -0,0 +1,254 @@
+"""Measures every route against a local Contentful stand-in, reporting
+latency percentiles, upstream calls and allocations per route.
+
+Cold measurements start with every cache cleared, warm ones repeat the
+request with caches filled. With a baseline, exits with an error when a
+route got slower, allocates more or queries Contentful more often.
+
+Usage:
+
+    python -m benchmarks.routes [--iterations 50] [--dataset recorded.json]
+                                [--save baseline.json]
+                                [--baseline baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from benchmarks.dataset import load_dataset
+from benchmarks.standin import SpaceStandIn
+from lib.cache import clear_caches
+
+
+DEFAULT_ITERATIONS = 50
+DEFAULT_THRESHOLD = 0.25
+DELIVERY_TOKEN = 'delivery'
+PREVIEW_TOKEN = 'preview'
+# Pages are requested over HTTPS, so SSLify doesn't redirect them.
+BASE_URL = 'https://localhost'
+# Metrics compared against the baseline, and whether the threshold applies.
+# Upstream calls are deterministic, any increase is a regression.
+COMPARED_METRICS = [
+    ('p50_ms', True),
+    ('peak_kb', True),
+    ('calls', False),
+    ('cold_calls', False)
+]
+
+
+def route_paths(dataset):
+    """Returns the path of every route, for the first category,
+    course and lesson of the dataset, on both APIs.
+    """
+
+    items = {item['sys']['id']: item for item in dataset['items']}
+    default_locale = dataset['locales'][0][0]
+
+    def first(content_type):
+        for item in dataset['items']:
+            link = item['sys'].get('contentType', {})
+            if link.get('sys', {}).get('id', None) == content_type:
+                return item
+
+    def slug(item):
+        return item['fields']['slug'][default_locale]
+
+    course = first('course')
+    lesson = items[course['fields']['lessons'][default_locale][0]['sys']['id']]
+    content_paths = [
+        '/',
+        '/courses',
+        '/courses/categories/{0}'.format(slug(first('category'))),
+        '/courses/{0}'.format(slug(course)),
+        '/courses/{0}/lessons/{1}'.format(slug(course), slug(lesson))
+    ]
+
+    return (
+        content_paths +
+        [path + '?api=cpa' for path in content_paths] +
+        ['/settings', '/imprint']
+    )
+
+
+def start_standin(dataset):
+    """Starts the stand-in and points the app configuration and
+    Contentful clients at it. Must run before the app is imported.
+    """
+
+    standin = SpaceStandIn(dataset).start()
+    os.environ.update({
+        'CONTENTFUL_SPACE_ID': standin.space_id,
+        'CONTENTFUL_DELIVERY_TOKEN': DELIVERY_TOKEN,
+        'CONTENTFUL_PREVIEW_TOKEN': PREVIEW_TOKEN
+    })
+    os.environ.pop('CONTENTFUL_HOST', None)
+    os.environ.setdefault('SESSION_SECRET', 'benchmark')
+
+    from services.contentful import Contentful
+
+    def create_client(klass, space_id, access_token, is_preview=False,
+                      host=None):
+        return standin.client(access_token, content_type_cache=True)
+
+    Contentful.create_client = classmethod(create_client)
+    return standin
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[int(round(fraction * (len(ordered) - 1)))]
+
+
+def measure(client, standin, path, iterations):
+    """Requests a path cold, then iterations times warm, then once
+    while tracing allocations.
+
+    :return: Dict of metrics.
+    """
+
+    def get():
+        started_at = time.perf_counter()
+        response = client.get(path, base_url=BASE_URL)
+        elapsed = (time.perf_counter() - started_at) * 1000
+        if response.status_code != 200:
+            raise RuntimeError('{0} answered {1}'.format(
+                path,
+                response.status_code
+            ))
+        return elapsed
+
+    clear_caches()
+    requests_before = len(standin.requests)
+    cold_ms = get()
+    cold_calls = len(standin.requests) - requests_before
+
+    requests_before = len(standin.requests)
+    samples = [get() for _ in range(iterations)]
+    calls = (len(standin.requests) - requests_before) / iterations
+
+    tracemalloc.start()
+    try:
+        get()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'cold_ms': round(cold_ms, 2),
+        'p50_ms': round(percentile(samples, 0.5), 2),
+        'p90_ms': round(percentile(samples, 0.9), 2),
+        'p99_ms': round(percentile(samples, 0.99), 2),
+        'cold_calls': cold_calls,
+        'calls': calls,
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def run(app, standin, paths, iterations=DEFAULT_ITERATIONS):
+    """Measures every path.
+
+    :return: Dict of metrics by path.
+    """
+
+    # Without cookies, every request renders as for a first time visitor.
+    client = app.test_client(use_cookies=False)
+    return {path: measure(client, standin, path, iterations) for path in paths}
+
+
+def regressions(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Returns descriptions of the metrics worse than in the baseline.
+
+    :param results: Dict of metrics by path.
+    :param baseline: Dict of metrics by path, from an earlier run.
+    :param threshold: Tolerated relative increase of latency and allocations.
+    """
+
+    found = []
+    for path, metrics in sorted(results.items()):
+        expected = baseline.get(path, None)
+        if expected is None:
+            continue
+        for metric, relative in COMPARED_METRICS:
+            limit = expected[metric]
+            if relative:
+                limit *= 1 + threshold
+            if metrics[metric] > limit:
+                found.append('{0} {1}: {2} (baseline {3})'.format(
+                    path,
+                    metric,
+                    metrics[metric],
+                    expected[metric]
+                ))
+    return found
+
+
+def report(results):
+    print('{0:<48} {1:>9} {2:>8} {3:>8} {4:>8} {5:>6} {6:>6} {7:>9}'.format(
+        'route', 'cold ms', 'p50 ms', 'p90 ms', 'p99 ms', 'cold', 'calls',
+        'peak KB'
+    ))
+    for path, metrics in results.items():
+        print((
+            '{0:<48} {1:>9.2f} {2:>8.2f} {3:>8.2f} {4:>8.2f} '
+            '{5:>6} {6:>6.1f} {7:>9.1f}'
+        ).format(
+            path,
+            metrics['cold_ms'],
+            metrics['p50_ms'],
+            metrics['p90_ms'],
+            metrics['p99_ms'],
+            metrics['cold_calls'],
+            metrics['calls'],
+            metrics['peak_kb']
+        ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument(
+        '--dataset',
+        help='Recorded dataset, see benchmarks.dataset'
+    )
+    parser.add_argument(
+        '--save',
+        help='Writes the results to this baseline file'
+    )
+    parser.add_argument(
+        '--baseline',
+        help='Fails on regressions against this baseline file'
+    )
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset)
+    standin = start_standin(dataset)
+    try:
+        from app import app
+        results = run(app, standin, route_paths(dataset), args.iterations)
+    finally:
+        standin.stop()
+
+    report(results)
+
+    if args.save:
+        with io.open(args.save, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with io.open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        found = regressions(results, baseline, args.threshold)
+        for regression in found:
+            print('Regression: {0}'.format(regression))
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from services.contentful import KeepAliveClient
+
+
+SPACE_ID = 'standin'
+
+
+class StandInServer(object):
+    """Local HTTP stand-in for the Contentful Delivery and Preview APIs.
+    Serves JSON responses registered per path and query string.
+
+    Usage:
+
+        >>> server = StandInServer()
+        >>> server.respond('/sync', {...}, {'initial': 'true'})
+        >>> server.start()
+        >>> server.client().sync({'initial': True})
+    """
+
+    def __init__(self, space_id=SPACE_ID):
+        self.space_id = space_id
+        self.responses = {}
+        self.requests = []
+        self._server = None
+        self._thread = None
+
+    def respond(self, path, body, query=None):
+        """Registers the JSON body served for a space path and query."""
+
+        key = (path, frozenset((query or {}).items()))
+        self.responses[key] = body
+
+    def response_for(self, path, query):
+        """Returns the registered JSON body for a request or None."""
+
+        prefix = '/spaces/{0}'.format(self.space_id)
+        if not path.startswith(prefix):
+            return None
+        path = path[len(prefix):]
+
+        self.requests.append((path, query))
+        return self.responses.get((path, frozenset(query.items())), None)
+
+    def start(self):
+        self._server = HTTPServer(('127.0.0.1', 0), _handler_for(self))
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def api_url(self):
+        return '127.0.0.1:{0}'.format(self._server.server_port)
+
+    def client(self, access_token='token', **options):
+        """Returns a Contentful client pointing at the stand-in."""
+
+        options.setdefault('content_type_cache', False)
+        return KeepAliveClient(
+            self.space_id,
+            access_token,
+            api_url=self.api_url,
+            https=False,
+            **options
+        )
+
+
+class SpaceStandIn(StandInServer):
+    """Stand-in answering Delivery and Preview API queries from a dataset
+    of entries and assets in the Sync API format, with fields for every
+    locale. Covers the queries of the app: space, locales, content types
+    and entries by content type, slug or IDs, with their includes.
+    Registered responses take precedence.
+
+    :param dataset: Dict with the `space`, its `locales` as
+                    (code, fallback code) pairs, default first,
+                    and its entries and assets as `items`.
+
+    Usage:
+
+        >>> server = SpaceStandIn(build_dataset()).start()
+        >>> server.client().entries({'content_type': 'course', 'include': 6})
+    """
+
+    def __init__(self, dataset, space_id=SPACE_ID):
+        super(SpaceStandIn, self).__init__(space_id)
+        self.dataset = dataset
+        self.items = {item['sys']['id']: item for item in dataset['items']}
+        self.fallbacks = dict(
+            (code, fallback) for code, fallback in dataset['locales']
+        )
+        self.default_locale = dataset['locales'][0][0]
+
+    def response_for(self, path, query):
+        body = super(SpaceStandIn, self).response_for(path, query)
+        prefix = '/spaces/{0}'.format(self.space_id)
+        if body is not None or not path.startswith(prefix):
+            return body
+
+        path = path[len(prefix):]
+        if path == '':
+            space = dict(self.dataset['space'])
+            space['sys'] = dict(space['sys'], id=self.space_id)
+            return space
+        if path == '/environments/master/locales':
+            return raw_locales(*self.dataset['locales'])
+        if path == '/environments/master/content_types':
+            return {
+                'sys': {'type': 'Array'},
+                'total': 0,
+                'skip': 0,
+                'limit': 1000,
+                'items': []
+            }
+        if path == '/environments/master/entries':
+            return self.entries(query)
+        return None
+
+    def entries(self, query):
+        """Returns an entries collection answering the query."""
+
+        locale = query.get('locale', self.default_locale)
+        matches = [
+            item for item in self.dataset['items']
+            if item['sys']['type'] == 'Entry' and
+            self._matches(item, query, locale)
+        ]
+        if query.get('order', None) == '-sys.createdAt':
+            matches.sort(
+                key=lambda item: item['sys']['createdAt'],
+                reverse=True
+            )
+
+        skip = int(query.get('skip', 0))
+        limit = int(query.get('limit', 100))
+        items = [
+            self._localize(item, locale)
+            for item in matches[skip:skip + limit]
+        ]
+
+        includes = {'Entry': [], 'Asset': []}
+        included = set(item['sys']['id'] for item in items)
+        pending = items
+        for _ in range(int(query.get('include', 1))):
+            linked = []
+            for item in pending:
+                for link_id in _link_ids(item['fields']):
+                    if link_id in included or link_id not in self.items:
+                        continue
+                    included.add(link_id)
+                    resource = self._localize(self.items[link_id], locale)
+                    includes[resource['sys']['type']].append(resource)
+                    linked.append(resource)
+            pending = linked
+
+        return {
+            'sys': {'type': 'Array'},
+            'total': len(matches),
+            'skip': skip,
+            'limit': limit,
+            'items': items,
+            'includes': includes
+        }
+
+    def _matches(self, item, query, locale):
+        fields = self._localize(item, locale)['fields']
+        for key, value in query.items():
+            if key == 'content_type':
+                if item['sys']['contentType']['sys']['id'] != value:
+                    return False
+            if key == 'sys.id' and item['sys']['id'] != value:
+                return False
+            if key == 'sys.id[in]':
+                if item['sys']['id'] not in value.split(','):
+                    return False
+            if key.startswith('fields.'):
+                if fields.get(key[len('fields.'):], None) != value:
+                    return False
+        return True
+
+    def _localize(self, item, locale):
+        fields = {}
+        for name, values in item.get('fields', {}).items():
+            code = locale
+            while code is not None and code not in values:
+                code = self.fallbacks.get(code, None)
+            if code is not None:
+                fields[name] = values[code]
+        return {
+            'sys': dict(item['sys'], locale=locale),
+            'fields': fields
+        }
+
+
+def _link_ids(fields):
+    for value in fields.values():
+        for candidate in value if isinstance(value, list) else [value]:
+            if not isinstance(candidate, dict):
+                continue
+            if candidate.get('sys', {}).get('type', None) == 'Link':
+                yield candidate['sys']['id']
+
+
+def _handler_for(standin):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            body = standin.response_for(url.path, dict(parse_qsl(url.query)))
+
+            status = 200
+            if body is None:
+                status = 404
+                body = {
+                    'sys': {'type': 'Error', 'id': 'NotFound'},
+                    'message': 'The resource could not be found.'
+                }
+
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def link(link_id, link_type='Entry'):
+    return {'sys': {'type': 'Link', 'linkType': link_type, 'id': link_id}}
+
+
+def raw_entry(entry_id, content_type, fields,
+              created_at='2017-12-14T00:00:00.000Z', revision=1):
+    """Returns a Sync API entry, with fields for every locale."""
+
+    return {
+        'sys': {
+            'id': entry_id,
+            'type': 'Entry',
+            'revision': revision,
+            'createdAt': created_at,
+            'updatedAt': created_at,
+            'contentType': link(content_type, 'ContentType')
+        },
+        'fields': fields
+    }
+
+
+def raw_locales(*locales):
+    """Returns a locales collection, the first locale being the default."""
+
+    return {
+        'sys': {'type': 'Array'},
+        'items': [
+            {
+                'sys': {'id': code, 'type': 'Locale'},
+                'code': code,
+                'name': code,
+                'default': index == 0,
+                'fallbackCode': fallback_code
+            } for index, (code, fallback_code) in enumerate(locales)
+        ]
+    }
+
+
+def sync_page(standin, items, next_token, next_page=False):
+    """Returns a Sync API page pointing to the next page or sync token."""
+
+    url_key = 'nextPageUrl' if next_page else 'nextSyncUrl'
+    return {
+        'sys': {'type': 'Array'},
+        'items': items,
+        url_key: 'http://{0}/spaces/{1}/sync?sync_token={2}'.format(
+            standin.api_url,
+            standin.space_id,
+            next_token
+        )
+    }
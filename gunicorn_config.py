@@ -0,0 +1,48 @@
+"""Gunicorn configuration, used by the Procfile.
+
+Requests spend most of their time waiting on Contentful, so each worker
+process serves them from a pool of threads instead of one at a time.
+Request state lives in the Flask request context, and shared caches and
+API clients are thread safe, so requests running in threads stay isolated.
+
+Usage:
+
+    $ gunicorn -c gunicorn_config.py app:app
+"""
+
+import os
+
+
+DEFAULT_PORT = 3000
+DEFAULT_WORKERS = 2
+DEFAULT_THREADS = 100
+DEFAULT_TIMEOUT = 30
+DEFAULT_KEEPALIVE = 5
+
+bind = '0.0.0.0:{0}'.format(os.environ.get('PORT', DEFAULT_PORT))
+
+# Heroku sets WEB_CONCURRENCY from the dyno size.
+workers = int(os.environ.get('WEB_CONCURRENCY', DEFAULT_WORKERS))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', DEFAULT_THREADS))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', DEFAULT_TIMEOUT))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', DEFAULT_KEEPALIVE))
+
+# Each worker builds its own API clients and caches, as they are not
+# safe to share across a fork.
+preload_app = False
+
+
+# Workers render every page once before reporting ready on /ready.
+warmup = os.environ.get('WARMUP', 'enabled') == 'enabled'
+
+
+def post_worker_init(worker):
+    # Templates are loaded from the bytecode cache before serving requests.
+    from lib.templates import load_templates
+    load_templates(worker.wsgi)
+
+    if warmup:
+        from lib.warmup import start_warmup
+        start_warmup(worker.wsgi)
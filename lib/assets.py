@@ -0,0 +1,199 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+
+import brotli
+
+
+BUILD_DIRECTORY = 'build'
+MANIFEST_NAME = 'assets-manifest.json'
+HASH_LENGTH = 12
+MIN_COMPRESSED_SIZE = 256
+COMPRESSIBLE_EXTENSIONS = [
+    '.css', '.js', '.json', '.svg', '.ico', '.xml', '.txt', '.xlf', '.strings'
+]
+# Preferred first, when clients accept both equally.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+IMMUTABLE_CACHE_CONTROL = 'public, max-age={0}, immutable'.format(
+    IMMUTABLE_MAX_AGE
+)
+
+CSS_URL_PATTERN = re.compile(r'url\((["\']?)(/[^)"\'?#]+)([^)"\']*)\1\)')
+
+mimetypes.add_type('font/woff', '.woff')
+mimetypes.add_type('font/woff2', '.woff2')
+
+
+def build_assets(static_folder, build_folder=None):
+    """Writes content hashed copies of the static files, gzip and brotli
+    variants of the compressible ones, and a manifest mapping every file
+    to its hashed copy. Stylesheets are rewritten to reference hashed copies.
+
+    :param static_folder: Folder holding the static files.
+    :param build_folder: (optional) Output folder, defaults to
+                         BUILD_DIRECTORY inside the static folder.
+    :return: Manifest dict.
+
+    Usage:
+
+        >>> build_assets('public')
+        {'stylesheets/style.css': 'stylesheets/style.0a1b2c3d4e5f.css', ...}
+    """
+
+    if build_folder is None:
+        build_folder = os.path.join(static_folder, BUILD_DIRECTORY)
+    if os.path.isdir(build_folder):
+        shutil.rmtree(build_folder)
+
+    sources = []
+    for directory, _, filenames in os.walk(static_folder):
+        for filename in filenames:
+            sources.append(os.path.relpath(
+                os.path.join(directory, filename),
+                static_folder
+            ).replace(os.sep, '/'))
+    # Stylesheets last, so the assets they reference are hashed already.
+    sources.sort(key=lambda source: (source.endswith('.css'), source))
+
+    manifest = {}
+    for source in sources:
+        with open(os.path.join(static_folder, source), 'rb') as source_file:
+            content = source_file.read()
+        if source.endswith('.css'):
+            content = rewrite_css_urls(content, manifest)
+
+        hashed = hashed_name(source, content)
+        write_asset(build_folder, hashed, content)
+        manifest[source] = hashed
+
+    with open(os.path.join(build_folder, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    return manifest
+
+
+def hashed_name(source, content):
+    """Returns the path of a file with its content hash before the extension.
+    """
+
+    root, extension = os.path.splitext(source)
+    digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+    return '{0}.{1}{2}'.format(root, digest, extension)
+
+
+def rewrite_css_urls(content, manifest):
+    """Points absolute `url()` references of a stylesheet to hashed copies."""
+
+    def replace(match):
+        quote, url, suffix = match.groups()
+        hashed = manifest.get(url.lstrip('/'), None)
+        if hashed is None:
+            return match.group(0)
+        return 'url({0}/{1}/{2}{3}{0})'.format(
+            quote,
+            BUILD_DIRECTORY,
+            hashed,
+            suffix
+        )
+
+    stylesheet = content.decode('utf-8')
+    return CSS_URL_PATTERN.sub(replace, stylesheet).encode('utf-8')
+
+
+def write_asset(build_folder, name, content):
+    """Writes a file, and its compressed variants when they are smaller."""
+
+    target = os.path.join(build_folder, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as asset:
+        asset.write(content)
+
+    if (
+        os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS or
+        len(content) < MIN_COMPRESSED_SIZE
+    ):
+        return
+
+    variants = {
+        '.gz': gzip.compress(content, compresslevel=9),
+        '.br': brotli.compress(content, quality=11)
+    }
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(content):
+            with open(target + suffix, 'wb') as variant:
+                variant.write(compressed)
+
+
+def precompressed_variant(build_folder, name, accept_encodings):
+    """Returns the encoding and file name of the best precompressed
+    variant the client accepts, or (None, name) if there is none.
+
+    :param build_folder: Folder holding the built assets.
+    :param name: Hashed asset path.
+    :param accept_encodings: Accept object of the request encodings.
+    """
+
+    candidates = [
+        (accept_encodings[encoding], -preference, encoding, name + suffix)
+        for preference, (encoding, suffix) in enumerate(ENCODINGS)
+        if accept_encodings[encoding] > 0
+    ]
+    for _, _, encoding, variant in sorted(candidates, reverse=True):
+        if os.path.isfile(os.path.join(build_folder, variant)):
+            return encoding, variant
+    return None, name
+
+
+class AssetManifest(object):
+    """Maps static files to their content hashed copies,
+    making `url_for('static', ...)` return fingerprinted URLs.
+
+    :param manifest: Dict of original to hashed paths.
+
+    Usage:
+
+        >>> manifest = AssetManifest.load(app.static_folder)
+        >>> app.url_defaults(manifest.url_defaults)
+    """
+
+    def __init__(self, manifest=None):
+        self.manifest = manifest or {}
+
+    @classmethod
+    def load(klass, static_folder):
+        """Loads the built manifest.
+        Returns an empty one if assets were not built.
+        """
+
+        manifest_path = os.path.join(
+            static_folder,
+            BUILD_DIRECTORY,
+            MANIFEST_NAME
+        )
+        if not os.path.isfile(manifest_path):
+            return klass()
+        with open(manifest_path) as manifest_file:
+            return klass(json.load(manifest_file))
+
+    def url_for(self, filename):
+        """Returns the static file name to link to for filename."""
+
+        hashed = self.manifest.get(filename.lstrip('/'), None)
+        if hashed is None:
+            return filename
+        return '{0}/{1}'.format(BUILD_DIRECTORY, hashed)
+
+    def url_defaults(self, endpoint, values):
+        """Flask URL defaults callback, rewriting static file names."""
+
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = self.url_for(values['filename'])
+
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.dirname(__file__), '..', 'public')
+    print('Built {0} assets'.format(len(build_assets(static_folder))))
@@ -0,0 +1,392 @@
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+REFRESH_WORKERS = 4
+
+_MISSING = object()
+
+log = logging.getLogger(__name__)
+
+# Shared by all caches, refreshes are short lived upstream queries.
+_REFRESH_EXECUTOR = ThreadPoolExecutor(max_workers=REFRESH_WORKERS)
+
+# Every cache, so entries can be invalidated by tag wherever they live.
+_REGISTRY = weakref.WeakSet()
+
+
+def invalidate_tags(tags):
+    """Removes entries carrying any of the tags from every cache.
+
+    :param tags: Iterable of tags.
+    :return: Amount of removed entries.
+
+    Usage:
+
+        >>> cache.set('key', 'value', tags=['foo'])
+        >>> invalidate_tags(['foo'])
+        1
+    """
+
+    tags = list(tags)
+    return sum(cache.invalidate_tags(tags) for cache in list(_REGISTRY))
+
+
+def clear_caches():
+    """Removes every entry from every cache, for cold start measurements."""
+
+    for cache in list(_REGISTRY):
+        cache.clear()
+
+
+class _Entry(object):
+    __slots__ = ('value', 'ttl', 'expires_at', 'tags', 'size')
+
+    def __init__(self, value, ttl, expires_at, tags, size):
+        self.value = value
+        self.ttl = ttl
+        self.expires_at = expires_at
+        self.tags = tags
+        self.size = size
+
+
+class LRUCache(object):
+    """Thread-safe, size-bounded LRU cache with per-entry expiry.
+
+    :param max_size: Maximum amount of entries before the least
+                     recently used one gets evicted.
+    :param ttl: Default time to live in seconds, None means no expiry.
+    :param sliding: When True, every hit extends the entry expiry,
+                    turning the time to live into an idle timeout.
+    :param max_bytes: (optional) Maximum total size of the entries,
+                      as measured by size_of.
+    :param size_of: Callable returning the size of a value in bytes.
+    :param max_stale: (optional) Seconds an expired entry is still served
+                      by `fetch` while it is refreshed in the background.
+    :param executor: Executor running background refreshes.
+    :param clock: Callable returning the current time in seconds.
+
+    Usage:
+
+        >>> cache = LRUCache(max_size=2, ttl=60)
+        >>> cache.fetch('key', lambda: 'value')
+        'value'
+        >>> cache.get('key')
+        'value'
+    """
+
+    def __init__(self, max_size=128, ttl=None, sliding=False, max_bytes=None,
+                 size_of=len, max_stale=None, executor=_REFRESH_EXECUTOR,
+                 clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.sliding = sliding
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.max_stale = max_stale
+        self.executor = executor
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.refresh_errors = 0
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._keys_by_tag = {}
+        self._lock = threading.RLock()
+        self._key_locks = {}
+        self._refreshing = set()
+        # Bumped on invalidation, so values computed before are not stored.
+        self._generation = 0
+
+        _REGISTRY.add(self)
+
+    @property
+    def generation(self):
+        """Counter bumped on every invalidation, to pass to `set`
+        when a value is computed outside of `fetch`.
+        """
+
+        return self._generation
+
+    def configure(self, max_size=None, ttl=None, max_bytes=None,
+                  max_stale=None):
+        """Updates cache limits, evicting entries above the new size.
+
+        :param max_size: (optional) New maximum amount of entries.
+        :param ttl: (optional) New default time to live in seconds.
+        :param max_bytes: (optional) New maximum total size of the entries.
+        :param max_stale: (optional) New seconds expired entries are
+                          served for.
+        """
+
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if max_stale is not None:
+                self.max_stale = max_stale
+            self._evict()
+
+    def get(self, key, default=None):
+        """Returns the cached value for key, or default if missing or expired.
+        """
+
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None or self._is_stale(entry):
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            if self.sliding and entry.ttl is not None:
+                entry.expires_at = self.clock() + entry.ttl
+            self.hits += 1
+            return entry.value
+
+    def set(self, key, value, ttl=None, tags=None, generation=None):
+        """Stores value under key. Values larger than the whole cache are not stored.
+
+        :param key: Hashable cache key.
+        :param value: Value to store.
+        :param ttl: (optional) Time to live overriding the cache default.
+        :param tags: (optional) Iterable of tags the entry can be
+                     invalidated by.
+        :param generation: (optional) `generation` read before computing
+                           the value, it is not stored if the cache was
+                           invalidated since.
+        :return: True if the value was stored.
+        """
+
+        if ttl is None:
+            ttl = self.ttl
+        expires_at = None if ttl is None else self.clock() + ttl
+        tags = frozenset(tags or [])
+        size = self.size_of(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+
+            self._discard(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+
+            self._entries[key] = _Entry(value, ttl, expires_at, tags, size)
+            self._bytes += size
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            self._evict()
+            return True
+
+    def fetch(self, key, factory, ttl=None, tags=None):
+        """Returns the cached value for key, or stores the result of factory.
+        Concurrent misses for the same key only call factory once.
+        Exceptions raised by factory are propagated and never cached,
+        neither are values produced while tags were being invalidated.
+
+        With max_stale, expired entries are returned right away and
+        refreshed in the background, keeping the expired value if the
+        refresh fails, until max_stale seconds have passed.
+
+        :param key: Hashable cache key.
+        :param factory: Callable producing the value on a miss.
+        :param ttl: (optional) Time to live overriding the cache default.
+        :param tags: (optional) Iterable of tags, or callable returning
+                     them for the produced value.
+        :return: Cached or freshly produced value.
+        """
+
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is not None and self._is_stale(entry):
+                self.stale_hits += 1
+                self._refresh(key, factory, ttl, tags)
+                return entry.value
+
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        key_lock = self._acquire_key_lock(key)
+        try:
+            with key_lock:
+                with self._lock:
+                    entry = self._live_entry(key)
+                    if entry is not None and not self._is_stale(entry):
+                        return entry.value
+
+                generation = self._generation
+                value = factory()
+                if callable(tags):
+                    tags = tags(value)
+                self.set(key, value, ttl, tags, generation)
+                return value
+        finally:
+            self._release_key_lock(key)
+
+    def is_cached(self, key):
+        """Returns whether `fetch` would serve key without calling its
+        factory. Unlike `in`, expired entries served while they refresh
+        count as cached.
+        """
+
+        with self._lock:
+            return self._live_entry(key) is not None
+
+    def delete(self, key):
+        """Removes key from the cache if present."""
+
+        with self._lock:
+            self._discard(key)
+
+    def invalidate_tags(self, tags):
+        """Removes entries carrying any of the tags.
+
+        :param tags: Iterable of tags.
+        :return: Amount of removed entries.
+        """
+
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                keys.update(self._keys_by_tag.get(tag, ()))
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def values(self):
+        """Returns a snapshot of the live cached values."""
+
+        with self._lock:
+            return [
+                entry.value for entry in self._entries.values()
+                if not self._is_expired(entry)
+            ]
+
+    def clear(self):
+        """Removes all entries and resets the statistics."""
+
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._keys_by_tag.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.stale_hits = 0
+            self.refresh_errors = 0
+
+    def stats(self):
+        """Returns a dict with size, hit, miss and eviction counters."""
+
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'stale_hits': self.stale_hits,
+                'refresh_errors': self.refresh_errors
+            }
+
+    def _live_entry(self, key):
+        entry = self._entries.get(key, None)
+        if entry is not None and self._is_expired(entry):
+            self._discard(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag, None)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _is_expired(self, entry):
+        if entry.expires_at is None:
+            return False
+        return entry.expires_at + (self.max_stale or 0) <= self.clock()
+
+    def _is_stale(self, entry):
+        return (
+            entry.expires_at is not None and
+            entry.expires_at <= self.clock()
+        )
+
+    def _refresh(self, key, factory, ttl, tags):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self.executor.submit(self._refresh_entry, key, factory, ttl, tags)
+
+    def _refresh_entry(self, key, factory, ttl, tags):
+        try:
+            generation = self._generation
+            value = factory()
+            if callable(tags):
+                tags = tags(value)
+            self.set(key, value, ttl, tags, generation)
+        except Exception as e:
+            # Keep serving the stale value until it is too old.
+            with self._lock:
+                self.refresh_errors += 1
+            log.warning('Cache refresh failed: %s', e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_size or
+            (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _acquire_key_lock(self, key):
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = [threading.Lock(), 0]
+            self._key_locks[key][1] += 1
+            return self._key_locks[key][0]
+
+    def _release_key_lock(self, key):
+        with self._lock:
+            self._key_locks[key][1] -= 1
+            if not self._key_locks[key][1]:
+                del self._key_locks[key]
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key, None)
+            return entry is not None and not self._is_stale(entry)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
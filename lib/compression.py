@@ -0,0 +1,185 @@
+import zlib
+
+import brotli
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+
+
+COMPRESSION_MIN_SIZE = 500
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4
+COMPRESSION_MIMETYPES = [
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/xml',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml'
+]
+
+
+class GzipCompressor(object):
+    """Incremental gzip compressor, flushing after every chunk."""
+
+    def __init__(self, level=COMPRESSION_GZIP_LEVEL):
+        self._compressor = zlib.compressobj(
+            level,
+            zlib.DEFLATED,
+            16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data):
+        return (
+            self._compressor.compress(data) +
+            self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        )
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor(object):
+    """Incremental brotli compressor, flushing after every chunk."""
+
+    def __init__(self, quality=COMPRESSION_BROTLI_QUALITY):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware(object):
+    """WSGI middleware compressing responses with brotli or gzip,
+    as negotiated through `Accept-Encoding`. Bodies are compressed chunk
+    by chunk, so streamed responses keep streaming.
+
+    :param app: WSGI application to wrap.
+    :param min_size: Responses with a smaller `Content-Length` are sent as is.
+    :param mimetypes: Content types to compress.
+    :param gzip_level: Gzip compression level, from 1 to 9.
+    :param brotli_quality: Brotli quality, from 0 to 11.
+
+    Usage:
+
+        >>> app.wsgi_app = CompressionMiddleware(app.wsgi_app)
+    """
+
+    def __init__(self, app, min_size=COMPRESSION_MIN_SIZE, mimetypes=None,
+                 gzip_level=COMPRESSION_GZIP_LEVEL,
+                 brotli_quality=COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.min_size = min_size
+        self.mimetypes = set(mimetypes or COMPRESSION_MIMETYPES)
+        # Preferred first, when clients accept both equally.
+        self.compressors = [
+            ('br', lambda: BrotliCompressor(brotli_quality)),
+            ('gzip', lambda: GzipCompressor(gzip_level))
+        ]
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        if environ.get('REQUEST_METHOD', 'GET') != 'HEAD':
+            encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        state = {}
+
+        def compressing_start_response(status, headers, exc_info=None):
+            state['started'] = True
+            headers = Headers(headers)
+            if self.is_compressible(status, headers):
+                headers.set('Vary', _add_vary(headers.get('Vary', None)))
+                if encoding is not None and not self.is_too_small(headers):
+                    state['compressor'] = dict(self.compressors)[encoding]()
+                    _set_encoding_headers(headers, encoding)
+
+            write = start_response(status, headers.to_wsgi_list(), exc_info)
+            compressor = state.get('compressor', None)
+            if compressor is None:
+                return write
+            return lambda data: write(compressor.compress(data))
+
+        body = self.app(environ, compressing_start_response)
+        if state.get('started', False) and 'compressor' not in state:
+            return body
+        # Also covers applications starting the response lazily.
+        return _CompressedBody(body, state)
+
+    def negotiate(self, accept_encoding):
+        """Returns the best supported encoding the client accepts, or None."""
+
+        accepted = parse_accept_header(accept_encoding)
+        candidates = [
+            (accepted[encoding], -preference, encoding)
+            for preference, (encoding, _) in enumerate(self.compressors)
+            if accepted[encoding] > 0
+        ]
+        if not candidates:
+            return None
+        return max(candidates)[2]
+
+    def is_compressible(self, status, headers):
+        """Checks if the response content can be compressed."""
+
+        mimetype = headers.get('Content-Type', '').split(';')[0].strip()
+        return (
+            mimetype in self.mimetypes and
+            int(status.split(' ', 1)[0]) not in [204, 206, 304] and
+            'Content-Encoding' not in headers and
+            'no-transform' not in headers.get('Cache-Control', '')
+        )
+
+    def is_too_small(self, headers):
+        """Checks if a response of known length is below the minimum size.
+        Streamed responses have no length and are always compressed.
+        """
+
+        length = headers.get('Content-Length', None)
+        return length is not None and int(length) < self.min_size
+
+
+def _add_vary(vary):
+    values = [
+        value.strip()
+        for value in (vary or '').split(',')
+        if value.strip()
+    ]
+    if 'accept-encoding' not in [value.lower() for value in values]:
+        values.append('Accept-Encoding')
+    return ', '.join(values)
+
+
+def _set_encoding_headers(headers, encoding):
+    headers.set('Content-Encoding', encoding)
+    headers.remove('Content-Length')
+    etag = headers.get('ETag', None)
+    # Compressed bodies are not byte for byte the tagged representation.
+    if etag is not None and not etag.startswith('W/'):
+        headers.set('ETag', 'W/' + etag)
+
+
+class _CompressedBody(object):
+    """Response body compressing the wrapped one while it is iterated,
+    once the response started with a compressed encoding.
+    """
+
+    def __init__(self, body, state):
+        self.body = body
+        self.state = state
+
+    def __iter__(self):
+        for chunk in self.body:
+            compressor = self.state.get('compressor', None)
+            if compressor is None:
+                yield chunk
+            elif chunk:
+                yield compressor.compress(chunk)
+        if 'compressor' in self.state:
+            yield self.state['compressor'].finish()
+
+    def close(self):
+        if hasattr(self.body, 'close'):
+            self.body.close()
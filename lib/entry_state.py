@@ -1,19 +1,26 @@
+import copy
+
 from routes.base import contentful
-from contentful.errors import EntryNotFoundError
 
 
-def published_entry(entry, service=contentful):
-    """Returns the published version of a preview entry.
+def published_revisions(entries, service=contentful):
+    """Returns the published revisions of preview entries and their modules.
 
-    :param entry: Entry from the Preview API.
+    :param entries: Entries from the Preview API.
     :param service: Contentful service source.
-    :return: Contentful Delivery Entry.
+    :return: Dict of published revisions, or None if unpublished,
+             indexed by ID.
     """
 
-    try:
-        return service().entry(entry.id, 'cda')
-    except EntryNotFoundError:
-        return None
+    entry_ids = []
+    for entry in entries:
+        for resource in tracked_resources(entry):
+            if resource.id not in entry_ids:
+                entry_ids.append(resource.id)
+    if not entry_ids:
+        return {}
+
+    return service().published_revisions(entry_ids)
 
 
 def attach_entry_state(entry, service=contentful):
@@ -21,75 +28,78 @@ def attach_entry_state(entry, service=contentful):
 
     :param entry: Entry from the Preview API.
     :param service: Contentful service source.
+    :return: Copy of the entry with its state.
     """
 
-    delivery_entry = published_entry(entry, service)
+    return attach_entry_states([entry], service)[0]
+
+
+def attach_entry_states(entries, service=contentful):
+    """Attachs entry state to multiple preview entries.
+    Published revisions come from the revision index, entries missing
+    from it are fetched with a single Delivery API query.
+    Entries are shared through the index cache, so the state is set
+    on copies, leaving them untouched.
+
+    :param entries: Entries from the Preview API.
+    :param service: Contentful service source.
+    :return: List of copies of the entries with their state.
+    """
+
+    revisions = published_revisions(entries, service)
+    return [with_entry_state(entry, revisions) for entry in entries]
+
+
+def with_entry_state(entry, revisions):
+    """Returns a shallow copy of a preview entry, with draft and
+    pending changes flags.
 
-    entry.__dict__['draft'] = any(
-        delivery_resource is None
-        for _preview_resource, delivery_resource
-        in known_resources_for(entry, delivery_entry)
+    :param entry: Entry from the Preview API.
+    :param revisions: Dict of published revisions, or None if
+                      unpublished, indexed by ID.
+    """
+
+    resources = tracked_resources(entry)
+
+    stateful = copy.copy(entry)
+    # Resources hand their own __dict__ to their copies.
+    stateful.__dict__ = dict(entry.__dict__)
+    stateful.__dict__['draft'] = any(
+        revisions.get(resource.id, None) is None
+        for resource in resources
     )
-    entry.__dict__['pending_changes'] = any(
+    stateful.__dict__['pending_changes'] = any(
         has_pending_changes(
-            preview_resource,
-            delivery_resource
-        ) for preview_resource, delivery_resource
-        in known_resources_for(entry, delivery_entry)
+            resource,
+            revisions.get(resource.id, None)
+        ) for resource in resources
     )
+    return stateful
 
 
-def known_resources_for(preview_entry, delivery_entry):
-    """Returns matching resources between Preview and Delivery APIs.
+def tracked_resources(preview_entry):
+    """Returns the resources the state of a preview entry depends on.
     We check only for the main resource itself and for nested modules.
 
     :param preview_entry: Entry from the Preview API.
-    :param delivery_entry: Entry from the Delivery API.
-    :return: Array of tuples with matching resources.
+    :return: List of resources.
     """
 
     resources = []
     for field, value in preview_entry.fields().items():
         if 'modules' in field:
-            for preview_resource in value:
-                resources.append((
-                    preview_resource,
-                    find_matching_resource(
-                        preview_resource,
-                        delivery_entry,
-                        field
-                    )
-                ))
-    resources.append((preview_entry, delivery_entry))
+            resources.extend(value)
+    resources.append(preview_entry)
 
     return resources
 
 
-def find_matching_resource(preview_resource, delivery_entry, search_field):
-    """Returns matching resource for a specific field.
-
-    :param preview_resource: Entry from the Preview API to match.
-    :param delivery_entry: Entry to search from, from the Delivery API.
-    :param search_field: Field in which to search in the delivery entry.
-    :return: Entry from the Delivery API or None.
-    """
-
-    if not delivery_entry:
-        return None
-
-    for delivery_resource in delivery_entry.fields().get(search_field, []):
-        if preview_resource.id == delivery_resource.id and (
-            delivery_resource.type == 'Entry'
-            or delivery_resource.type == 'Asset'
-        ):
-            return delivery_resource
-
-
 def has_pending_changes(preview_entry, delivery_entry):
     """Returns wether or not an entry has pending changes.
 
     :param preview_entry: Entry from the Preview API.
-    :param delivery_entry: Entry from the Delivery API.
+    :param delivery_entry: Entry from the Delivery API,
+                           or its published revision.
     :return: True/False
     """
 
@@ -1,9 +1,93 @@
+import hashlib
 import CommonMark
 from flask import Markup
 
+from lib.cache import LRUCache
+from lib.metrics import timed
+
+
+DEFAULT_ENGINE = 'commonmark'
+MARKDOWN_CACHE_MAX_SIZE = 1024
+MARKDOWN_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Rendered HTML keyed by a hash of the source text, as the same
+# course descriptions and lesson copies are rendered on every page view.
+MARKDOWN_CACHE = LRUCache(
+    max_size=MARKDOWN_CACHE_MAX_SIZE,
+    max_bytes=MARKDOWN_CACHE_MAX_BYTES,
+    size_of=lambda html: len(html.encode('utf-8'))
+)
+
+
+class CommonMarkEngine(object):
+    """Renders markdown with the CommonMark reference implementation."""
+
+    name = 'commonmark'
+
+    def render(self, text):
+        return CommonMark.commonmark(text)
+
+
+class MisakaEngine(object):
+    """Renders markdown with Misaka, bindings to the Hoedown C library.
+    Only extensions matching CommonMark behavior are enabled.
+    """
+
+    name = 'misaka'
+    extensions = ('fenced-code', 'no-intra-emphasis')
+
+    def __init__(self):
+        import misaka
+
+        self._markdown = misaka.Markdown(
+            misaka.HtmlRenderer(),
+            extensions=self.extensions
+        )
+
+    def render(self, text):
+        return self._markdown(text)
+
+
+ENGINES = {
+    CommonMarkEngine.name: CommonMarkEngine,
+    MisakaEngine.name: MisakaEngine
+}
+
+engine = CommonMarkEngine()
+
+
+def configure_markdown_engine(name=DEFAULT_ENGINE):
+    """Selects the engine used by the markdown filter.
+
+    :param name: Name of one of ENGINES.
+    :raises ValueError: If the engine is unknown.
+    """
+
+    global engine
+    if name not in ENGINES:
+        raise ValueError('Unknown markdown engine: {0}'.format(name))
+    engine = ENGINES[name]()
+
+
+def configure_markdown_cache(max_size=None, max_bytes=None):
+    """Configures the rendered markdown cache.
+
+    :param max_size: (optional) Maximum amount of cached documents.
+    :param max_bytes: (optional) Maximum total size of the cached HTML.
+    """
+
+    MARKDOWN_CACHE.configure(max_size=max_size, max_bytes=max_bytes)
+
+
+def markdown_cache_stats():
+    """Returns the rendered markdown cache hit, miss and size counters."""
+
+    return MARKDOWN_CACHE.stats()
+
 
 def markdown(text):
     """Filter for turning text into markdown.
+    Rendered documents are cached by engine and content.
 
     :param text: String to be transformed.
     :return: Transformed html string.
@@ -13,4 +97,14 @@ def markdown(text):
         {{ 'Some *markdown*'|markdown }}
         "Some <strong>markdown</strong>"
     """
-    return Markup(CommonMark.commonmark(text))
+
+    current_engine = engine
+
+    def render():
+        with timed('markdown'):
+            return Markup(current_engine.render(text))
+
+    return MARKDOWN_CACHE.fetch(
+        (current_engine.name, hashlib.sha256(text.encode('utf-8')).digest()),
+        render
+    )
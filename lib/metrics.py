@@ -0,0 +1,332 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request
+
+
+METRICS_PREFIX = 'example_app'
+# Upper bounds of the histogram buckets, in seconds.
+METRICS_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_current = threading.local()
+
+
+class Histogram(object):
+    """Observation counts per bucket, with their sum."""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self, buckets):
+        # The last count is for observations above every bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+
+class MetricsRegistry(object):
+    """Request, phase and upstream query duration histograms,
+    in-flight requests and cache counters of this process,
+    exposed in the Prometheus text format.
+
+    :param buckets: (optional) Upper bounds of the histogram buckets.
+
+    Usage:
+
+        >>> registry = MetricsRegistry()
+        >>> registry.observe(
+        ...     'phase_duration_seconds',
+        ...     (('phase', 'render'),),
+        ...     0.004
+        ... )
+        >>> registry.render()
+    """
+
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self.enabled = False
+        self.caches = {}
+        self.in_flight = 0
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, labels, seconds):
+        """Adds a duration to a histogram.
+
+        :param name: Metric name, without prefix.
+        :param labels: Tuple of (label, value) pairs.
+        :param seconds: Observed duration.
+        """
+
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get((name, labels), None)
+            if histogram is None:
+                histogram = Histogram(self.buckets)
+                self._histograms[(name, labels)] = histogram
+            histogram.counts[bucket] += 1
+            histogram.sum += seconds
+
+    def start_request(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finish_request(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def track_caches(self, caches):
+        """Reports hits and misses of caches.
+
+        :param caches: Dict of LRUCache by name.
+        """
+
+        self.caches.update(caches)
+
+    def clear(self):
+        with self._lock:
+            self._histograms = {}
+            self.in_flight = 0
+
+    def render(self):
+        """Returns every metric in the Prometheus text format."""
+
+        with self._lock:
+            histograms = sorted(
+                (name, labels, list(histogram.counts), histogram.sum)
+                for (name, labels), histogram in self._histograms.items()
+            )
+            in_flight = self.in_flight
+
+        lines = []
+        described = set()
+        for name, labels, counts, total in histograms:
+            metric = '{0}_{1}'.format(METRICS_PREFIX, name)
+            if name not in described:
+                described.add(name)
+                lines.append('# TYPE {0} histogram'.format(metric))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append('{0}_bucket{1} {2}'.format(
+                    metric,
+                    _format_labels(labels + (('le', str(bound)),)),
+                    cumulative
+                ))
+            lines.append('{0}_sum{1} {2}'.format(
+                metric,
+                _format_labels(labels),
+                total
+            ))
+            lines.append('{0}_count{1} {2}'.format(
+                metric,
+                _format_labels(labels),
+                cumulative
+            ))
+
+        lines.append(
+            '# TYPE {0}_requests_in_flight gauge'.format(METRICS_PREFIX)
+        )
+        lines.append(
+            '{0}_requests_in_flight {1}'.format(METRICS_PREFIX, in_flight)
+        )
+
+        cache_stats = sorted(
+            (name, cache.stats()) for name, cache in self.caches.items()
+        )
+        for counter in ['hits', 'misses']:
+            lines.append('# TYPE {0}_cache_{1}_total counter'.format(
+                METRICS_PREFIX,
+                counter
+            ))
+            for name, stats in cache_stats:
+                lines.append('{0}_cache_{1}_total{2} {3}'.format(
+                    METRICS_PREFIX,
+                    counter,
+                    _format_labels((('cache', name),)),
+                    stats[counter]
+                ))
+        lines.append('# TYPE {0}_cache_hit_ratio gauge'.format(METRICS_PREFIX))
+        for name, stats in cache_stats:
+            lookups = stats['hits'] + stats['misses']
+            lines.append('{0}_cache_hit_ratio{1} {2}'.format(
+                METRICS_PREFIX,
+                _format_labels((('cache', name),)),
+                round(stats['hits'] / lookups, 4) if lookups else 0
+            ))
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestTimings(object):
+    """Durations of the phases of a request, reported in its
+    Server-Timing header.
+    """
+
+    __slots__ = ('started_at', 'phases')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases = []
+
+    def add(self, phase, seconds):
+        # Appending is atomic,
+        # phases may be added from upstream worker threads.
+        self.phases.append((phase, seconds))
+
+    def server_timing(self):
+        """Returns the Server-Timing header value, with the total
+        duration of each phase and the whole request so far.
+        """
+
+        totals = OrderedDict()
+        for phase, seconds in list(self.phases):
+            count, total = totals.get(phase, (0, 0.0))
+            totals[phase] = (count + 1, total + seconds)
+
+        metrics = []
+        for phase, (count, total) in totals.items():
+            metric = '{0};dur={1:.2f}'.format(phase, total * 1000)
+            if count > 1:
+                metric += ';desc="{0} calls"'.format(count)
+            metrics.append(metric)
+        elapsed = time.perf_counter() - self.started_at
+        metrics.append('total;dur={0:.2f}'.format(elapsed * 1000))
+        return ', '.join(metrics)
+
+
+def current_timings():
+    """Returns the timings of the request handled by this thread,
+    None when metrics are disabled or outside of requests.
+    """
+
+    return getattr(_current, 'timings', None)
+
+
+def set_current_timings(timings):
+    """Attributes phases timed in this thread to a request,
+    used to follow requests into upstream worker threads.
+    """
+
+    _current.timings = timings
+
+
+class timed(object):
+    """Times a phase of the current request, like an upstream call,
+    template rendering or markdown conversion. Does nothing outside of
+    measured requests.
+
+    :param phase: Name of the phase, reported in Server-Timing.
+    :param query: (optional) Name of an upstream query, also
+                  observed in the per query histogram.
+
+    Usage:
+
+        >>> with timed('render'):
+        >>>     render_template('course.dhtml', course=course)
+    """
+
+    __slots__ = ('phase', 'query', 'timings', 'started_at')
+
+    def __init__(self, phase, query=None):
+        self.phase = phase
+        self.query = query
+
+    def __enter__(self):
+        self.timings = getattr(_current, 'timings', None)
+        if self.timings is not None:
+            self.started_at = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is None:
+            return
+        seconds = time.perf_counter() - self.started_at
+        self.timings.add(self.phase, seconds)
+        registry.observe(
+            'phase_duration_seconds',
+            (('phase', self.phase),),
+            seconds
+        )
+        if self.query is not None:
+            registry.observe(
+                'upstream_query_duration_seconds',
+                (('query', self.query),),
+                seconds
+            )
+
+
+def configure_metrics(app, enabled=False, caches=None):
+    """Times requests and their phases, adding a Server-Timing header
+    to responses and serving metrics on /metrics.
+    When disabled, no hooks are registered and phases aren't timed.
+
+    :param app: Flask app. Must run before other `before_request`
+                hooks are registered, so they are timed as well.
+    :param enabled: Whether to measure requests.
+    :param caches: (optional) Dict of LRUCache by name, whose hits and
+                   misses are reported.
+
+    Usage:
+
+        >>> configure_metrics(app, True, {'page': PAGE_CACHE})
+    """
+
+    registry.enabled = enabled
+    if not enabled:
+        return
+
+    registry.track_caches(caches or {})
+    app.before_request(start_request)
+    app.after_request(add_server_timing)
+    app.teardown_request(finish_request)
+
+
+def start_request():
+    registry.start_request()
+    set_current_timings(RequestTimings())
+
+
+def add_server_timing(response):
+    timings = current_timings()
+    if timings is not None:
+        response.headers['Server-Timing'] = timings.server_timing()
+    return response
+
+
+def finish_request(exception=None):
+    timings = current_timings()
+    if timings is None:
+        return
+    set_current_timings(None)
+    registry.finish_request()
+    route = 'unmatched'
+    if request.url_rule is not None:
+        route = request.url_rule.rule
+    registry.observe(
+        'request_duration_seconds',
+        (
+            ('route', route),
+            ('method', request.method)
+        ),
+        time.perf_counter() - timings.started_at
+    )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{{{0}}}'.format(','.join(
+        '{0}="{1}"'.format(
+            label,
+            value.replace('\\', '\\\\')
+            .replace('"', '\\"')
+            .replace('\n', '\\n')
+        )
+        for label, value in labels
+    ))
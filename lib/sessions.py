@@ -0,0 +1,232 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import CallbackDict, \
+                           SessionInterface, \
+                           SessionMixin, \
+                           SecureCookieSessionInterface, \
+                           session_json_serializer
+
+from lib.cache import LRUCache
+
+
+SESSION_STORES = ['cookie', 'memory', 'sqlite']
+SESSION_STORE_MAX_SIZE = 10000
+SESSION_STORE_PATH = os.path.join(
+    os.path.dirname(__file__), '..', '.cache', 'sessions.sqlite3'
+)
+# Expired sessions are purged from SQLite every this many writes.
+SQLITE_PURGE_INTERVAL = 100
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session whose values are kept in a store, the cookie only
+    holding its random ID.
+
+    :param initial: (optional) Dict of stored values.
+    :param sid: Session ID.
+    :param expires_at: (optional) Time the stored values expire at.
+    """
+
+    def __init__(self, initial=None, sid=None, expires_at=None):
+        def on_update(self):
+            self.modified = True
+        CallbackDict.__init__(self, initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = expires_at is None
+        self.modified = False
+
+
+class MemorySessionStore(object):
+    """Keeps sessions in the memory of this process, so every worker
+    has its own. Only fits single process deployments.
+
+    :param max_size: (optional) Maximum amount of sessions, the least
+                     recently used being dropped first.
+    """
+
+    def __init__(self, max_size=SESSION_STORE_MAX_SIZE):
+        self.cache = LRUCache(max_size=max_size)
+
+    def get(self, sid):
+        """Returns (values, expires_at) of a session, or None."""
+
+        stored = self.cache.get(sid, None)
+        if stored is None:
+            return None
+        serialized, expires_at = stored
+        return session_json_serializer.loads(serialized), expires_at
+
+    def set(self, sid, values, expires_at):
+        # Serialized, so requests never share mutable values.
+        self.cache.set(
+            sid,
+            (session_json_serializer.dumps(values), expires_at),
+            ttl=max(0, expires_at - time.time())
+        )
+
+    def delete(self, sid):
+        self.cache.delete(sid)
+
+
+class SQLiteSessionStore(object):
+    """Keeps sessions in an SQLite database, shared by every worker
+    process of a host.
+
+    :param path: Database file, created if missing.
+    """
+
+    def __init__(self, path=SESSION_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'sid TEXT PRIMARY KEY, '
+                'data TEXT NOT NULL, '
+                'expires_at REAL NOT NULL)'
+            )
+
+    def get(self, sid):
+        """Returns (values, expires_at) of a session, or None."""
+
+        row = self._connection().execute(
+            'SELECT data, expires_at FROM sessions '
+            'WHERE sid = ? AND expires_at > ?',
+            (sid, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return session_json_serializer.loads(row[0]), row[1]
+
+    def set(self, sid, values, expires_at):
+        with self._connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO sessions (sid, data, expires_at) '
+                'VALUES (?, ?, ?)',
+                (sid, session_json_serializer.dumps(values), expires_at)
+            )
+            self._writes += 1
+            if self._writes % SQLITE_PURGE_INTERVAL == 0:
+                connection.execute(
+                    'DELETE FROM sessions WHERE expires_at <= ?',
+                    (time.time(),)
+                )
+
+    def delete(self, sid):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def _connection(self):
+        # SQLite connections can't be shared between threads.
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            self._local.connection = connection
+            connection.execute('PRAGMA journal_mode=WAL')
+        return connection
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session values in a store, sending a random session ID
+    as cookie. Stores and cookies are only written when the session
+    changed, or when half of its lifetime passed.
+    Signed cookie sessions from before are taken over on first use.
+
+    :param store: Session store, like MemorySessionStore.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.cookie_sessions = SecureCookieSessionInterface()
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name, None)
+        if sid:
+            stored = self.store.get(sid)
+            if stored is not None:
+                values, expires_at = stored
+                return ServerSideSession(
+                    values,
+                    sid=sid,
+                    expires_at=expires_at
+                )
+
+        session = ServerSideSession(sid=secrets.token_urlsafe(32))
+        if sid:
+            cookie_session = self.cookie_sessions.open_session(app, request)
+            if cookie_session:
+                session.update(cookie_session)
+        return session
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        # Sessions only made permanent hold nothing worth storing,
+        # every visitor without one would otherwise get stored.
+        if not session or set(session) == {'_permanent'}:
+            if not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(
+                    app.session_cookie_name,
+                    domain=domain,
+                    path=path
+                )
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        needs_refresh = (
+            session.expires_at is not None and
+            session.expires_at - now < lifetime / 2
+        )
+        if not (session.modified or needs_refresh):
+            return
+
+        self.store.set(session.sid, dict(session), now + lifetime)
+        response.set_cookie(
+            app.session_cookie_name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app)
+        )
+
+
+def configure_session_store(app, store='memory', path=SESSION_STORE_PATH,
+                            max_size=SESSION_STORE_MAX_SIZE):
+    """Keeps sessions on the server instead of in signed cookies.
+
+    :param app: Flask app.
+    :param store: One of SESSION_STORES, `cookie` keeps Flask sessions.
+    :param path: (optional) Database file of the `sqlite` store.
+    :param max_size: (optional) Maximum amount of sessions of the `memory`
+                     store.
+
+    Usage:
+
+        >>> configure_session_store(app, 'sqlite', '/tmp/sessions.sqlite3')
+    """
+
+    if store not in SESSION_STORES:
+        raise ValueError('Unknown session store: {0}'.format(store))
+
+    if store == 'memory':
+        app.session_interface = ServerSideSessionInterface(
+            MemorySessionStore(max_size)
+        )
+    elif store == 'sqlite':
+        app.session_interface = ServerSideSessionInterface(
+            SQLiteSessionStore(path)
+        )
@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import sys
+
+from jinja2 import FileSystemBytecodeCache
+
+
+TEMPLATE_CACHE_DIRECTORY = os.path.join(
+    os.path.dirname(__file__), '..', '.cache', 'templates'
+)
+TEMPLATE_EXTENSION = '.dhtml'
+
+log = logging.getLogger(__name__)
+
+
+class RelocatableBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache keyed by template name only. Jinja also keys on
+    the absolute template path, so templates compiled in a build
+    directory would miss once the app runs from another one, like
+    Heroku building in /tmp and running from /app.
+    Bytecode is still checked against the template source.
+    """
+
+    def get_cache_key(self, name, filename=None):
+        return hashlib.sha1(name.encode('utf-8')).hexdigest()
+
+
+def configure_template_cache(app, directory=TEMPLATE_CACHE_DIRECTORY):
+    """Makes the app load templates from a bytecode cache directory,
+    compiling them only when their source changed.
+    Does nothing until the cache is built, and warns when it was built
+    from older templates.
+
+    :param app: Flask app.
+    :param directory: Folder holding the compiled templates.
+
+    Usage:
+
+        >>> configure_template_cache(app, '.cache/templates')
+    """
+
+    if not os.path.isdir(directory):
+        return
+
+    app.jinja_env.bytecode_cache = RelocatableBytecodeCache(directory)
+    stale = stale_templates(app)
+    if stale:
+        log.warning(
+            'Compiled templates are out of date, '
+            'run `python -m lib.templates`: %s',
+            ', '.join(stale)
+        )
+
+
+def template_names(app):
+    """Returns the names of the app templates."""
+
+    return sorted(
+        name for name in app.jinja_env.list_templates()
+        if name.endswith(TEMPLATE_EXTENSION)
+    )
+
+
+def load_templates(app):
+    """Loads every template, compiling and caching the ones
+    missing from the bytecode cache. Loading them when a worker boots
+    saves first requests from waiting on it.
+
+    :return: Amount of loaded templates.
+    """
+
+    names = template_names(app)
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def stale_templates(app):
+    """Returns the names of templates without up to date bytecode,
+    because their source changed or they were never compiled.
+    """
+
+    env = app.jinja_env
+    if env.bytecode_cache is None:
+        return template_names(app)
+
+    stale = []
+    for name in template_names(app):
+        source, filename, _ = env.loader.get_source(env, name)
+        bucket = env.bytecode_cache.get_bucket(env, name, filename, source)
+        if bucket.code is None:
+            stale.append(name)
+    return stale
+
+
+if __name__ == '__main__':
+    from app import app
+
+    directory = os.environ.get(
+        'TEMPLATE_CACHE_DIRECTORY',
+        TEMPLATE_CACHE_DIRECTORY
+    )
+    if '--check' in sys.argv[1:]:
+        stale = stale_templates(app)
+        if stale:
+            print('Stale compiled templates: {0}'.format(', '.join(stale)))
+            sys.exit(1)
+        print('Compiled templates are up to date')
+    else:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = RelocatableBytecodeCache(directory)
+        print('Compiled {0} templates'.format(load_templates(app)))
@@ -0,0 +1,108 @@
+import base64
+import binascii
+import hashlib
+from collections import OrderedDict
+
+
+VISITED_MAX_SIZE = 200
+DIGEST_SIZE = 4
+
+
+def entry_digest(entry_id):
+    """Returns the fixed size digest an entry ID is kept as."""
+
+    return hashlib.blake2b(
+        entry_id.encode('utf-8'),
+        digest_size=DIGEST_SIZE
+    ).digest()
+
+
+class VisitedEntries(object):
+    """Course and lesson IDs visited in a session, kept as 4 byte
+    digests. Stored as a single base64 string, holding at most
+    max_size digests, the least recently visited being dropped first.
+    Clashing digests of two IDs make both look visited, which at
+    these sizes is unlikely and harmless.
+
+    :param digests: (optional) Iterable of digests, least recent first.
+    :param max_size: (optional) Maximum amount of kept digests.
+
+    Usage:
+
+        >>> visited = VisitedEntries.load(session.get('visited_lessons', None))
+        >>> visited.add(lesson.id)
+        >>> lesson.id in visited
+        True
+        >>> session['visited_lessons'] = visited.dump()
+    """
+
+    __slots__ = ('max_size', '_digests')
+
+    def __init__(self, digests=(), max_size=VISITED_MAX_SIZE):
+        self.max_size = max_size
+        self._digests = OrderedDict((digest, True) for digest in digests)
+        self._trim()
+
+    @classmethod
+    def load(klass, value, max_size=VISITED_MAX_SIZE):
+        """Returns the visited entries stored in a session value.
+        Lists of IDs, stored before digests were, are converted.
+        Unreadable values start over.
+        """
+
+        if isinstance(value, list):
+            return klass(
+                (entry_digest(entry_id) for entry_id in value),
+                max_size
+            )
+        if not value:
+            return klass(max_size=max_size)
+
+        try:
+            raw = base64.b64decode(value.encode('ascii'), validate=True)
+        except (binascii.Error, ValueError):
+            return klass(max_size=max_size)
+        starts = range(0, len(raw) - DIGEST_SIZE + 1, DIGEST_SIZE)
+        return klass(
+            (raw[index:index + DIGEST_SIZE] for index in starts),
+            max_size
+        )
+
+    def dump(self):
+        """Returns the string kept in the session."""
+
+        return base64.b64encode(b''.join(self._digests)).decode('ascii')
+
+    def add(self, entry_id):
+        """Marks an entry as visited.
+
+        :return: False if it already was the most recently visited one.
+        """
+
+        digest = entry_digest(entry_id)
+        if digest in self._digests:
+            if next(reversed(self._digests)) == digest:
+                return False
+            self._digests.move_to_end(digest)
+            return True
+
+        self._digests[digest] = True
+        self._trim()
+        return True
+
+    def intersection(self, entry_ids):
+        """Returns the visited ones of entry_ids."""
+
+        return frozenset(
+            entry_id for entry_id in entry_ids if entry_id in self
+        )
+
+    def __contains__(self, entry_id):
+        return entry_digest(entry_id) in self._digests
+
+    def __len__(self):
+        return len(self._digests)
+
+    def _trim(self):
+        while len(self._digests) > self.max_size:
+            self._digests.popitem(last=False)
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+import urllib.parse
+from os import environ
+
+from services.contentful import Contentful
+
+
+WARMUP_APIS = ['cda', 'cpa']
+# Warm-ups listing no pages, or rendering none of them, are retried.
+WARMUP_ATTEMPTS = 3
+WARMUP_RETRY_DELAY = 10
+# Pages are requested over HTTPS, so SSLify doesn't redirect them.
+WARMUP_BASE_URL = 'https://localhost'
+
+log = logging.getLogger(__name__)
+
+
+class WarmupState(object):
+    """Progress of the warm-up of this process.
+    Processes that never start a warm-up are ready right away,
+    the others once a warm-up succeeded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = None
+            self.finished_at = None
+            self.warmed = 0
+            self.failed = 0
+            self.attempts = 0
+            self.error = None
+
+    def start(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.finished_at = None
+            self.warmed = 0
+            self.failed = 0
+            self.attempts = 0
+            self.error = None
+
+    def attempt(self):
+        with self._lock:
+            self.attempts += 1
+            self.warmed = 0
+            self.failed = 0
+
+    def fail(self, error):
+        with self._lock:
+            self.error = error
+
+    def finish(self):
+        with self._lock:
+            self.finished_at = time.time()
+            self.error = None
+
+    def record(self, success):
+        with self._lock:
+            if success:
+                self.warmed += 1
+            else:
+                self.failed += 1
+
+    @property
+    def ready(self):
+        return self.started_at is None or self.finished_at is not None
+
+    def stats(self):
+        """Returns the warm-up progress."""
+
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'warmed': self.warmed,
+                'failed': self.failed,
+                'attempts': self.attempts,
+                'error': self.error,
+                'seconds': None if self.started_at is None else round(
+                    (self.finished_at or time.time()) - self.started_at,
+                    3
+                )
+            }
+
+
+state = WarmupState()
+
+
+def default_service():
+    """Returns the Contentful service for the configured credentials."""
+
+    return Contentful.instance(
+        environ['CONTENTFUL_SPACE_ID'],
+        environ['CONTENTFUL_DELIVERY_TOKEN'],
+        environ['CONTENTFUL_PREVIEW_TOKEN'],
+        environ.get('CONTENTFUL_HOST', None)
+    )
+
+
+def warmup_paths(service, apis=None):
+    """Returns the paths of every page: the landing page, course list,
+    categories, courses and lessons, for every locale and API.
+
+    :param service: Contentful service to discover pages with.
+    :param apis: (optional) API IDs to warm up, defaults to WARMUP_APIS.
+    :return: List of paths with their query string.
+    """
+
+    paths = []
+    for api_id in apis or WARMUP_APIS:
+        locales = service.locales(api_id)
+        default_locale = [locale.code for locale in locales if locale.default]
+        for locale in locales:
+            query = {}
+            if not default_locale or locale.code != default_locale[0]:
+                query['locale'] = locale.code
+            if api_id != 'cda':
+                query['api'] = api_id
+
+            page_paths = ['/', '/courses']
+            for category in service.categories(api_id, locale.code):
+                page_paths.append(
+                    '/courses/categories/{0}'.format(category.slug)
+                )
+            for course in service.courses(api_id, locale.code):
+                page_paths.append('/courses/{0}'.format(course.slug))
+                for lesson in course.fields().get('lessons', []):
+                    # Unresolved links have no slug.
+                    lesson_slug = getattr(lesson, 'slug', None)
+                    if lesson_slug is not None:
+                        page_paths.append('/courses/{0}/lessons/{1}'.format(
+                            course.slug,
+                            lesson_slug
+                        ))
+
+            suffix = ''
+            if query:
+                suffix = '?{0}'.format(
+                    urllib.parse.urlencode(sorted(query.items()))
+                )
+            paths.extend(path + suffix for path in page_paths)
+    return paths
+
+
+def warm_up(app, service=default_service, apis=None,
+            attempts=WARMUP_ATTEMPTS, retry_delay=WARMUP_RETRY_DELAY):
+    """Renders every page once, filling service, index, template,
+    markdown and page caches. Failing pages are logged and skipped.
+    When pages can't be listed, or none of them renders, the warm-up
+    is retried, and the process stays not ready if every attempt fails.
+
+    :param app: Flask app.
+    :param service: Contentful service source.
+    :param apis: (optional) API IDs to warm up, defaults to WARMUP_APIS.
+    :param attempts: (optional) Maximum amount of warm-ups.
+    :param retry_delay: (optional) Seconds between warm-ups.
+    :return: Warm-up progress.
+    """
+
+    state.start()
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(retry_delay)
+        state.attempt()
+        error = _render_pages(app, service, apis)
+        if error is None:
+            state.finish()
+            break
+        log.warning('Warm-up attempt %s failed: %s', attempt + 1, error)
+        state.fail(error)
+    return state.stats()
+
+
+def _render_pages(app, service, apis):
+    """Renders every page, returning why the warm-up failed, if it did."""
+
+    try:
+        paths = warmup_paths(service(), apis)
+    except Exception:
+        log.exception('Warm-up could not list pages')
+        return 'pages could not be listed'
+
+    # Without cookies, pages render as for first time visitors.
+    client = app.test_client(use_cookies=False)
+    warmed = 0
+    for path in paths:
+        try:
+            response = client.get(path, base_url=WARMUP_BASE_URL)
+            status_code = response.status_code
+        except Exception:
+            log.exception('Warm-up of %s failed', path)
+            status_code = 500
+        state.record(status_code < 500)
+        warmed += status_code < 500
+
+    if paths and not warmed:
+        return 'no page rendered'
+    return None
+
+
+def start_warmup(app, service=default_service, apis=None):
+    """Warms up in the background. Until done, `state.ready` is False.
+
+    :return: The warm-up thread.
+    """
+
+    state.start()
+    thread = threading.Thread(
+        target=warm_up,
+        args=(app, service, apis),
+        daemon=True
+    )
+    thread.start()
+    return thread
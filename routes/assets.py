@@ -0,0 +1,39 @@
+import mimetypes
+from os import path
+from flask import Blueprint, current_app, request, send_from_directory
+
+from lib.assets import precompressed_variant, \
+                       BUILD_DIRECTORY, \
+                       IMMUTABLE_MAX_AGE, \
+                       IMMUTABLE_CACHE_CONTROL
+
+
+assets = Blueprint('assets', __name__)
+
+
+@assets.route('/{0}/<path:filename>'.format(BUILD_DIRECTORY))
+def show_asset(filename):
+    """Serves content hashed assets, precompressed when the client
+    accepts it, to be cached by browsers and proxies forever.
+    """
+
+    build_folder = path.join(current_app.static_folder, BUILD_DIRECTORY)
+    encoding, variant = precompressed_variant(
+        build_folder,
+        filename,
+        request.accept_encodings
+    )
+
+    response = send_from_directory(
+        build_folder,
+        variant,
+        mimetype=(
+            mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        ),
+        cache_timeout=IMMUTABLE_MAX_AGE
+    )
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -1,10 +1,14 @@
-from flask import render_template, request, session, redirect, url_for, escape
+from flask import render_template, request, session, redirect, url_for, \
+                  escape, g
+from functools import wraps
 from os import environ, path
 from contentful.errors import HTTPError
 from contentful.locale import Locale
 import urllib.parse
 
 from lib.breadcrumbs import breadcrumbs
+from lib.metrics import timed
+from lib.visited import VisitedEntries
 from i18n.i18n import translate
 from services.contentful import Contentful
 
@@ -17,6 +21,42 @@ DEFAULT_LOCALE = Locale({
     'name': 'U.S. English',
     'default': True
 })
+# Settings passed as query parameters, kept out of links and cache keys.
+REJECTED_QUERY_KEYS = frozenset([
+    'space_id',
+    'delivery_token',
+    'preview_token',
+    'editorial_features'
+])
+
+
+def request_cached(helper_fn):
+    """Computes the decorated helper at most once per request.
+    Later calls are served from `flask.g` until `clear_request_cache`
+    is called.
+    Arguments are not part of the cache key, decorated helpers must only
+    depend on the current request and session.
+    """
+
+    @wraps(helper_fn)
+    def decorated_function(*args, **kwargs):
+        cache = getattr(g, 'request_cache', None)
+        if cache is None:
+            cache = g.request_cache = {}
+
+        name = helper_fn.__name__
+        if name not in cache:
+            cache[name] = helper_fn(*args, **kwargs)
+        return cache[name]
+    return decorated_function
+
+
+def clear_request_cache():
+    """Clears request memoized values.
+    Used when the session credentials change.
+    """
+
+    g.request_cache = {}
 
 
 def before_request():
@@ -59,6 +99,7 @@ def before_request():
             del session['has_errors']
 
 
+@request_cached
 def is_using_custom_credentials(session):
     """Checks if user is using default or custom credentials."""
 
@@ -113,6 +154,7 @@ def update_session_for(key, with_value=None, coercion=None):
             with_value = coercion(with_value)
     if with_value is not None:
         session[key] = with_value
+        clear_request_cache()
 
 
 def contentful():
@@ -126,15 +168,17 @@ def contentful():
     )
 
 
+@request_cached
 def locales():
     """Returns the list of available locales."""
 
     try:
-        return contentful().locales(api_id)
+        return contentful().locales(api_id())
     except HTTPError:
         return [DEFAULT_LOCALE]
 
 
+@request_cached
 def locale():
     """Returns the currently selected locale."""
 
@@ -153,6 +197,7 @@ def api_id():
     return request.args.get('api', DEFAULT_API)
 
 
+@request_cached
 def current_api():
     """Returns the currently selected API data."""
     api_data = {
@@ -175,16 +220,10 @@ def current_api():
 def query_string():
     """Returns a sanitized query string."""
 
-    rejected_keys = [
-        'space_id',
-        'delivery_token',
-        'preview_token',
-        'editorial_features'
-    ]
     args = [(k, vi)
             for k, v in request.args.lists()
             for vi in v
-            if k not in rejected_keys]
+            if k not in REJECTED_QUERY_KEYS]
     if not args:
         return ''
     return '?{0}'.format(urllib.parse.urlencode(args))
@@ -247,8 +286,14 @@ def check_errors(space_id, delivery_token, preview_token):
     check_field_required(errors, preview_token, 'previewToken')
 
     if not errors:
-        validate_space_token_combination(errors, space_id, delivery_token)
-        validate_space_token_combination(errors, space_id, preview_token, True)
+        with timed('credentials'):
+            validate_space_token_combination(errors, space_id, delivery_token)
+            validate_space_token_combination(
+                errors,
+                space_id,
+                preview_token,
+                True
+            )
 
     return errors
 
@@ -275,42 +320,46 @@ def append_error_message(errors, field_name, message):
 
 def validate_space_token_combination(
         errors, space_id, access_token, is_preview=False):
-    """Validates if client is authenticated."""
+    """Validates if client is authenticated.
+    Results are cached, see `Contentful.validate`.
+    """
 
-    try:
-        Contentful.create_client(
-            space_id,
-            access_token,
-            is_preview,
-            environ.get('CONTENTFUL_HOST', None)
-        )
-    except HTTPError as e:
-        token_field = 'previewToken' if is_preview else 'deliveryToken'
+    status_code = Contentful.validate(
+        space_id,
+        access_token,
+        is_preview,
+        environ.get('CONTENTFUL_HOST', None)
+    )
+    if status_code is None:
+        return
 
-        if e.status_code == 401:
-            error_label = 'deliveryKeyInvalidLabel'
-            if is_preview:
-                error_label = 'previewKeyInvalidLabel'
+    token_field = 'previewToken' if is_preview else 'deliveryToken'
 
-            append_error_message(
-                errors,
-                token_field,
-                translate(error_label, locale().code)
-            )
-        elif e.status_code == 404:
-            append_error_message(
-                errors,
-                'spaceId',
-                translate('spaceOrTokenInvalid', locale().code)
-            )
-        else:
-            append_error_message(
-                errors,
-                token_field,
-                translate('somethingWentWrongLabel', locale().code)
-            )
+    if status_code == 401:
+        error_label = 'deliveryKeyInvalidLabel'
+        if is_preview:
+            error_label = 'previewKeyInvalidLabel'
+
+        append_error_message(
+            errors,
+            token_field,
+            translate(error_label, locale().code)
+        )
+    elif status_code == 404:
+        append_error_message(
+            errors,
+            'spaceId',
+            translate('spaceOrTokenInvalid', locale().code)
+        )
+    else:
+        append_error_message(
+            errors,
+            token_field,
+            translate('somethingWentWrongLabel', locale().code)
+        )
 
 
+@request_cached
 def space_id():
     """Returns the current space ID."""
 
@@ -320,6 +369,7 @@ def space_id():
     )
 
 
+@request_cached
 def delivery_token():
     """Returns the current delivery token."""
 
@@ -329,6 +379,7 @@ def delivery_token():
     )
 
 
+@request_cached
 def preview_token():
     """Returns the current preview token."""
 
@@ -338,6 +389,29 @@ def preview_token():
     )
 
 
+@request_cached
+def visited_lessons():
+    """Returns the courses and lessons visited in this session."""
+
+    return VisitedEntries.load(session.get('visited_lessons', None))
+
+
+def mark_as_visited(entry_id):
+    """Adds a course or lesson to the visited ones.
+    The session is only updated when they change, or are still
+    stored as a list of IDs.
+
+    :param entry_id: ID of the visited course or lesson.
+    :return: Updated VisitedEntries.
+    """
+
+    visited = visited_lessons()
+    stored = session.get('visited_lessons', '')
+    if visited.add(entry_id) or not isinstance(stored, str):
+        session['visited_lessons'] = visited.dump()
+    return visited
+
+
 def render_with_globals(template_name, **params):
     """Renders the desired template with the shared state included.
 
@@ -362,8 +436,11 @@ def render_with_globals(template_name, **params):
         'environ': environ
     }
     global_parameters.update(params)
+    # Lets the page cache tag pages with the rendered entries.
+    g.rendered_resources = list(params.values())
 
-    return render_template(
-        '{0}.dhtml'.format(template_name),
-        **global_parameters
-    )
+    with timed('render'):
+        return render_template(
+            '{0}.dhtml'.format(template_name),
+            **global_parameters
+        )
@@ -1,16 +1,20 @@
+from functools import partial
 from flask import Blueprint, redirect, url_for, session
-from contentful.errors import EntryNotFoundError
 
 from routes.base import contentful, \
                         api_id, \
                         locale, \
                         render_with_globals, \
                         raw_breadcrumbs, \
+                        mark_as_visited, \
                         VIEWS_PATH
+from routes.page_cache import cached_page, vary_on_visited_lessons
 from lib.breadcrumbs import refine
 from lib.entry_state import should_attach_entry_state, \
-                            attach_entry_state
+                            attach_entry_state, \
+                            attach_entry_states
 from routes.errors import wrap_errors
+from services.concurrency import concurrently
 from i18n.i18n import translate
 
 
@@ -18,14 +22,21 @@ courses = Blueprint('courses', __name__, template_folder=VIEWS_PATH)
 
 
 @courses.route('/courses')
+@cached_page(content_types=['course', 'category'])
 @wrap_errors
 def show_courses():
-    courses = contentful().courses(api_id(), locale().code)
-    categories = contentful().categories(api_id(), locale().code)
+    service = contentful()
+    courses, categories = concurrently(
+        partial(service.courses, api_id(), locale().code),
+        partial(service.categories, api_id(), locale().code),
+        cached=[
+            service.is_indexed('courses', api_id(), locale().code),
+            service.is_indexed('categories', api_id(), locale().code)
+        ]
+    )
 
     if should_attach_entry_state(api_id(), session):
-        for course in courses:
-            attach_entry_state(course)
+        courses = attach_entry_states(courses)
 
     return render_with_globals(
         'courses',
@@ -44,17 +55,24 @@ def courses_categories_route():
 
 
 @courses.route('/courses/categories/<category_slug>')
+@cached_page(content_types=['course', 'category'])
 @wrap_errors
 def show_courses_by_category(category_slug):
-    categories = contentful().categories(api_id(), locale().code)
-
-    active_category = None
-    for category in categories:
-        if category.slug == category_slug:
-            active_category = category
-            break
-    if active_category is None:
-        raise EntryNotFoundError('errorMessage404Category')
+    # The course index is built while categories are fetched.
+    service = contentful()
+    categories, _course_index = concurrently(
+        partial(service.categories, api_id(), locale().code),
+        partial(service.course_index, api_id(), locale().code),
+        cached=[
+            service.is_indexed('categories', api_id(), locale().code),
+            service.is_indexed('courses', api_id(), locale().code)
+        ]
+    )
+    active_category = contentful().category(
+        category_slug,
+        api_id(),
+        locale().code
+    )
 
     courses = contentful().courses_by_category(
         active_category.id,
@@ -63,8 +81,7 @@ def show_courses_by_category(category_slug):
     )
 
     if should_attach_entry_state(api_id(), session):
-        for course in courses:
-            attach_entry_state(course)
+        courses = attach_entry_states(courses)
 
     return render_with_globals(
         'courses',
@@ -77,18 +94,18 @@ def show_courses_by_category(category_slug):
 
 
 @courses.route('/courses/<slug>')
+# Only dropped when the course or its lessons change.
+@cached_page()
 @wrap_errors
 def find_courses_by_slug(slug):
     course = contentful().course(slug, api_id(), locale().code)
     lessons = course.lessons if 'lessons' in course.fields(locale().code) else []
 
-    visited_lessons = session.get('visited_lessons', [])
-    if course.id not in visited_lessons:
-        visited_lessons.append(course.id)
-    session['visited_lessons'] = visited_lessons
+    visited_lessons = mark_as_visited(course.id)
+    vary_on_visited_lessons(course.id, visited_ids(course, lessons))
 
     if should_attach_entry_state(api_id(), session):
-        attach_entry_state(course)
+        course = attach_entry_state(course)
 
     return render_with_globals(
         'course',
@@ -108,29 +125,22 @@ def course_by_slug_lessons_route(slug):
 
 
 @courses.route('/courses/<course_slug>/lessons/<lesson_slug>')
+# Only dropped when the course or its lessons change.
+@cached_page()
 @wrap_errors
 def find_lesson_by_slug(course_slug, lesson_slug):
     course = contentful().course(course_slug, api_id(), locale().code)
     lessons = course.lessons if 'lessons' in course.fields(locale().code) else []
 
-    lesson = None
-    for l in lessons:
-        if l.slug == lesson_slug:
-            lesson = l
-            break
-    if lesson is None:
-        raise EntryNotFoundError('errorMessage404Lesson')
+    lesson = contentful().lesson(course, lesson_slug, api_id(), locale().code)
 
-    visited_lessons = session.get('visited_lessons', [])
-    if lesson.id not in visited_lessons:
-        visited_lessons.append(lesson.id)
-    session['visited_lessons'] = visited_lessons
+    visited_lessons = mark_as_visited(lesson.id)
+    vary_on_visited_lessons(lesson.id, visited_ids(course, lessons))
 
     next_lesson = find_next_lesson(lessons, lesson.slug)
 
     if should_attach_entry_state(api_id(), session):
-        attach_entry_state(course)
-        attach_entry_state(lesson)
+        course, lesson = attach_entry_states([course, lesson])
 
     return render_with_globals(
         'course',
@@ -150,6 +160,12 @@ def find_lesson_by_slug(course_slug, lesson_slug):
     )
 
 
+def visited_ids(course, lessons):
+    """Returns the IDs whose visited state the table of contents shows."""
+
+    return [course.id] + [lesson.id for lesson in lessons]
+
+
 def find_next_lesson(lessons, lesson_slug=None):
     if lesson_slug is None:
         return lessons[0] if len(lessons) > 0 else None
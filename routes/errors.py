@@ -6,6 +6,7 @@ from werkzeug.exceptions import NotFound
 from contentful.errors import HTTPError, EntryNotFoundError
 
 from routes.base import render_with_globals
+from services.concurrency import UpstreamTimeoutError
 
 
 def wrap_errors(route_fn):
@@ -17,6 +18,8 @@ def wrap_errors(route_fn):
             return render_entry_error(404, e, traceback.format_exc())
         except HTTPError as e:
             return render_error(e.status_code, e, traceback.format_exc())
+        except UpstreamTimeoutError as e:
+            return render_error(504, e, traceback.format_exc())
         except NotFound as e:
             return render_error(404, e, traceback.format_exc(), from_contentful=False)
         except Exception as e:
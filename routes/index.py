@@ -7,6 +7,7 @@ from routes.base import locale, \
                         raw_breadcrumbs, \
                         VIEWS_PATH
 from routes.errors import wrap_errors
+from routes.page_cache import cached_page
 from lib.breadcrumbs import refine
 from lib.entry_state import should_attach_entry_state, \
                             attach_entry_state
@@ -16,12 +17,13 @@ index = Blueprint('index', __name__, template_folder=VIEWS_PATH)
 
 
 @index.route('/')
+@cached_page(content_types=['layout'])
 @wrap_errors
 def show_index():
     landing_page = contentful().landing_page('home', api_id(), locale().code)
 
     if should_attach_entry_state(api_id(), session):
-        attach_entry_state(landing_page)
+        landing_page = attach_entry_state(landing_page)
 
     return render_with_globals(
         'landingPage',
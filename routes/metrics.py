@@ -0,0 +1,17 @@
+from flask import Blueprint, Response, abort
+
+from lib.metrics import registry
+
+
+metrics = Blueprint('metrics', __name__)
+
+
+@metrics.route('/metrics')
+def show_metrics():
+    """Serves request, phase and upstream query histograms,
+    in-flight requests and cache hit ratios to Prometheus.
+    """
+
+    if not registry.enabled:
+        abort(404)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
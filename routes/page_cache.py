@@ -0,0 +1,197 @@
+import hashlib
+from functools import wraps
+from os import environ
+from flask import g, make_response, request, session
+
+from lib.cache import LRUCache
+from routes.base import api_id, \
+                        space_id, \
+                        delivery_token, \
+                        preview_token, \
+                        visited_lessons, \
+                        mark_as_visited, \
+                        REJECTED_QUERY_KEYS
+from services.contentful import resource_ids, entity_tag, content_type_tag
+
+
+PAGE_CACHE_TTL = 60
+PAGE_CACHE_MAX_SIZE = 1024
+PAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CachedPage(object):
+    """Rendered page body with its strong ETag."""
+
+    __slots__ = ('body', 'etag')
+
+    def __init__(self, body):
+        self.body = body.encode('utf-8')
+        self.etag = hashlib.sha1(self.body).hexdigest()
+
+    def __len__(self):
+        return len(self.body)
+
+
+class VisitedVariants(object):
+    """Course and lesson IDs whose visited state changes a page,
+    and the ID the page marks as visited.
+    """
+
+    __slots__ = ('visited_id', 'entry_ids')
+
+    def __init__(self, visited_id, entry_ids):
+        self.visited_id = visited_id
+        self.entry_ids = frozenset(entry_ids)
+
+    def __len__(self):
+        return len(self.entry_ids) * 64
+
+
+# Pages are only cached once enabled through `configure_page_cache`.
+PAGE_CACHE = LRUCache(
+    max_size=PAGE_CACHE_MAX_SIZE,
+    ttl=PAGE_CACHE_TTL,
+    max_bytes=PAGE_CACHE_MAX_BYTES
+)
+page_cache_enabled = False
+
+
+def configure_page_cache(enabled=False, ttl=None, max_size=None,
+                         max_bytes=None):
+    """Enables the rendered page cache and updates its limits.
+
+    :param enabled: When False, pages are rendered on every request.
+    :param ttl: (optional) Seconds pages are cached for.
+    :param max_size: (optional) Maximum amount of cached pages.
+    :param max_bytes: (optional) Maximum total size of the cached pages.
+    """
+
+    global page_cache_enabled
+    page_cache_enabled = enabled
+    PAGE_CACHE.configure(max_size=max_size, ttl=ttl, max_bytes=max_bytes)
+
+
+def vary_on_visited_lessons(visited_id, entry_ids):
+    """Declares the page output depends on which of entry_ids were visited.
+    Must be called by cached routes marking visited_id as visited,
+    so cache hits can mark it as well.
+
+    :param visited_id: ID marked as visited by the route.
+    :param entry_ids: IDs whose visited state is rendered.
+    """
+
+    g.visited_variants = VisitedVariants(visited_id, entry_ids)
+
+
+def cached_page(content_types=None):
+    """Serves the decorated route from the rendered page cache when enabled.
+    Pages vary by path, query string, editorial features and credentials,
+    and are dropped when an entry they render, or an entry of one of
+    content_types, changes. Responses carry strong ETags and conditional
+    requests are answered with 304s without rendering.
+
+    :param content_types: (optional) Content types whose new entries
+                          might show up in the page.
+
+    Usage:
+
+        >>> @courses.route('/courses')
+        >>> @cached_page(content_types=['course', 'category'])
+        >>> @wrap_errors
+        >>> def show_courses():
+        >>>     ...
+    """
+
+    def decorator(route_fn):
+        @wraps(route_fn)
+        def decorated_function(*args, **kwargs):
+            if not page_cache_enabled or request.method != 'GET':
+                return route_fn(*args, **kwargs)
+
+            key = page_key()
+            variants = PAGE_CACHE.get(('variants', key), None)
+            if variants is not None:
+                mark_as_visited(variants.visited_id)
+            page = PAGE_CACHE.get((key, visited_key(variants)), None)
+            if page is not None:
+                return page_response(page)
+
+            generation = PAGE_CACHE.generation
+            result = route_fn(*args, **kwargs)
+            if not isinstance(result, str):
+                return result
+
+            page = CachedPage(result)
+            tags = page_tags(content_types or [])
+            variants = getattr(g, 'visited_variants', None)
+            if variants is not None:
+                PAGE_CACHE.set(
+                    ('variants', key),
+                    variants,
+                    tags=tags,
+                    generation=generation
+                )
+            PAGE_CACHE.set(
+                (key, visited_key(variants)),
+                page,
+                tags=tags,
+                generation=generation
+            )
+            return page_response(page)
+        return decorated_function
+    return decorator
+
+
+def page_key():
+    """Returns the canonical cache key of the current page.
+    Settings passed as query parameters are left out, the
+    credentials and session state they change are keyed on instead.
+    """
+
+    credentials = '\0'.join(str(value) for value in [
+        space_id(),
+        delivery_token(),
+        preview_token(),
+        environ.get('CONTENTFUL_HOST', None)
+    ])
+    return (
+        request.path,
+        tuple(sorted(
+            (key, value)
+            for key, value in request.args.items(multi=True)
+            if key not in REJECTED_QUERY_KEYS
+        )),
+        bool(session.get('editorial_features', False)),
+        hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+    )
+
+
+def visited_key(variants):
+    """Returns the key part for the visited state the current page renders."""
+
+    if variants is None:
+        return None
+    return visited_lessons().intersection(variants.entry_ids)
+
+
+def page_tags(content_types):
+    """Returns the cache tags for the entries rendered in this request."""
+
+    current_space_id = space_id()
+    current_api_id = api_id()
+    return [
+        entity_tag(current_space_id, entity_id, current_api_id)
+        for entity_id in resource_ids(getattr(g, 'rendered_resources', []))
+    ] + [
+        content_type_tag(current_space_id, content_type_id, current_api_id)
+        for content_type_id in content_types
+    ]
+
+
+def page_response(page):
+    """Returns a response for a cached page, or a 304 if the client has it."""
+
+    response = make_response(page.body)
+    response.set_etag(page.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
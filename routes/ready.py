@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+
+from lib.warmup import state
+
+
+ready = Blueprint('ready', __name__)
+
+
+@ready.route('/ready')
+def show_readiness():
+    """Reports whether this process finished warming up,
+    answering 503 until then so load balancers hold traffic back.
+    """
+
+    stats = state.stats()
+    return jsonify(**stats), 200 if stats['ready'] else 503
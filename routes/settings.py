@@ -5,6 +5,7 @@ from routes.base import locale, \
                         api_id, \
                         contentful, \
                         update_session_for, \
+                        clear_request_cache, \
                         render_with_globals, \
                         VIEWS_PATH, \
                         check_errors, \
@@ -86,6 +87,7 @@ def reset_settings():
     session.pop('delivery_token', None)
     session.pop('preview_token', None)
     session.pop('editorial_features', None)
+    clear_request_cache()
 
     space = contentful().space(api_id())
 
@@ -115,3 +117,4 @@ def restore_session_to_last_valid_values():
         'last_valid_preview_token',
         environ.get('CONTENTFUL_PREVIEW_TOKEN')
     )
+    clear_request_cache()
@@ -0,0 +1,61 @@
+import hmac
+from flask import Blueprint, current_app, jsonify, request
+
+from services.contentful import Contentful
+
+
+SECRET_HEADER = 'X-Contentful-Webhook-Secret'
+TOPIC_HEADER = 'X-Contentful-Topic'
+# APIs whose content each action changes. Saving only changes drafts,
+# served by the Preview API. Publishing changes both, as preview pages
+# show whether entries are published.
+INVALIDATING_ACTIONS = {
+    'save': ['cpa'],
+    'auto_save': ['cpa'],
+    'publish': ['cda', 'cpa'],
+    'unpublish': ['cda', 'cpa'],
+    'archive': ['cda', 'cpa'],
+    'unarchive': ['cda', 'cpa'],
+    'delete': ['cda', 'cpa']
+}
+
+
+webhooks = Blueprint('webhooks', __name__)
+
+
+@webhooks.route('/webhooks/contentful', methods=['POST'])
+def receive_contentful_webhook():
+    """Drops cached content referencing the changed entry or asset.
+
+    Expects the secret configured as `CONTENTFUL_WEBHOOK_SECRET`
+    in the `X-Contentful-Webhook-Secret` header.
+    """
+
+    secret = current_app.config.get('CONTENTFUL_WEBHOOK_SECRET', None)
+    if not secret:
+        return jsonify(error='Webhooks are not configured'), 404
+    if not hmac.compare_digest(
+        request.headers.get(SECRET_HEADER, '').encode('utf-8'),
+        secret.encode('utf-8')
+    ):
+        return jsonify(error='Invalid webhook secret'), 401
+
+    action = request.headers.get(TOPIC_HEADER, '').split('.')[-1]
+    if action not in INVALIDATING_ACTIONS:
+        return jsonify(invalidated=0)
+
+    payload = request.get_json(force=True, silent=True)
+    sys = payload.get('sys', {}) if isinstance(payload, dict) else {}
+    entity_id = sys.get('id', None)
+    space_id = sys.get('space', {}).get('sys', {}).get('id', None)
+    if not entity_id or not space_id:
+        return jsonify(error='Invalid webhook payload'), 400
+
+    content_type_id = sys.get('contentType', {}).get('sys', {}).get('id', None)
+    invalidated = Contentful.invalidate(
+        space_id,
+        entity_ids=[entity_id],
+        content_type_ids=[content_type_id] if content_type_id else [],
+        api_ids=INVALIDATING_ACTIONS[action]
+    )
+    return jsonify(invalidated=invalidated)
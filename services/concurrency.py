@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from lib.metrics import current_timings, set_current_timings
+from services.upstream import current_recorder, set_current_recorder
+
+
+# Matches the default amount of gunicorn threads, see gunicorn_config.py,
+# so every request thread can have a query running.
+UPSTREAM_WORKERS = 100
+UPSTREAM_TIMEOUT = 10
+
+
+class UpstreamTimeoutError(Exception):
+    """Raised when upstream calls do not finish in time."""
+
+    def __init__(self, timeout):
+        self.message = 'Contentful did not answer within {0} seconds.'.format(
+            timeout
+        )
+        super(UpstreamTimeoutError, self).__init__(self.message)
+
+
+# Bounded, so a burst of requests can't open unlimited upstream connections.
+_executor = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS)
+_worker_state = threading.local()
+upstream_timeout = UPSTREAM_TIMEOUT
+
+
+def configure_concurrency(max_workers=None, timeout=None):
+    """Configures the upstream call thread pool.
+
+    :param max_workers: (optional) Maximum amount of concurrent upstream calls.
+    :param timeout: (optional) Seconds to wait for upstream calls.
+    """
+
+    global _executor, upstream_timeout
+    if max_workers is not None:
+        previous = _executor
+        _executor = ThreadPoolExecutor(max_workers=max_workers)
+        previous.shutdown(wait=False)
+    if timeout is not None:
+        upstream_timeout = timeout
+
+
+def concurrently(*calls, timeout=None, cached=None):
+    """Runs independent upstream calls at the same time.
+    Calls run outside of the request context, so their arguments must be
+    resolved beforehand. Exceptions raised by a call are re-raised as is.
+    Calls served from memory run inline, as handing them to the pool
+    would only add a wait for a free thread, and so do calls no pool
+    thread picked up by the time their result is needed.
+
+    :param calls: Callables without arguments.
+    :param timeout: (optional) Seconds to wait for each call a pool
+                    thread runs, from when it started, defaults to the
+                    configured upstream timeout.
+    :param cached: (optional) List of booleans telling for each call
+                   whether its result is already cached.
+    :return: List with the result of each call.
+    :raises UpstreamTimeoutError: If calls do not finish in time.
+
+    Usage:
+
+        >>> courses, categories = concurrently(
+        >>>     partial(service.courses, 'cda', 'en-US'),
+        >>>     partial(service.categories, 'cda', 'en-US'),
+        >>>     cached=[service.is_indexed('courses', 'cda', 'en-US'), False]
+        >>> )
+    """
+
+    if timeout is None:
+        timeout = upstream_timeout
+    if cached is None:
+        cached = [False] * len(calls)
+
+    # Nested calls run inline,
+    # waiting on the pool from a worker could deadlock.
+    pooled = [index for index, call in enumerate(calls) if not cached[index]]
+    if len(pooled) < 2 or getattr(_worker_state, 'active', False):
+        return [call() for call in calls]
+
+    timings = current_timings()
+    recorder = current_recorder()
+    runs = {index: _Run() for index in pooled}
+    futures = {
+        index: _executor.submit(
+            _run_in_worker, calls[index], timings, recorder, runs[index]
+        )
+        for index in pooled
+    }
+    try:
+        results = [
+            None if index in futures else call()
+            for index, call in enumerate(calls)
+        ]
+        for index, future in futures.items():
+            if future.cancel():
+                # No pool thread was free, this thread runs the call instead.
+                results[index] = calls[index]()
+                continue
+            if not runs[index].started.wait(timeout):
+                raise TimeoutError()
+            deadline = runs[index].started_at + timeout
+            results[index] = future.result(
+                timeout=max(0, deadline - time.monotonic())
+            )
+        return results
+    except TimeoutError:
+        raise UpstreamTimeoutError(timeout)
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+class _Run(object):
+    """When a pooled call started running."""
+
+    __slots__ = ('started', 'started_at')
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.started_at = None
+
+
+def _run_in_worker(call, timings=None, recorder=None, run=None):
+    if run is not None:
+        run.started_at = time.monotonic()
+        run.started.set()
+    _worker_state.active = True
+    set_current_timings(timings)
+    set_current_recorder(recorder)
+    try:
+        return call()
+    finally:
+        _worker_state.active = False
+        set_current_timings(None)
+        set_current_recorder(None)
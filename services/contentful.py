@@ -1,5 +1,224 @@
-from contentful import Client
-from contentful.errors import EntryNotFoundError
+import hashlib
+import requests
+from requests.adapters import HTTPAdapter
+from functools import partial
+from contentful import Client, Entry, Asset
+from contentful.array import Array
+from contentful.errors import HTTPError, EntryNotFoundError, \
+                             RateLimitExceededError
+from contentful.resource import Link
+
+from lib.cache import LRUCache, invalidate_tags
+from lib.metrics import timed
+from services import concurrency
+from services.indexes import EntryIndex, CourseIndex
+from services.mirror import ContentMirror, SYNC_INTERVAL
+from services.revisions import RevisionIndex, PublishedRevision
+from services.upstream import record_upstream_call
+
+
+# Delivery and Preview API, as selected in the settings.
+API_IDS = ('cda', 'cpa')
+MAX_IDS_PER_QUERY = 100
+# The largest page the Delivery API serves,
+# indexes page through larger collections.
+MAX_ENTRIES_PER_QUERY = 1000
+METADATA_CACHE_TTL = 300
+METADATA_CACHE_MAX_SIZE = 64
+INDEX_TTL = 60
+INDEX_MAX_SIZE = 256
+INDEX_MAX_STALE = 300
+POOL_MAX_SIZE = 32
+POOL_IDLE_TIMEOUT = 1800
+# Matches the default amount of gunicorn threads, see gunicorn_config.py.
+POOL_CONNECTIONS = 100
+VALIDATION_TTL = 300
+VALIDATION_ERROR_TTL = 30
+VALIDATION_CACHE_MAX_SIZE = 256
+
+# Shared across service instances, as locales and space metadata
+# only depend on the space, the API and the host they come from.
+METADATA_CACHE = LRUCache(
+    max_size=METADATA_CACHE_MAX_SIZE,
+    ttl=METADATA_CACHE_TTL
+)
+
+# Slug and ID indexes per space, API, host and locale, shared across
+# service instances. Expired indexes are served while being rebuilt
+# from a fresh query in the background.
+INDEX_CACHE = LRUCache(
+    max_size=INDEX_MAX_SIZE,
+    ttl=INDEX_TTL,
+    max_stale=INDEX_MAX_STALE
+)
+
+# Services are kept per credentials and host, so visitors using custom
+# credentials don't force rebuilding the clients of everybody else.
+SERVICE_POOL = LRUCache(
+    max_size=POOL_MAX_SIZE,
+    ttl=POOL_IDLE_TIMEOUT,
+    sliding=True
+)
+
+# API clients per credentials, API and host, shared by pooled services
+# and credential validation. Building a client already queries the API.
+CLIENT_POOL = LRUCache(
+    max_size=POOL_MAX_SIZE * 2,
+    ttl=POOL_IDLE_TIMEOUT,
+    sliding=True
+)
+
+# Credential validation results, keyed by a digest of the credentials.
+# Failed validations are kept for a shorter time, see VALIDATION_ERROR_TTL.
+VALIDATION_CACHE = LRUCache(
+    max_size=VALIDATION_CACHE_MAX_SIZE,
+    ttl=VALIDATION_TTL
+)
+
+_MISSING = object()
+
+
+def entity_tag(space_id, entity_id, api_id):
+    """Returns the cache tag for an entry or asset served by an API."""
+
+    return ('entity', space_id, _served_by(api_id), entity_id)
+
+
+def content_type_tag(space_id, content_type_id, api_id):
+    """Returns the cache tag for entries of a content type served by an API."""
+
+    return ('content_type', space_id, _served_by(api_id), content_type_id)
+
+
+def _served_by(api_id):
+    """Unknown API IDs are served by the Delivery API, see `client`."""
+
+    return 'cpa' if api_id == 'cpa' else 'cda'
+
+
+# Published revisions seen in Delivery API responses, to tell drafts and
+# pending changes apart without querying the Delivery API for every
+# preview page. Dropped along with cached content referencing them.
+REVISION_INDEX = RevisionIndex(tag_for=partial(entity_tag, api_id='cda'))
+
+
+def resource_ids(resources):
+    """Returns the IDs of resources and of every entry or asset they link to,
+    including links that could not be resolved.
+
+    :param resources: Entry, Asset or list of them.
+    :return: Set of IDs.
+    """
+
+    ids = set()
+    visited = set()
+    pending = [resources]
+    while pending:
+        resource = pending.pop()
+        if isinstance(resource, (list, Array)):
+            pending.extend(resource)
+        elif isinstance(resource, Link):
+            ids.add(resource.id)
+        elif (isinstance(resource, (Entry, Asset)) and
+              resource.id not in visited):
+            visited.add(resource.id)
+            ids.add(resource.id)
+            if isinstance(resource, Entry):
+                ids.update(_raw_link_ids(resource.raw.get('fields', {})))
+                pending.extend(resource.fields().values())
+    return ids
+
+
+def credentials_digest(space_id, access_token, is_preview=False, host=None):
+    """Returns a digest identifying credentials, to key cached results by."""
+
+    credentials = '\0'.join([
+        space_id or '',
+        access_token or '',
+        'cpa' if is_preview else 'cda',
+        host or ''
+    ])
+    return hashlib.sha256(credentials.encode('utf-8')).hexdigest()
+
+
+def upstream_query_name(url, query):
+    """Returns the name of a Contentful query for metrics: the queried
+    resource type, with the queried content type if any.
+
+    Usage:
+
+        >>> upstream_query_name(
+        ...     '/environments/master/entries',
+        ...     {'content_type': 'course'}
+        ... )
+        'entries:course'
+    """
+
+    path = url.strip('/').split('/')
+    if path[0] == 'environments':
+        path = path[2:]
+    name = path[0] if path and path[0] else 'space'
+    content_type = query.get('content_type', None)
+    if content_type is not None:
+        name = '{0}:{1}'.format(name, content_type)
+    return name
+
+
+def _raw_link_ids(raw_fields):
+    ids = []
+    for value in raw_fields.values():
+        for candidate in value if isinstance(value, list) else [value]:
+            if (
+                isinstance(candidate, dict) and
+                candidate.get('sys', {}).get('type', None) == 'Link'
+            ):
+                ids.append(candidate['sys']['id'])
+    return ids
+
+
+class KeepAliveClient(Client):
+    """Contentful client reusing HTTP connections between requests.
+
+    :param timeout: (optional) Seconds to wait for the API to answer.
+    :param connections: (optional) Maximum amount of HTTP connections kept
+                        alive, requests running in threads share them.
+    """
+
+    def __init__(self, *args, timeout=None, connections=POOL_CONNECTIONS,
+                 **kwargs):
+        self.http_session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=connections)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        self.timeout = timeout
+        super(KeepAliveClient, self).__init__(*args, **kwargs)
+
+    def _http_get(self, url, query):
+        """Performs the HTTP GET Request through the client's session."""
+
+        if not self.authorization_as_header:
+            query.update({'access_token': self.access_token})
+
+        self._normalize_query(query)
+
+        kwargs = {
+            'params': query,
+            'headers': self._request_headers(),
+            'timeout': self.timeout
+        }
+
+        if self._has_proxy():
+            kwargs['proxies'] = self._proxy_parameters()
+
+        name = upstream_query_name(url, query)
+        record_upstream_call(self._url(url), name, query, self.access_token)
+        with timed('contentful', query=name):
+            response = self.http_session.get(self._url(url), **kwargs)
+
+        if response.status_code == 429:
+            raise RateLimitExceededError(response)
+
+        return response
 
 
 class Contentful(object):
@@ -7,23 +226,201 @@ class Contentful(object):
     Allows to run queries against either API.
     """
 
+    mirror_enabled = False
+    mirror_sync_interval = SYNC_INTERVAL
+    pool_connections = POOL_CONNECTIONS
+    validation_error_ttl = VALIDATION_ERROR_TTL
+
+    @classmethod
+    def configure_mirror(klass, enabled=False, sync_interval=None):
+        """Configures serving entries from local mirrors kept
+        up to date through the Sync API, instead of querying the APIs.
+        Only affects services created afterwards.
+
+        :param enabled: Whether entry queries are answered locally.
+        :param sync_interval: (optional) Seconds between syncs.
+        """
+
+        klass.mirror_enabled = enabled
+        if sync_interval is not None:
+            klass.mirror_sync_interval = sync_interval
+
+    @classmethod
+    def configure_metadata_cache(klass, ttl=None, max_size=None):
+        """Configures the locales and space metadata cache.
+
+        :param ttl: (optional) Time to live in seconds.
+        :param max_size: (optional) Maximum amount of cached responses.
+        """
+
+        METADATA_CACHE.configure(max_size=max_size, ttl=ttl)
+
+    @classmethod
+    def configure_validation_cache(klass, ttl=None, error_ttl=None,
+                                   max_size=None):
+        """Configures the credential validation cache.
+
+        :param ttl: (optional) Seconds valid credentials are not
+                    re-validated for.
+        :param error_ttl: (optional) Seconds invalid credentials are not
+                          re-validated for.
+        :param max_size: (optional) Maximum amount of cached validations.
+        """
+
+        VALIDATION_CACHE.configure(max_size=max_size, ttl=ttl)
+        if error_ttl is not None:
+            klass.validation_error_ttl = error_ttl
+
+    @classmethod
+    def configure_revision_index(klass, ttl=None, max_size=None):
+        """Configures the index of published revisions.
+
+        :param ttl: (optional) Seconds before a revision is queried again.
+        :param max_size: (optional) Maximum amount of indexed entries
+                         and assets.
+        """
+
+        REVISION_INDEX.configure(max_size=max_size, ttl=ttl)
+
+    @classmethod
+    def configure_index(klass, ttl=None, max_size=None, max_stale=None):
+        """Configures the course, category and landing page indexes.
+        Expired indexes keep being served while they are rebuilt
+        in the background, for at most max_stale seconds.
+
+        :param ttl: (optional) Seconds before an index is rebuilt.
+        :param max_size: (optional) Maximum amount of cached indexes.
+        :param max_stale: (optional) Seconds an expired index can be
+                          served for.
+        """
+
+        INDEX_CACHE.configure(max_size=max_size, ttl=ttl, max_stale=max_stale)
+
+    @classmethod
+    def configure_pool(klass, max_size=None, idle_timeout=None,
+                       connections=None):
+        """Configures the service pool.
+
+        :param max_size: (optional) Maximum amount of pooled services.
+        :param idle_timeout: (optional) Seconds after which unused services
+                             are dropped.
+        :param connections: (optional) Maximum amount of HTTP connections
+                            kept alive per API client. Only affects
+                            services created afterwards.
+        """
+
+        SERVICE_POOL.configure(max_size=max_size, ttl=idle_timeout)
+        CLIENT_POOL.configure(
+            max_size=None if max_size is None else max_size * 2,
+            ttl=idle_timeout
+        )
+        if connections is not None:
+            klass.pool_connections = connections
+
+    @classmethod
+    def pool_stats(klass):
+        """Returns the service pool metrics.
+        Hits are reused services, misses are services built.
+        """
+
+        return SERVICE_POOL.stats()
+
+    @classmethod
+    def invalidate(klass, space_id, entity_ids=None, content_type_ids=None,
+                   api_ids=API_IDS):
+        """Drops cached content referencing entries, assets or content types
+        of a space. Local mirrors of the space sync before answering the
+        next query, so rebuilt indexes include the changes.
+
+        :param space_id: Space the changes belong to.
+        :param entity_ids: (optional) Changed entry or asset IDs.
+        :param content_type_ids: (optional) Content types with changed entries.
+        :param api_ids: (optional) APIs serving the changes, both by default.
+        :return: Amount of dropped cache entries.
+        """
+
+        for service in SERVICE_POOL.values():
+            if service.space_id != space_id:
+                continue
+            for api_id, mirror in service.mirrors.items():
+                if api_id in api_ids:
+                    mirror.mark_changed()
+
+        tags = [
+            entity_tag(space_id, entity_id, api_id)
+            for api_id in api_ids
+            for entity_id in entity_ids or []
+        ] + [
+            content_type_tag(space_id, content_type_id, api_id)
+            for api_id in api_ids
+            for content_type_id in content_type_ids or []
+        ]
+        return invalidate_tags(tags)
+
     @classmethod
     def instance(klass, space_id, delivery_token, preview_token, host=None):
         """Returns an instance of the Contentful service.
-        Only changes the instance if different credentials are sent.
+        Instances are pooled per credentials and host, and only built
+        once per combination, even under concurrent requests.
+        """
+
+        return SERVICE_POOL.fetch(
+            (klass, space_id, delivery_token, preview_token, host),
+            lambda: klass(space_id, delivery_token, preview_token, host)
+        )
+
+    @classmethod
+    def pooled_client(klass, space_id, access_token, is_preview=False,
+                      host=None):
+        """Returns a Contentful Delivery or Preview API client,
+        reused for the same credentials and host.
+        """
+
+        return CLIENT_POOL.fetch(
+            (klass, space_id, access_token, is_preview, host),
+            lambda: klass.create_client(
+                space_id,
+                access_token,
+                is_preview,
+                host
+            )
+        )
+
+    @classmethod
+    def validate(klass, space_id, access_token, is_preview=False, host=None):
+        """Checks if an access token grants access to a space.
+        Results are cached, and validation reuses pooled clients.
+
+        :return: None if valid, the HTTP status code of the failure otherwise.
+
+        Usage:
+
+            >>> Contentful.validate('cfexampleapi', 'invalid')
+            401
         """
 
-        if '_instance' not in klass.__dict__:
-            klass._instance = None
+        key = credentials_digest(space_id, access_token, is_preview, host)
+        status_code = VALIDATION_CACHE.get(key, _MISSING)
+        if status_code is not _MISSING:
+            return status_code
 
-        if (
-              klass._instance is None or
-              klass._instance.space_id != space_id or
-              klass._instance.delivery_token != delivery_token or
-              klass._instance.preview_token != preview_token
-           ):
-            klass._instance = klass(space_id, delivery_token, preview_token, host)
-        return klass._instance
+        status_code = None
+        try:
+            credentials = (space_id, access_token, is_preview, host)
+            if (klass,) + credentials in CLIENT_POOL:
+                klass.pooled_client(*credentials).space()
+            else:
+                # Building the client is a request to the API already.
+                klass.pooled_client(*credentials)
+        except HTTPError as e:
+            status_code = e.status_code
+
+        VALIDATION_CACHE.set(
+            key,
+            status_code,
+            ttl=None if status_code is None else klass.validation_error_ttl
+        )
+        return status_code
 
     @classmethod
     def create_client(klass, space_id, access_token, is_preview=False, host=None):
@@ -40,7 +437,13 @@ class Contentful(object):
         if is_preview:
             options['api_url'] = 'preview.{0}.com'.format(host)
 
-        return Client(space_id, access_token, **options)
+        return KeepAliveClient(
+            space_id,
+            access_token,
+            timeout=concurrency.upstream_timeout,
+            connections=klass.pool_connections,
+            **options
+        )
 
     def client(self, api_id):
         """Returns the Delivery or Preview API client."""
@@ -49,78 +452,278 @@ class Contentful(object):
             return self.preview_client
         return self.delivery_client
 
+    def entries_source(self, api_id):
+        """Returns the source for entry queries on the selected API.
+        The local mirror when enabled, the API client otherwise.
+        """
+
+        if not self.mirrors:
+            return self.client(api_id)
+
+        mirror = self.mirrors['cpa' if api_id == 'cpa' else 'cda']
+        mirror.ensure_synced()
+        return mirror
+
     def space(self, api_id):
         """Returns the current space."""
 
-        return self.client(api_id).space()
+        return METADATA_CACHE.fetch(
+            self._cache_key('space', api_id),
+            lambda: self.client(api_id).space()
+        )
 
     def locales(self, api_id):
         """Returns the available locales."""
 
-        return self.client(api_id).locales()
+        return METADATA_CACHE.fetch(
+            self._cache_key('locales', api_id),
+            lambda: self.client(api_id).locales()
+        )
 
     def courses(self, api_id, locale, options=None):
-        """Fetches all courses."""
-
-        if options is None:
-            options = {}
+        """Fetches all courses.
+        Without options, courses are served from the course index.
+        """
 
-        query = {
-            'content_type': 'course',
-            'locale': locale,
-            'order': '-sys.createdAt',
-            'include': 6
-        }
-        query.update(options)
+        if not options:
+            return self.course_index(api_id, locale).entries
 
-        return self.client(api_id).entries(query)
+        return self._query_courses(api_id, locale, options)
 
     def course(self, slug, api_id, locale):
         """Fetches a course by slug."""
 
-        courses = self.courses(api_id, locale, {
-            'fields.slug': slug
-        })
-        if courses:
-            return courses[0]
+        course = self.course_index(api_id, locale).by_slug.get(slug, None)
+        if course is not None:
+            return course
         raise EntryNotFoundError('errorMessage404Course')
 
+    def lesson(self, course, slug, api_id, locale):
+        """Fetches a lesson of a course by slug."""
+
+        lesson = self.course_index(api_id, locale).lessons.get(
+            (course.id, slug),
+            None
+        )
+        if lesson is not None:
+            return lesson
+        raise EntryNotFoundError('errorMessage404Lesson')
+
     def courses_by_category(self, category_id, api_id, locale):
         """Fetches all courses for a category."""
 
-        return self.courses(
-            api_id,
-            locale,
-            {'fields.categories.sys.id': category_id}
+        return self.course_index(api_id, locale).by_category.get(
+            category_id,
+            []
         )
 
     def categories(self, api_id, locale):
         """Fetches all categories."""
 
-        return self.client(api_id).entries({
-            'content_type': 'category',
-            'locale': locale
-        })
+        return self.category_index(api_id, locale).entries
+
+    def category(self, slug, api_id, locale):
+        """Fetches a category by slug."""
+
+        category = self.category_index(api_id, locale).by_slug.get(slug, None)
+        if category is not None:
+            return category
+        raise EntryNotFoundError('errorMessage404Category')
 
     def landing_page(self, slug, api_id, locale):
         """Fetches a landing page by slug."""
 
-        pages = self.client(api_id).entries({
+        return INDEX_CACHE.fetch(
+            self._cache_key('layout', api_id, locale, slug),
+            lambda: self._query_landing_page(slug, api_id, locale),
+            tags=lambda page: self._tags(page, 'layout', api_id)
+        )
+
+    def course_index(self, api_id, locale):
+        """Returns the course index for the selected API and locale.
+        Rebuilt from every page of the course query once expired.
+        """
+
+        return INDEX_CACHE.fetch(
+            self._cache_key('courses', api_id, locale),
+            lambda: CourseIndex(self._query_courses(api_id, locale)),
+            tags=lambda index: self._tags(index.entries, 'course', api_id)
+        )
+
+    def is_indexed(self, resource, api_id, locale):
+        """Returns whether an index is served from memory, so fetching
+        it doesn't need an upstream worker.
+
+        :param resource: 'courses' or 'categories'.
+        """
+
+        return INDEX_CACHE.is_cached(self._cache_key(resource, api_id, locale))
+
+    def category_index(self, api_id, locale):
+        """Returns the category index for the selected API and locale.
+        Rebuilt from every page of the category query once expired.
+        """
+
+        return INDEX_CACHE.fetch(
+            self._cache_key('categories', api_id, locale),
+            lambda: EntryIndex(self._query_all(api_id, {
+                'content_type': 'category',
+                'locale': locale
+            })),
+            tags=lambda index: self._tags(index.entries, 'category', api_id)
+        )
+
+    def entry(self, entry_id, api_id):
+        """Fetches an entry by ID."""
+
+        return self._delivered(
+            api_id,
+            self.entries_source(api_id).entry(entry_id, {'include': 6})
+        )
+
+    def entries_by_id(self, entry_ids, api_id):
+        """Fetches all entries matching the given IDs.
+        IDs are batched in `sys.id[in]` queries of up to MAX_IDS_PER_QUERY,
+        run concurrently.
+        """
+
+        source = self.entries_source(api_id)
+        batches = [
+            entry_ids[start:start + MAX_IDS_PER_QUERY]
+            for start in range(0, len(entry_ids), MAX_IDS_PER_QUERY)
+        ]
+        results = concurrency.concurrently(*[
+            partial(source.entries, {
+                'sys.id[in]': ','.join(batch),
+                'include': 6,
+                'limit': len(batch)
+            })
+            for batch in batches
+        ])
+        return self._delivered(
+            api_id,
+            [entry for result in results for entry in result]
+        )
+
+    def published_revisions(self, entry_ids):
+        """Returns the published revision of entries, or None for
+        unpublished ones. Only entries missing from the revision index
+        are queried, in a single Delivery API query.
+
+        :param entry_ids: List of entry IDs.
+        :return: Dict of PublishedRevision or None by ID.
+        """
+
+        revisions, missing = REVISION_INDEX.lookup(
+            self.space_id,
+            self.host,
+            entry_ids
+        )
+        if not missing:
+            return revisions
+
+        delivered = {
+            entry.id: PublishedRevision(
+                entry.sys.get('revision', None),
+                entry.updated_at
+            )
+            for entry in self.entries_by_id(missing, 'cda')
+        }
+        unpublished = [
+            entry_id for entry_id in missing
+            if entry_id not in delivered
+        ]
+        REVISION_INDEX.record_unpublished(
+            self.space_id,
+            self.host,
+            unpublished
+        )
+
+        for entry_id in missing:
+            revisions[entry_id] = delivered.get(entry_id, None)
+        return revisions
+
+    def _query_courses(self, api_id, locale, options=None):
+        """Queries courses from the selected API.
+        Without options, every course is queried, page by page.
+        """
+
+        query = {
+            'content_type': 'course',
+            'locale': locale,
+            'order': '-sys.createdAt',
+            'include': 6
+        }
+        if options is None:
+            return self._query_all(api_id, query)
+
+        query.update(options)
+        return self._delivered(
+            api_id,
+            self.entries_source(api_id).entries(query)
+        )
+
+    def _query_all(self, api_id, query):
+        """Queries every entry matching query from the selected API,
+        paging through them MAX_ENTRIES_PER_QUERY at a time until the
+        total of the first page is reached.
+        """
+
+        source = self.entries_source(api_id)
+        entries = []
+        while True:
+            page = source.entries(dict(
+                query,
+                skip=len(entries),
+                limit=MAX_ENTRIES_PER_QUERY
+            ))
+            entries.extend(page)
+            total = getattr(page, 'total', len(entries))
+            if not page or len(entries) >= total:
+                return self._delivered(api_id, entries)
+
+    def _query_landing_page(self, slug, api_id, locale):
+        """Queries a landing page by slug from the selected API."""
+
+        pages = self._delivered(api_id, self.entries_source(api_id).entries({
             'content_type': 'layout',
             'locale': locale,
             'include': 6,
             'fields.slug': slug
-        })
+        }))
         if pages:
             return pages[0]
         raise EntryNotFoundError(
             'Landing Page not found for slug: {0}'.format(slug)
         )
 
-    def entry(self, entry_id, api_id):
-        """Fetches an entry by ID."""
+    def _delivered(self, api_id, resources):
+        """Indexes the revisions of Delivery API results, returning them."""
 
-        return self.client(api_id).entry(entry_id, {'include': 6})
+        if api_id != 'cpa':
+            REVISION_INDEX.record(self.space_id, self.host, resources)
+        return resources
+
+    def _tags(self, resources, content_type_id, api_id):
+        """Returns the cache tags for a query result, which is invalidated
+        when any resource in it or any entry of its content type changes
+        on the API it came from.
+        """
+
+        return [
+            entity_tag(self.space_id, entity_id, api_id)
+            for entity_id in resource_ids(resources)
+        ] + [content_type_tag(self.space_id, content_type_id, api_id)]
+
+    def _cache_key(self, resource, api_id, *args):
+        """Returns the cache key for a resource on the selected API."""
+
+        return (
+            resource,
+            self.space_id,
+            'cpa' if api_id == 'cpa' else 'cda',
+            self.host
+        ) + args
 
     def __init__(self, space_id, delivery_token, preview_token, host=None):
         self.space_id = space_id
@@ -128,14 +731,28 @@ class Contentful(object):
         self.preview_token = preview_token
         self.host = host
 
-        self.delivery_client = self.__class__.create_client(
+        self.delivery_client = self.__class__.pooled_client(
             space_id,
             delivery_token,
             host=host
         )
-        self.preview_client = self.__class__.create_client(
+        self.preview_client = self.__class__.pooled_client(
             space_id,
             preview_token,
             True,
             host=host
         )
+
+        self.mirrors = {}
+        if self.mirror_enabled:
+            self.mirrors = {
+                'cda': ContentMirror(
+                    self.delivery_client,
+                    self.mirror_sync_interval
+                ),
+                'cpa': ContentMirror(
+                    self.preview_client,
+                    self.mirror_sync_interval,
+                    delta_sync=False
+                )
+            }
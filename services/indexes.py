@@ -0,0 +1,48 @@
+class EntryIndex(object):
+    """Collection of entries with constant time slug and ID lookups.
+
+    :param entries: Entries of a single space, API and locale.
+
+    Usage:
+
+        >>> index = EntryIndex(client.entries({'content_type': 'category'}))
+        >>> index.by_slug['getting-started']
+        <Entry[category] id='...'>
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_slug = {}
+        self.by_id = {}
+
+        for entry in entries:
+            self.by_id[entry.id] = entry
+            slug = entry.fields().get('slug', None)
+            if slug is not None:
+                # Keep the first match, as a slug query would.
+                self.by_slug.setdefault(slug, entry)
+
+
+class CourseIndex(EntryIndex):
+    """Index of courses, also resolving courses by category ID
+    and lessons by course ID and lesson slug.
+
+    :param courses: Courses of a single space, API and locale.
+    """
+
+    def __init__(self, courses):
+        super(CourseIndex, self).__init__(courses)
+        self.by_category = {}
+        self.lessons = {}
+
+        for course in courses:
+            fields = course.fields()
+            for category in fields.get('categories', []):
+                self.by_category.setdefault(category.id, []).append(course)
+            for lesson in fields.get('lessons', []):
+                lesson_fields = getattr(lesson, 'fields', None)
+                if lesson_fields is None:
+                    continue
+                slug = lesson_fields().get('slug', None)
+                if slug is not None:
+                    self.lessons.setdefault((course.id, slug), lesson)
@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+import weakref
+
+from contentful.errors import EntryNotFoundError
+from contentful.resource_builder import ResourceBuilder
+
+
+SYNC_INTERVAL = 60
+DEFAULT_INCLUDE = 1
+DEFAULT_LIMIT = 100
+QUERY_OPTIONS = ['locale', 'include', 'order', 'skip', 'limit', 'select']
+
+log = logging.getLogger(__name__)
+
+
+class ContentMirror(object):
+    """Local copy of the entries and assets of a space, kept up to date
+    through the Sync API. Answers `entries` and `entry` queries like a
+    Contentful client does, resolving links from the local store.
+
+    :param client: Contentful client to sync from.
+    :param sync_interval: Seconds between background syncs.
+    :param delta_sync: When False, every sync is an initial sync,
+                       as the Preview API does not support delta syncs.
+    :param clock: Callable returning the current time in seconds.
+
+    Usage:
+
+        >>> mirror = ContentMirror(client)
+        >>> mirror.ensure_synced()
+        >>> mirror.entries({'content_type': 'course', 'locale': 'en-US'})
+        <Array size='2' total='2' limit='100' skip='0'>
+    """
+
+    def __init__(self, client, sync_interval=SYNC_INTERVAL, delta_sync=True,
+                 clock=time.monotonic):
+        self.client = client
+        self.sync_interval = sync_interval
+        self.delta_sync = delta_sync
+        self.clock = clock
+
+        self.sync_token = None
+        self.synced_at = None
+        self.last_error = None
+        self.changed = False
+
+        self._store = ({}, {})
+        self._default_locale = client.default_locale
+        self._fallbacks = {}
+        self._sync_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._stopped = None
+
+    def ensure_synced(self):
+        """Runs the initial sync if it did not happen yet, or a sync once
+        content changed, and makes sure background syncs are running in
+        this process.
+        """
+
+        if self.synced_at is None:
+            with self._sync_lock:
+                if self.synced_at is None:
+                    self._sync()
+        elif self.changed:
+            with self._sync_lock:
+                if self.changed:
+                    self.changed = False
+                    try:
+                        self._sync()
+                    except Exception as e:
+                        # Keep serving the last synced content.
+                        self.last_error = e
+                        log.warning('Contentful sync failed: %s', e)
+        self.start()
+
+    def mark_changed(self):
+        """Syncs on the next `ensure_synced`, as content changed."""
+
+        self.changed = True
+
+    def sync(self):
+        """Fetches changes since the last sync.
+        Fetches all content on the first one.
+        """
+
+        with self._sync_lock:
+            self._sync()
+
+    def start(self):
+        """Starts the background sync thread if it is not running."""
+
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(
+                target=_sync_periodically,
+                args=(weakref.ref(self), self._stopped, self.sync_interval),
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background sync thread."""
+
+        with self._thread_lock:
+            if self._stopped is not None:
+                self._stopped.set()
+            self._thread = None
+
+    def entries(self, query=None):
+        """Fetches entries matching query from the local store.
+
+        :param query: (optional) Dict with API options.
+        :return: List of :class:`Entry <contentful.entry.Entry>` objects.
+        """
+
+        if query is None:
+            query = {}
+
+        entries, assets = self._store
+        locale = query.get('locale', self._default_locale)
+
+        matches = []
+        for raw_entry in entries.values():
+            localized = self._localize(raw_entry, locale)
+            if self._matches(localized, query):
+                matches.append(localized)
+        self._sort(matches, query.get('order', None))
+
+        skip = int(query.get('skip', 0))
+        limit = int(query.get('limit', DEFAULT_LIMIT))
+        items = matches[skip:skip + limit]
+        includes, errors = self._includes(
+            items,
+            int(query.get('include', DEFAULT_INCLUDE)),
+            locale,
+            entries,
+            assets
+        )
+
+        json = {
+            'sys': {'type': 'Array'},
+            'total': len(matches),
+            'skip': skip,
+            'limit': limit,
+            'items': items,
+            'includes': includes
+        }
+        if errors:
+            json['errors'] = errors
+
+        return ResourceBuilder(
+            self.client.default_locale,
+            False,
+            json,
+            max_depth=self.client.max_include_resolution_depth
+        ).build()
+
+    def entry(self, entry_id, query=None):
+        """Fetches an entry by ID from the local store.
+
+        :param entry_id: The ID of the target Entry.
+        :param query: (optional) Dict with API options.
+        :return: :class:`Entry <contentful.entry.Entry>` object.
+        """
+
+        if query is None:
+            query = {}
+        query.update({'sys.id': entry_id})
+
+        try:
+            return self.entries(query)[0]
+        except IndexError:
+            raise EntryNotFoundError(
+                "Entry not found for ID: '{0}'".format(entry_id)
+            )
+
+    def _sync(self):
+        initial = self.sync_token is None or not self.delta_sync
+        if initial:
+            self._load_locales()
+            entries, assets = {}, {}
+            page = self.client.sync({'initial': True})
+        else:
+            entries, assets = (dict(store) for store in self._store)
+            page = self.client.sync({'sync_token': self.sync_token})
+
+        while True:
+            self._apply(page.raw.get('items', []), entries, assets)
+            if not page.next_page_url:
+                break
+            page = page.next(self.client)
+
+        # Swapping the whole store lets readers work without locking.
+        self._store = (entries, assets)
+        self.sync_token = page.next_sync_token
+        self.synced_at = self.clock()
+        self.last_error = None
+
+    def _load_locales(self):
+        fallbacks = {}
+        for locale in self.client.locales():
+            if locale.default:
+                self._default_locale = locale.code
+            fallbacks[locale.code] = locale.fallback_code or None
+        self._fallbacks = fallbacks
+
+    def _apply(self, items, entries, assets):
+        for item in items:
+            item_type = item['sys']['type']
+            item_id = item['sys']['id']
+            if item_type == 'Entry':
+                entries[item_id] = item
+            elif item_type == 'Asset':
+                assets[item_id] = item
+            elif item_type == 'DeletedEntry':
+                entries.pop(item_id, None)
+            elif item_type == 'DeletedAsset':
+                assets.pop(item_id, None)
+
+    def _localize(self, item, locale):
+        if locale not in self._fallbacks:
+            locale = self._default_locale
+
+        fields = {}
+        for name, values in item.get('fields', {}).items():
+            code = locale
+            while code is not None and code not in values:
+                code = self._fallbacks.get(code, None)
+            if code is not None:
+                fields[name] = values[code]
+
+        sys = dict(item['sys'])
+        sys['locale'] = locale
+        return {'sys': sys, 'fields': fields}
+
+    def _matches(self, resource, query):
+        for key, expected in query.items():
+            if key in QUERY_OPTIONS:
+                continue
+            if key == 'content_type':
+                key = 'sys.contentType.sys.id'
+
+            if key.endswith('[in]'):
+                key = key[:-len('[in]')]
+                expected = set(str(expected).split(','))
+            elif '[' in key:
+                raise ValueError(
+                    'Unsupported query operator for mirror: {0}'.format(key)
+                )
+            else:
+                expected = set([str(expected)])
+
+            values = _values_at(resource, key.split('.'))
+            if not any(str(value) in expected for value in values):
+                return False
+        return True
+
+    def _sort(self, resources, order):
+        if not order:
+            return
+
+        for key in reversed(order.split(',')):
+            reverse = key.startswith('-')
+            path = key.lstrip('-').split('.')
+            resources.sort(
+                key=lambda resource: str(
+                    next(iter(_values_at(resource, path)), '')
+                ),
+                reverse=reverse
+            )
+
+    def _includes(self, items, depth, locale, entries, assets):
+        includes = {'Entry': [], 'Asset': []}
+        errors = []
+        stores = {'Entry': entries, 'Asset': assets}
+        seen = set(('Entry', item['sys']['id']) for item in items)
+
+        frontier = items
+        for _ in range(depth):
+            next_frontier = []
+            for resource in frontier:
+                for link in _links(resource):
+                    link_type = link['sys']['linkType']
+                    link_id = link['sys']['id']
+                    if (link_type, link_id) in seen:
+                        continue
+                    seen.add((link_type, link_id))
+
+                    raw = stores.get(link_type, {}).get(link_id, None)
+                    if raw is None:
+                        errors.append({
+                            'sys': {'id': 'notResolvable', 'type': 'error'},
+                            'details': {
+                                'type': 'Link',
+                                'linkType': link_type,
+                                'id': link_id
+                            }
+                        })
+                        continue
+
+                    localized = self._localize(raw, locale)
+                    includes[link_type].append(localized)
+                    next_frontier.append(localized)
+            frontier = next_frontier
+
+        return includes, errors
+
+
+def _sync_periodically(mirror_ref, stopped, interval):
+    """Background sync loop, exits once the mirror is garbage collected."""
+
+    while not stopped.wait(interval):
+        mirror = mirror_ref()
+        if mirror is None:
+            return
+        try:
+            mirror.sync()
+        except Exception as e:
+            # Keep serving the last synced content.
+            mirror.last_error = e
+            log.warning('Contentful sync failed: %s', e)
+        del mirror
+
+
+def _values_at(resource, path):
+    """Returns all values found under a dotted path, traversing lists."""
+
+    values = [resource]
+    for part in path:
+        found = []
+        for value in values:
+            if isinstance(value, list):
+                found.extend(
+                    v[part] for v in value
+                    if isinstance(v, dict) and part in v
+                )
+            elif isinstance(value, dict) and part in value:
+                found.append(value[part])
+        values = found
+
+    flattened = []
+    for value in values:
+        if isinstance(value, list):
+            flattened.extend(value)
+        else:
+            flattened.append(value)
+    return flattened
+
+
+def _links(resource):
+    """Returns all Entry and Asset links from the fields of a resource."""
+
+    links = []
+    for value in resource.get('fields', {}).values():
+        candidates = value if isinstance(value, list) else [value]
+        for candidate in candidates:
+            if (
+                isinstance(candidate, dict) and
+                candidate.get('sys', {}).get('type', None) == 'Link' and
+                candidate['sys'].get('linkType', None) in ['Entry', 'Asset']
+            ):
+                links.append(candidate)
+    return links
@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+from contentful import Entry, Asset
+from contentful.array import Array
+
+from lib.cache import LRUCache
+
+
+REVISION_INDEX_TTL = 60
+REVISION_INDEX_MAX_SIZE = 10000
+
+PublishedRevision = namedtuple('PublishedRevision', ['revision', 'updated_at'])
+
+_MISSING = object()
+
+
+class RevisionIndex(object):
+    """Published revision and update time of entries and assets by ID,
+    as last seen in Delivery API responses. Resources known to be
+    unpublished are kept as None.
+
+    :param max_size: Maximum amount of indexed resources.
+    :param ttl: Seconds before an indexed resource has to be seen again.
+    :param tag_for: (optional) Callable returning the cache tag of a
+                    resource from its space and ID, so indexed resources
+                    are dropped along with cached content.
+
+    Usage:
+
+        >>> index = RevisionIndex()
+        >>> index.record('cfexampleapi', None, client.entries())
+        >>> index.lookup('cfexampleapi', None, ['nyancat', 'foobar'])
+        ({'nyancat': PublishedRevision(revision=5, ...)}, ['foobar'])
+    """
+
+    def __init__(self, max_size=REVISION_INDEX_MAX_SIZE,
+                 ttl=REVISION_INDEX_TTL, tag_for=None):
+        self.cache = LRUCache(max_size=max_size, ttl=ttl)
+        self.tag_for = tag_for
+
+    def configure(self, max_size=None, ttl=None):
+        """Updates the index settings.
+
+        :param max_size: (optional) Maximum amount of indexed resources.
+        :param ttl: (optional) Seconds before an indexed resource has to be
+                    seen again.
+        """
+
+        self.cache.configure(max_size=max_size, ttl=ttl)
+
+    def record(self, space_id, host, resources):
+        """Indexes Delivery API resources and every resource they include.
+        Revisions older than the indexed one, as served by a stale
+        response, are ignored, and so are resources indexed as unpublished.
+
+        :param space_id: Space the resources belong to.
+        :param host: Host the resources come from.
+        :param resources: Entry, Asset or list of them.
+        """
+
+        for resource in _walk(resources):
+            revision = resource.sys.get('revision', None)
+            if revision is None:
+                continue
+
+            key = (space_id, host, resource.id)
+            indexed = self.cache.get(key, _MISSING)
+            if indexed is None:
+                # Known to be unpublished, until dropped along with
+                # cached content or expired. Stale responses still
+                # include the resource.
+                continue
+            if indexed is not _MISSING and indexed.revision > revision:
+                continue
+            self.cache.set(
+                key,
+                PublishedRevision(
+                    revision,
+                    resource.sys.get('updated_at', None)
+                ),
+                tags=self._tags(space_id, resource.id)
+            )
+
+    def record_unpublished(self, space_id, host, resource_ids):
+        """Indexes resources missing from the Delivery API."""
+
+        for resource_id in resource_ids:
+            self.cache.set(
+                (space_id, host, resource_id),
+                None,
+                tags=self._tags(space_id, resource_id)
+            )
+
+    def lookup(self, space_id, host, resource_ids):
+        """Returns the indexed revisions of resources.
+
+        :return: Tuple of a dict of published revisions or None by ID,
+                 and the list of IDs missing from the index.
+        """
+
+        revisions = {}
+        missing = []
+        for resource_id in resource_ids:
+            revision = self.cache.get((space_id, host, resource_id), _MISSING)
+            if revision is _MISSING:
+                missing.append(resource_id)
+            else:
+                revisions[resource_id] = revision
+        return revisions, missing
+
+    def clear(self):
+        """Removes every indexed resource."""
+
+        self.cache.clear()
+
+    def _tags(self, space_id, resource_id):
+        if self.tag_for is None:
+            return None
+        return [self.tag_for(space_id, resource_id)]
+
+
+def _walk(resources):
+    """Yields entries and assets, and every entry or asset they link to."""
+
+    visited = set()
+    pending = [resources]
+    while pending:
+        resource = pending.pop()
+        if isinstance(resource, (list, Array)):
+            pending.extend(resource)
+        elif (isinstance(resource, (Entry, Asset)) and
+              resource.id not in visited):
+            visited.add(resource.id)
+            yield resource
+            if isinstance(resource, Entry):
+                pending.extend(resource.fields().values())
@@ -0,0 +1,262 @@
+import hashlib
+import logging
+import threading
+import urllib.parse
+from collections import Counter, defaultdict, namedtuple
+
+from flask import request
+
+
+UPSTREAM_BUDGET_MODES = ['disabled', 'warn', 'raise']
+UPSTREAM_CALL_BUDGET = 10
+# Queries of the same shape with this many different values are an N+1 pattern.
+N_PLUS_ONE_THRESHOLD = 3
+# Parameters that page through one query rather than make a new one.
+PAGINATION_PARAMETERS = frozenset(['skip', 'limit', 'sync_token'])
+
+UpstreamCall = namedtuple(
+    'UpstreamCall',
+    ['host', 'name', 'url', 'query', 'credentials']
+)
+
+log = logging.getLogger(__name__)
+_current = threading.local()
+
+
+class UpstreamBudgetExceeded(Exception):
+    """Raised when a request queries Contentful more often than its
+    budget allows, or repeats queries.
+    """
+
+    def __init__(self, problems):
+        self.problems = problems
+        self.message = 'Contentful queries out of budget: {0}'.format(
+            '; '.join(problems)
+        )
+        super(UpstreamBudgetExceeded, self).__init__(self.message)
+
+
+class UpstreamRecorder(object):
+    """Contentful queries made while handling a request."""
+
+    __slots__ = ('calls',)
+
+    def __init__(self):
+        self.calls = []
+
+    def record(self, url, name, query, access_token=None):
+        """Adds a query. Only a digest of its access token is kept,
+        telling apart the same query made with other credentials.
+
+        :param url: Full URL of the query.
+        :param name: Name of the query, see `upstream_query_name`.
+        :param query: Dict of query parameters.
+        :param access_token: (optional) Token the query is made with.
+        """
+
+        token = (access_token or '').encode('utf-8')
+        call = UpstreamCall(
+            urllib.parse.urlparse(url).netloc,
+            name,
+            url,
+            tuple(sorted(
+                (key, str(value))
+                for key, value in query.items()
+                if key != 'access_token'
+            )),
+            hashlib.sha256(token).hexdigest()[:12]
+        )
+        log.debug('Contentful query %s %s', call.url, dict(call.query))
+        # Appending is atomic,
+        # queries may be recorded from upstream worker threads.
+        self.calls.append(call)
+
+    def duplicates(self):
+        """Returns the queries made more than once."""
+
+        return sorted(
+            call for call, count in Counter(self.calls).items() if count > 1
+        )
+
+    def n_plus_one(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Returns (host, name, parameter names) of the query shapes
+        made with at least threshold different values, like an entry
+        fetched by ID for every course of a list.
+        """
+
+        variants = defaultdict(set)
+        for call in self.calls:
+            parameters = tuple(
+                (key, value) for key, value in call.query
+                if key not in PAGINATION_PARAMETERS
+            )
+            shape = (call.host, call.name, tuple(key for key, _ in parameters))
+            variants[shape].add((call.url, parameters, call.credentials))
+        return sorted(
+            shape for shape, values in variants.items()
+            if len(values) >= threshold
+        )
+
+
+class UpstreamBudget(object):
+    """Maximum amount of Contentful queries per request, by URL rule.
+
+    Usage:
+
+        >>> budget.problems('/courses/<slug>', recorder)
+        ['11 Contentful queries, the budget of /courses/<slug> is 10']
+    """
+
+    def __init__(self):
+        self.mode = 'disabled'
+        self.default = UPSTREAM_CALL_BUDGET
+        self.routes = {}
+        self.n_plus_one_threshold = N_PLUS_ONE_THRESHOLD
+
+    def limit_for(self, route):
+        return self.routes.get(route, self.default)
+
+    def problems(self, route, recorder):
+        """Returns descriptions of the budget overrun, repeated queries
+        and N+1 patterns of a request.
+        """
+
+        problems = []
+        limit = self.limit_for(route)
+        if len(recorder.calls) > limit:
+            problems.append(
+                '{0} Contentful queries, the budget of {1} is {2}'.format(
+                    len(recorder.calls),
+                    route,
+                    limit
+                )
+            )
+        for call in recorder.duplicates():
+            problems.append('repeated query {0} {1}'.format(
+                call.url,
+                dict(call.query)
+            ))
+        n_plus_one = recorder.n_plus_one(self.n_plus_one_threshold)
+        for host, name, parameters in n_plus_one:
+            problems.append('N+1 queries of {0} on {1} by {2}'.format(
+                name,
+                host,
+                ', '.join(parameters) or 'URL'
+            ))
+        return problems
+
+
+budget = UpstreamBudget()
+
+
+def current_recorder():
+    """Returns the recorder of the request handled by this thread,
+    None when budgets are disabled or outside of requests.
+    """
+
+    return getattr(_current, 'recorder', None)
+
+
+def set_current_recorder(recorder):
+    """Attributes queries made by this thread to a request,
+    used to follow requests into upstream worker threads.
+    """
+
+    _current.recorder = recorder
+
+
+def record_upstream_call(url, name, query, access_token=None):
+    """Records a Contentful query for the current request, if any."""
+
+    recorder = getattr(_current, 'recorder', None)
+    if recorder is not None:
+        recorder.record(url, name, query, access_token)
+
+
+def parse_budgets(value):
+    """Returns budgets by URL rule, from comma separated `rule=budget` pairs.
+
+    Usage:
+
+        >>> parse_budgets('/=8,/courses/<slug>=6')
+        {'/': 8, '/courses/<slug>': 6}
+    """
+
+    budgets = {}
+    for pair in value.split(','):
+        if pair.strip():
+            route, limit = pair.rsplit('=', 1)
+            budgets[route.strip()] = int(limit)
+    return budgets
+
+
+def configure_upstream_budget(app, mode='disabled', default=None, routes=None,
+                              n_plus_one_threshold=None):
+    """Records the Contentful queries of every request, and checks
+    them against the budget of its route. Overruns, repeated queries
+    and N+1 patterns are logged as warnings, or raised as
+    UpstreamBudgetExceeded.
+    When disabled, no hooks are registered and queries aren't recorded.
+
+    :param app: Flask app.
+    :param mode: One of UPSTREAM_BUDGET_MODES.
+    :param default: (optional) Budget of routes without their own.
+    :param routes: (optional) Dict of budgets by URL rule.
+    :param n_plus_one_threshold: (optional) Amount of values of a query
+                                 shape reported as N+1 queries.
+
+    Usage:
+
+        >>> configure_upstream_budget(app, 'warn', 10, {'/courses/<slug>': 6})
+    """
+
+    if mode not in UPSTREAM_BUDGET_MODES:
+        raise ValueError('Unknown upstream budget mode: {0}'.format(mode))
+
+    budget.mode = mode
+    if default is not None:
+        budget.default = default
+    if routes is not None:
+        budget.routes = routes
+    if n_plus_one_threshold is not None:
+        budget.n_plus_one_threshold = n_plus_one_threshold
+    if mode == 'disabled':
+        return
+    if start_recording in app.before_request_funcs.get(None, []):
+        return
+
+    app.before_request(start_recording)
+    app.after_request(check_budget)
+    app.teardown_request(stop_recording)
+
+
+def start_recording():
+    # Keeps a recorder set around the request, like the one of a replay.
+    if current_recorder() is None:
+        set_current_recorder(UpstreamRecorder())
+
+
+def check_budget(response):
+    recorder = current_recorder()
+    if recorder is None or budget.mode == 'disabled':
+        return response
+
+    route = request.path
+    if request.url_rule is not None:
+        route = request.url_rule.rule
+    problems = budget.problems(route, recorder)
+    if problems:
+        if budget.mode == 'raise':
+            raise UpstreamBudgetExceeded(problems)
+        for problem in problems:
+            log.warning(
+                '%s %s: %s',
+                request.method,
+                request.full_path,
+                problem
+            )
+    return response
+
+
+def stop_recording(exception=None):
+    set_current_recorder(None)
@@ -2,6 +2,11 @@ from unittest import TestCase
 
 from app import app
 from i18n.i18n import I18n
+from services.upstream import configure_upstream_budget
+
+
+# Requests querying Contentful over their budget, or repeating queries, fail tests.
+configure_upstream_budget(app, 'raise')
 
 
 class MockApp(object):
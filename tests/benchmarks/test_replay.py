@@ -0,0 +1,113 @@
+import time
+from unittest import TestCase
+
+from flask import Flask, session
+
+from benchmarks.replay import Record, Result, load_log, replay, route_for, \
+                              in_process_sender, summarize
+from services.concurrency import concurrently
+from services.upstream import record_upstream_call, configure_upstream_budget, budget
+
+
+def build_app():
+    app = Flask(__name__)
+    app.secret_key = 'secret'
+
+    @app.route('/courses/<slug>')
+    def course(slug):
+        return session.get('locale', 'en-US')
+
+    @app.route('/courses')
+    def courses():
+        concurrently(*[
+            lambda: record_upstream_call('https://cdn.contentful.com/entries', 'entries', {})
+            for _ in range(3)
+        ])
+        record_upstream_call('https://cdn.contentful.com/locales', 'locales', {})
+        return 'courses'
+
+    @app.route('/error')
+    def error():
+        raise RuntimeError('failed')
+
+    return app
+
+
+def record(path, timestamp=None, session=None):
+    return Record('GET', path, {}, session or {}, timestamp)
+
+
+class ReplayTest(TestCase):
+    def test_load_log_defaults_optional_fields(self):
+        records = load_log([
+            '{"path": "/", "timestamp": 10}',
+            '',
+            '{"method": "post", "path": "/settings", "query": {"api": "cpa"}}'
+        ])
+
+        self.assertEqual([
+            Record('GET', '/', {}, {}, 10),
+            Record('POST', '/settings', {'api': 'cpa'}, {}, None)
+        ], records)
+
+    def test_replays_in_process(self):
+        app = build_app()
+
+        summary = replay(
+            [record('/courses/hello', session={'locale': 'de-DE'}), record('/error')],
+            in_process_sender(app),
+            route_for(app),
+            concurrency=1,
+            speed=0
+        )
+
+        self.assertEqual(2, summary['requests'])
+        self.assertEqual(1, summary['errors'])
+        self.assertEqual(['/courses/<slug>', '/error'], sorted(summary['routes'].keys()))
+
+    def test_counts_calls_of_upstream_worker_threads(self):
+        summary = replay([record('/courses')], in_process_sender(build_app()), count_calls=True)
+
+        self.assertEqual(4, summary['routes']['/courses']['calls'])
+
+    def test_counts_calls_while_budgets_are_checked(self):
+        app = build_app()
+        self.addCleanup(setattr, budget, 'mode', budget.mode)
+        configure_upstream_budget(app, 'warn')
+
+        summary = replay([record('/courses')], in_process_sender(app), count_calls=True)
+
+        self.assertEqual(4, summary['routes']['/courses']['calls'])
+
+    def test_logged_session_is_sent(self):
+        app = build_app()
+        responses = []
+        app.after_request(lambda response: responses.append(response.get_data(as_text=True)) or response)
+
+        in_process_sender(app)(record('/courses/hello', session={'locale': 'de-DE'}))
+
+        self.assertEqual(['de-DE'], responses)
+
+    def test_keeps_the_logged_spacing_divided_by_speed(self):
+        started_at = time.perf_counter()
+
+        replay([record('/', 100.0), record('/', 100.4)], lambda _: 200, concurrency=1, speed=4)
+
+        self.assertGreaterEqual(time.perf_counter() - started_at, 0.1)
+
+    def test_summarizes_per_route(self):
+        summary = summarize([
+            Result('/', 200, 10.0, 2),
+            Result('/', 200, 20.0, 4),
+            Result('/courses', None, 5.0, 0)
+        ], 2.0)
+
+        self.assertEqual(1.5, summary['throughput'])
+        self.assertEqual(1, summary['errors'])
+        self.assertEqual(3, summary['routes']['/']['calls'])
+        self.assertEqual(1, summary['routes']['/courses']['errors'])
+
+    def test_uncounted_calls_are_not_reported(self):
+        summary = summarize([Result('/', 200, 10.0, None)], 1.0)
+
+        self.assertIsNone(summary['routes']['/']['calls'])
@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from benchmarks.dataset import build_dataset
+from benchmarks.routes import route_paths, regressions
+from benchmarks.standin import SpaceStandIn
+
+
+class SpaceStandInTest(TestCase):
+    @classmethod
+    def setUpClass(klass):
+        klass.standin = SpaceStandIn(build_dataset()).start()
+
+    @classmethod
+    def tearDownClass(klass):
+        klass.standin.stop()
+
+    def test_answers_entries_with_includes(self):
+        client = self.standin.client()
+
+        courses = client.entries({'content_type': 'course', 'fields.slug': 'course-1', 'include': 6})
+
+        self.assertEqual(1, len(courses))
+        self.assertEqual('Course 1', courses[0].title)
+        self.assertEqual('Lesson 0', courses[0].lessons[0].title)
+        self.assertEqual('Copy', courses[0].lessons[0].modules[0].title)
+
+    def test_falls_back_to_the_default_locale(self):
+        client = self.standin.client()
+
+        course = client.entries({'sys.id': 'course-1', 'locale': 'de-DE'})[0]
+
+        self.assertEqual('Kurs 1', course.title)
+        self.assertEqual('course-1', course.slug)
+
+    def test_answers_the_space_and_locales(self):
+        client = self.standin.client()
+
+        self.assertEqual(self.standin.space_id, client.space().id)
+        self.assertEqual(['en-US', 'de-DE'], [locale.code for locale in client.locales()])
+
+
+class RoutesBenchmarkTest(TestCase):
+    def test_covers_every_route_on_both_apis(self):
+        paths = route_paths(build_dataset())
+
+        self.assertEqual(12, len(paths))
+        self.assertIn('/courses/course-0/lessons/lesson-0', paths)
+        self.assertIn('/courses/categories/category-0?api=cpa', paths)
+        self.assertIn('/settings', paths)
+
+    def test_regressions_beyond_the_threshold(self):
+        baseline = {'/': {'p50_ms': 10, 'peak_kb': 100, 'calls': 0, 'cold_calls': 4}}
+
+        self.assertEqual([], regressions(
+            {'/': {'p50_ms': 12, 'peak_kb': 120, 'calls': 0, 'cold_calls': 3}},
+            baseline
+        ))
+        self.assertEqual(['/ p50_ms: 13 (baseline 10)', '/ cold_calls: 5 (baseline 4)'], regressions(
+            {'/': {'p50_ms': 13, 'peak_kb': 120, 'calls': 0, 'cold_calls': 5}},
+            baseline
+        ))
+
+    def test_routes_missing_from_the_baseline_are_skipped(self):
+        self.assertEqual([], regressions({'/new': {'p50_ms': 10}}, {}))
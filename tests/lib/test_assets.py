@@ -0,0 +1,92 @@
+import brotli
+import gzip
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from werkzeug.datastructures import Accept
+
+from lib.assets import build_assets, \
+                       precompressed_variant, \
+                       AssetManifest, \
+                       BUILD_DIRECTORY
+
+
+STYLESHEET = b'@font-face { src: url(/fonts/roboto.woff2) format("woff2"), url("/fonts/missing.woff"); }' * 10
+
+
+def write_file(folder, name, content):
+    target = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as static_file:
+        static_file.write(content)
+
+
+def read_file(folder, name):
+    with open(os.path.join(folder, name), 'rb') as static_file:
+        return static_file.read()
+
+
+class AssetsTest(TestCase):
+    def setUp(self):
+        self.static_folder = tempfile.mkdtemp()
+        self.build_folder = os.path.join(self.static_folder, BUILD_DIRECTORY)
+        write_file(self.static_folder, 'fonts/roboto.woff2', b'font')
+        write_file(self.static_folder, 'stylesheets/style.css', STYLESHEET)
+        self.manifest = build_assets(self.static_folder)
+
+    def tearDown(self):
+        shutil.rmtree(self.static_folder)
+
+    # build_assets
+    def test_writes_content_hashed_copies(self):
+        hashed = self.manifest['fonts/roboto.woff2']
+
+        self.assertRegex(hashed, r'^fonts/roboto\.[0-9a-f]{12}\.woff2$')
+        self.assertEqual(b'font', read_file(self.build_folder, hashed))
+
+    def test_rewrites_stylesheet_references(self):
+        stylesheet = read_file(self.build_folder, self.manifest['stylesheets/style.css'])
+
+        self.assertIn('url(/build/{0})'.format(self.manifest['fonts/roboto.woff2']).encode(), stylesheet)
+        self.assertIn(b'url("/fonts/missing.woff")', stylesheet)
+
+    def test_writes_compressed_variants_of_text_files(self):
+        hashed = self.manifest['stylesheets/style.css']
+        content = read_file(self.build_folder, hashed)
+
+        self.assertEqual(content, gzip.decompress(read_file(self.build_folder, hashed + '.gz')))
+        self.assertEqual(content, brotli.decompress(read_file(self.build_folder, hashed + '.br')))
+        self.assertFalse(os.path.exists(os.path.join(self.build_folder, self.manifest['fonts/roboto.woff2'] + '.gz')))
+
+    def test_rebuilding_does_not_hash_built_files(self):
+        self.assertEqual(self.manifest, build_assets(self.static_folder))
+
+    # precompressed_variant
+    def test_negotiates_preferred_encoding(self):
+        hashed = self.manifest['stylesheets/style.css']
+
+        self.assertEqual(
+            ('br', hashed + '.br'),
+            precompressed_variant(self.build_folder, hashed, Accept([('gzip', 1), ('br', 1)]))
+        )
+        self.assertEqual(
+            ('gzip', hashed + '.gz'),
+            precompressed_variant(self.build_folder, hashed, Accept([('gzip', 1), ('br', 0.5)]))
+        )
+        self.assertEqual(
+            (None, hashed),
+            precompressed_variant(self.build_folder, hashed, Accept([]))
+        )
+
+    # AssetManifest
+    def test_manifest_links_to_hashed_copies(self):
+        manifest = AssetManifest.load(self.static_folder)
+        values = {'filename': '/stylesheets/style.css'}
+        manifest.url_defaults('static', values)
+
+        self.assertEqual('build/' + self.manifest['stylesheets/style.css'], values['filename'])
+        self.assertEqual('unknown.png', manifest.url_for('unknown.png'))
+
+    def test_missing_manifest_keeps_file_names(self):
+        self.assertEqual('style.css', AssetManifest.load(tempfile.gettempdir()).url_for('style.css'))
@@ -0,0 +1,233 @@
+import threading
+import time
+from unittest import TestCase
+
+from lib.cache import LRUCache, invalidate_tags
+
+
+class MockClock(object):
+    def __init__(self, now=0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class DeferredExecutor(object):
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn, *args):
+        self.tasks.append((fn, args))
+
+    def run(self):
+        tasks, self.tasks = self.tasks, []
+        for fn, args in tasks:
+            fn(*args)
+
+
+class LRUCacheTest(TestCase):
+    def setUp(self):
+        self.clock = MockClock()
+        self.cache = LRUCache(max_size=2, ttl=10, clock=self.clock)
+
+    # get/set
+    def test_returns_default_when_key_is_missing(self):
+        self.assertEqual('default', self.cache.get('foo', 'default'))
+
+    def test_returns_stored_value(self):
+        self.cache.set('foo', 'bar')
+
+        self.assertEqual('bar', self.cache.get('foo'))
+
+    def test_expires_entries_after_ttl(self):
+        self.cache.set('foo', 'bar')
+        self.clock.now = 10
+
+        self.assertIsNone(self.cache.get('foo'))
+        self.assertNotIn('foo', self.cache)
+
+    def test_per_entry_ttl_overrides_default(self):
+        self.cache.set('foo', 'bar', ttl=20)
+        self.clock.now = 15
+
+        self.assertEqual('bar', self.cache.get('foo'))
+
+    # eviction
+    def test_evicts_least_recently_used_entry(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual(1, self.cache.stats()['evictions'])
+
+    def test_configure_shrinks_cache(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.configure(max_size=1)
+
+        self.assertEqual(1, len(self.cache))
+        self.assertIn('b', self.cache)
+
+    # fetch
+    def test_fetch_calls_factory_only_on_miss(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return 'bar'
+
+        self.assertEqual('bar', self.cache.fetch('foo', factory))
+        self.assertEqual('bar', self.cache.fetch('foo', factory))
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, self.cache.stats()['hits'])
+        self.assertEqual(1, self.cache.stats()['misses'])
+
+    def test_fetch_does_not_cache_exceptions(self):
+        def factory():
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            self.cache.fetch('foo', factory)
+        self.assertNotIn('foo', self.cache)
+
+    def test_fetch_calls_factory_once_for_concurrent_misses(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'bar'
+
+        threads = [
+            threading.Thread(target=self.cache.fetch, args=('foo', factory))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+
+    # sliding expiry
+    def test_sliding_entries_expire_only_when_idle(self):
+        cache = LRUCache(ttl=10, sliding=True, clock=self.clock)
+        cache.set('foo', 'bar')
+
+        self.clock.now = 8
+        self.assertEqual('bar', cache.get('foo'))
+        self.clock.now = 16
+        self.assertEqual('bar', cache.get('foo'))
+        self.clock.now = 30
+        self.assertIsNone(cache.get('foo'))
+        self.assertEqual(1, cache.stats()['expirations'])
+
+    # tags
+    def test_invalidate_tags_removes_tagged_entries(self):
+        cache = LRUCache()
+        cache.set('foo', 'bar', tags=['a', 'b'])
+        cache.set('baz', 'qux', tags=['b'])
+        cache.set('untagged', 'value')
+
+        self.assertEqual(1, cache.invalidate_tags(['a']))
+        self.assertNotIn('foo', cache)
+        self.assertIn('baz', cache)
+        self.assertEqual(1, cache.invalidate_tags(['a', 'b']))
+        self.assertEqual(['value'], cache.values())
+
+    def test_fetch_computes_tags_from_value(self):
+        cache = LRUCache()
+        cache.fetch('foo', lambda: ['a', 'b'], tags=lambda value: value)
+
+        self.assertEqual(1, invalidate_tags(['b']))
+        self.assertNotIn('foo', cache)
+
+    def test_fetch_does_not_store_values_produced_during_invalidation(self):
+        cache = LRUCache()
+
+        def factory():
+            cache.invalidate_tags(['foo'])
+            return 'stale'
+
+        self.assertEqual('stale', cache.fetch('foo', factory, tags=['foo']))
+        self.assertNotIn('foo', cache)
+
+    # max_bytes
+    def test_evicts_entries_above_max_bytes(self):
+        cache = LRUCache(max_bytes=10)
+        cache.set('foo', 'abcdef')
+        cache.set('bar', 'ghijkl')
+
+        self.assertNotIn('foo', cache)
+        self.assertEqual(6, cache.stats()['bytes'])
+
+    def test_does_not_store_values_larger_than_max_bytes(self):
+        cache = LRUCache(max_bytes=4)
+        cache.set('foo', 'abc')
+
+        self.assertFalse(cache.set('foo', 'abcdef'))
+        self.assertEqual(0, len(cache))
+
+    def test_set_skips_values_computed_before_invalidation(self):
+        cache = LRUCache()
+        generation = cache.generation
+        cache.invalidate_tags(['foo'])
+
+        self.assertFalse(cache.set('foo', 'stale', generation=generation))
+        self.assertNotIn('foo', cache)
+
+    # stale while revalidate
+    def stale_cache(self):
+        self.executor = DeferredExecutor()
+        cache = LRUCache(ttl=10, max_stale=20, executor=self.executor, clock=self.clock)
+        cache.fetch('foo', lambda: 'old')
+        self.clock.now = 15
+        return cache
+
+    def test_fetch_serves_stale_value_while_refreshing(self):
+        cache = self.stale_cache()
+
+        self.assertEqual('old', cache.fetch('foo', lambda: 'new'))
+        self.assertEqual('old', cache.fetch('foo', lambda: 'newer'))
+        self.assertEqual(1, len(self.executor.tasks))
+
+        self.executor.run()
+        self.assertEqual('new', cache.fetch('foo', lambda: 'newer'))
+        self.assertEqual(2, cache.stats()['stale_hits'])
+
+    def test_failed_refresh_keeps_stale_value(self):
+        cache = self.stale_cache()
+
+        def failing_factory():
+            raise Exception('upstream down')
+
+        cache.fetch('foo', failing_factory)
+        self.executor.run()
+
+        self.assertEqual('old', cache.fetch('foo', lambda: 'new'))
+        self.assertEqual(1, cache.stats()['refresh_errors'])
+
+    def test_fetch_blocks_once_stale_value_is_too_old(self):
+        cache = self.stale_cache()
+        self.clock.now = 30
+
+        self.assertEqual('new', cache.fetch('foo', lambda: 'new'))
+        self.assertEqual([], self.executor.tasks)
+
+    def test_get_does_not_return_stale_values(self):
+        cache = self.stale_cache()
+
+        self.assertIsNone(cache.get('foo'))
+        self.assertNotIn('foo', cache)
+
+    def test_stale_values_are_cached_until_too_old(self):
+        cache = self.stale_cache()
+
+        self.assertTrue(cache.is_cached('foo'))
+        self.clock.now = 30
+        self.assertFalse(cache.is_cached('foo'))
@@ -0,0 +1,95 @@
+import brotli
+import gzip
+import zlib
+from unittest import TestCase
+from werkzeug.test import Client, EnvironBuilder, run_wsgi_app
+from werkzeug.wrappers import BaseResponse, Response
+
+from lib.compression import CompressionMiddleware
+
+
+PAGE = b'<p>' + b'Hello Contentful! ' * 100 + b'</p>'
+
+
+def page_app(environ, start_response):
+    response = Response(PAGE, mimetype='text/html')
+    response.set_etag('page')
+    return response(environ, start_response)
+
+
+def small_app(environ, start_response):
+    return Response(b'<p>Hi</p>', mimetype='text/html')(environ, start_response)
+
+
+def image_app(environ, start_response):
+    return Response(PAGE, mimetype='image/png')(environ, start_response)
+
+
+def streamed_app(environ, start_response):
+    def chunks():
+        for _ in range(3):
+            yield PAGE
+    return Response(chunks(), mimetype='text/html')(environ, start_response)
+
+
+def client(app, **options):
+    return Client(CompressionMiddleware(app, **options), BaseResponse)
+
+
+class CompressionMiddlewareTest(TestCase):
+    def test_compresses_with_gzip(self):
+        response = client(page_app).get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual(PAGE, gzip.decompress(response.data))
+        self.assertNotIn('Content-Length', response.headers)
+
+    def test_prefers_brotli(self):
+        response = client(page_app).get('/', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+        self.assertEqual('br', response.headers['Content-Encoding'])
+        self.assertEqual(PAGE, brotli.decompress(response.data))
+
+    def test_respects_encoding_quality(self):
+        response = client(page_app).get('/', headers={'Accept-Encoding': 'br;q=0.5, gzip'})
+
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+
+    def test_weakens_etags_and_varies_on_encoding(self):
+        response = client(page_app).get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual('W/"page"', response.headers['ETag'])
+        self.assertEqual('Accept-Encoding', response.headers['Vary'])
+
+    def test_sends_uncompressed_responses_to_other_clients(self):
+        response = client(page_app).get('/')
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(PAGE, response.data)
+
+    def test_skips_small_responses(self):
+        response = client(small_app).get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(b'<p>Hi</p>', response.data)
+
+    def test_skips_content_types_not_allowed(self):
+        response = client(image_app).get('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_skips_head_requests(self):
+        response = client(page_app).head('/', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertNotIn('Content-Encoding', response.headers)
+
+    def test_compresses_streamed_responses_incrementally(self):
+        environ = EnvironBuilder(headers={'Accept-Encoding': 'gzip'}).get_environ()
+        app_iter, status, headers = run_wsgi_app(CompressionMiddleware(streamed_app), environ)
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks = iter(app_iter)
+        self.assertEqual('gzip', headers['Content-Encoding'])
+        self.assertEqual(PAGE, decompressor.decompress(next(chunks)))
+        self.assertEqual(PAGE, decompressor.decompress(next(chunks)))
@@ -1,17 +1,22 @@
 import datetime
 from unittest import TestCase
-from contentful.errors import EntryNotFoundError
+
+from contentful.entry import Entry
 
 from lib.entry_state import attach_entry_state, \
+                            attach_entry_states, \
+                            tracked_resources, \
                             has_pending_changes, \
                             should_show_entry_state, \
                             should_attach_entry_state, \
                             sanitize_datetime
+from services.revisions import PublishedRevision
 
 
 class MockEntry(object):
     def __init__(self, entry_id, updated_at=datetime.datetime(2017, 12, 14), published_at=datetime.datetime(2017, 12, 14), fields=None):
         self.id = entry_id
+        self.type = 'Entry'
         self.updated_at = updated_at
         self.published_at = published_at
         self._fields = fields if fields is not None else {}
@@ -21,17 +26,20 @@ class MockEntry(object):
 
 
 class MockService(object):
-    def __init__(self, published_at, updated_at):
-        self.published_at = published_at
-        self.updated_at = updated_at
+    def __init__(self, delivery_entries):
+        self.delivery_entries = delivery_entries
+        self.calls = []
 
     def __call__(self):
         return self
 
-    def entry(self, entry_id, _api_id):
-        if self.published_at is None:
-            raise EntryNotFoundError('error')
-        return MockEntry(entry_id, self.updated_at, self.published_at)
+    def published_revisions(self, entry_ids):
+        self.calls.append(entry_ids)
+        revisions = {entry_id: None for entry_id in entry_ids}
+        for entry in self.delivery_entries:
+            if entry.id in entry_ids:
+                revisions[entry.id] = PublishedRevision(1, entry.updated_at)
+        return revisions
 
 
 class Session(dict):
@@ -71,17 +79,100 @@ class EntryStateTest(TestCase):
         self.assertFalse(should_show_entry_state(MockEntry('id'), 'cpa'))
 
     def test_true_if_current_api_is_cpa_and_entry_is_draft(self):
-        entry = MockEntry('id')
-        attach_entry_state(entry, MockService(None, datetime.datetime(2017, 12, 14)))
+        entry = attach_entry_state(MockEntry('id'), MockService([]))
 
         self.assertTrue(should_show_entry_state(entry, 'cpa'))
 
     def test_true_if_current_api_is_cpa_and_entry_is_pending_changes(self):
-        entry = MockEntry('id')
-        attach_entry_state(entry, MockService(datetime.datetime(2017, 12, 14), datetime.datetime(2017, 12, 18)))
+        entry = attach_entry_state(MockEntry('id'), MockService([MockEntry('id', updated_at=datetime.datetime(2017, 12, 18))]))
 
         self.assertTrue(should_show_entry_state(entry, 'cpa'))
 
+    # attach_entry_states
+    def test_looks_up_all_published_revisions_at_once(self):
+        entries = [MockEntry('a'), MockEntry('b'), MockEntry('a')]
+        service = MockService([MockEntry('a'), MockEntry('b')])
+
+        entries = attach_entry_states(entries, service)
+
+        self.assertEqual([['a', 'b']], service.calls)
+        self.assertFalse(any(should_show_entry_state(e, 'cpa') for e in entries))
+
+    def test_marks_missing_published_entries_as_draft(self):
+        entries = [MockEntry('a'), MockEntry('b')]
+
+        entries = attach_entry_states(entries, MockService([MockEntry('a')]))
+
+        self.assertFalse(entries[0].draft)
+        self.assertTrue(entries[1].draft)
+
+    def test_marks_entries_with_pending_changes(self):
+        entries = [MockEntry('a', updated_at=datetime.datetime(2017, 12, 18))]
+
+        entries = attach_entry_states(entries, MockService([MockEntry('a')]))
+
+        self.assertFalse(entries[0].draft)
+        self.assertTrue(entries[0].pending_changes)
+
+    def test_marks_entries_with_unpublished_modules_as_draft(self):
+        entries = [MockEntry('a', fields={'modules': [MockEntry('m1'), MockEntry('m2')]})]
+        service = MockService([MockEntry('a'), MockEntry('m1')])
+
+        entries = attach_entry_states(entries, service)
+
+        self.assertEqual([['m1', 'm2', 'a']], service.calls)
+        self.assertTrue(entries[0].draft)
+
+    def test_marks_entries_with_changed_modules_as_pending_changes(self):
+        entries = [MockEntry('a', fields={'modules': [MockEntry('m1', updated_at=datetime.datetime(2017, 12, 18))]})]
+
+        entries = attach_entry_states(entries, MockService([MockEntry('a'), MockEntry('m1')]))
+
+        self.assertFalse(entries[0].draft)
+        self.assertTrue(entries[0].pending_changes)
+
+    def test_leaves_shared_entries_untouched(self):
+        entry = MockEntry('a')
+
+        stateful = attach_entry_state(entry, MockService([]))
+
+        self.assertTrue(stateful.draft)
+        self.assertEqual('a', stateful.id)
+        self.assertNotIn('draft', entry.__dict__)
+
+    def test_leaves_shared_contentful_entries_untouched(self):
+        entry = Entry({
+            'sys': {
+                'id': 'a',
+                'type': 'Entry',
+                'contentType': {'sys': {'type': 'Link', 'linkType': 'ContentType', 'id': 'course'}},
+                'locale': 'en-US',
+                'createdAt': '2017-12-14T00:00:00.000Z',
+                'updatedAt': '2017-12-14T00:00:00.000Z'
+            },
+            'fields': {'slug': 'hello'}
+        })
+
+        stateful = attach_entry_state(entry, MockService([]))
+
+        self.assertTrue(stateful.draft)
+        self.assertEqual('hello', stateful.slug)
+        self.assertNotIn('draft', entry.__dict__)
+
+    def test_does_not_query_without_entries(self):
+        service = MockService([])
+
+        attach_entry_states([], service)
+
+        self.assertEqual([], service.calls)
+
+    # tracked_resources
+    def test_tracks_the_entry_and_its_modules(self):
+        module = MockEntry('m1')
+        entry = MockEntry('a', fields={'modules': [module], 'lessons': [MockEntry('l1')]})
+
+        self.assertEqual([module, entry], tracked_resources(entry))
+
     # sanitize_datetime
     def test_removes_milliseconds(self):
         date = datetime.datetime(2017, 12, 14, 12, 30, 30, 123)
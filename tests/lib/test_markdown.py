@@ -0,0 +1,47 @@
+from unittest import TestCase
+from flask import Markup
+
+from lib.markdown import markdown, \
+                         markdown_cache_stats, \
+                         configure_markdown_engine, \
+                         MARKDOWN_CACHE
+
+
+class MarkdownTest(TestCase):
+    def setUp(self):
+        MARKDOWN_CACHE.clear()
+
+    def tearDown(self):
+        configure_markdown_engine()
+        MARKDOWN_CACHE.clear()
+
+    def test_renders_markdown(self):
+        html = markdown('Some *markdown*')
+
+        self.assertIsInstance(html, Markup)
+        self.assertEqual('<p>Some <em>markdown</em></p>\n', html)
+
+    def test_caches_rendered_documents_by_content(self):
+        first = markdown('Some *markdown*')
+        second = markdown('Some *markdown*')
+        markdown('Other *markdown*')
+
+        self.assertIs(first, second)
+        self.assertEqual(1, markdown_cache_stats()['hits'])
+        self.assertEqual(2, markdown_cache_stats()['size'])
+
+    def test_counts_cached_bytes(self):
+        markdown('Ünïcode')
+
+        self.assertEqual(len('<p>Ünïcode</p>\n'.encode('utf-8')), markdown_cache_stats()['bytes'])
+
+    def test_caches_documents_per_engine(self):
+        markdown('Some *markdown*')
+        configure_markdown_engine('misaka')
+
+        self.assertEqual('<p>Some <em>markdown</em></p>\n', markdown('Some *markdown*'))
+        self.assertEqual(0, markdown_cache_stats()['hits'])
+
+    def test_rejects_unknown_engines(self):
+        with self.assertRaises(ValueError):
+            configure_markdown_engine('foobar')
@@ -0,0 +1,93 @@
+import io
+import re
+from glob import glob
+from html.parser import HTMLParser
+from os import path
+from unittest import TestCase
+
+from lib.markdown import ENGINES
+
+
+CORPUS_PATH = path.join(path.dirname(__file__), '..', 'fixtures', 'markdown')
+
+# Documents each engine is known to render differently from the
+# CommonMark output stored in the corpus.
+KNOWN_DIVERGENCES = {
+    'commonmark': set(),
+    # Hoedown turns the last item of a list followed by another list into a paragraph.
+    'misaka': set(['lesson_copy_setup'])
+}
+
+
+def corpus():
+    """Returns (name, markdown, expected html) for every corpus document."""
+
+    documents = []
+    for source_path in sorted(glob(path.join(CORPUS_PATH, '*.md'))):
+        name = path.splitext(path.basename(source_path))[0]
+        with io.open(source_path, encoding='utf-8') as source:
+            text = source.read()
+        with io.open(path.join(CORPUS_PATH, name + '.html'), encoding='utf-8') as expected:
+            html = expected.read()
+        documents.append((name, text, html))
+    return documents
+
+
+class HTMLNormalizer(HTMLParser):
+    """Reduces HTML to its tags, attributes and text, ignoring entity
+    encoding, void tag syntax and whitespace between blocks.
+    """
+
+    def __init__(self):
+        super(HTMLNormalizer, self).__init__(convert_charrefs=True)
+        self.events = []
+        self._pre = 0
+
+    def handle_starttag(self, tag, attrs):
+        self._pre += tag == 'pre'
+        self.events.append(('start', tag, tuple(sorted(attrs))))
+
+    def handle_startendtag(self, tag, attrs):
+        self.events.append(('start', tag, tuple(sorted(attrs))))
+
+    def handle_endtag(self, tag):
+        self._pre -= tag == 'pre'
+        self.events.append(('end', tag))
+
+    def handle_data(self, data):
+        if not self._pre:
+            data = re.sub(r'\s+', ' ', data)
+            if not data.strip():
+                return
+        if self.events and self.events[-1][0] == 'text':
+            data = self.events.pop()[1] + data
+        self.events.append(('text', data))
+
+
+def normalize(html):
+    normalizer = HTMLNormalizer()
+    normalizer.feed(html)
+    normalizer.close()
+    return normalizer.events
+
+
+class MarkdownEnginesTest(TestCase):
+    def test_corpus_is_not_empty(self):
+        self.assertTrue(corpus())
+
+    def test_engines_match_the_corpus_html(self):
+        for name, engine_class in ENGINES.items():
+            engine = engine_class()
+            divergent = set(
+                document for document, text, html in corpus()
+                if normalize(engine.render(text)) != normalize(html)
+            )
+
+            with self.subTest(engine=name):
+                self.assertEqual(KNOWN_DIVERGENCES[name], divergent)
+
+    def test_normalize_ignores_serialization_details(self):
+        self.assertEqual(
+            normalize('<p>a &amp; &quot;b&quot;<br />\nc</p>\n<hr />'),
+            normalize('<p>a &amp; "b"<br>\nc</p>\n\n<hr>')
+        )
@@ -0,0 +1,128 @@
+import re
+from functools import partial
+from unittest import TestCase
+
+from flask import Flask
+
+from lib.cache import LRUCache
+from lib.metrics import MetricsRegistry, RequestTimings, timed, registry, \
+                        configure_metrics, current_timings, set_current_timings
+from services.concurrency import concurrently
+
+
+def timed_call(phase):
+    with timed(phase):
+        return phase
+
+
+class MetricsRegistryTest(TestCase):
+    def test_renders_cumulative_histograms(self):
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        metrics.observe('phase_duration_seconds', (('phase', 'render'),), 0.05)
+        metrics.observe('phase_duration_seconds', (('phase', 'render'),), 0.5)
+        metrics.observe('phase_duration_seconds', (('phase', 'render'),), 5)
+
+        rendered = metrics.render()
+
+        self.assertIn('# TYPE example_app_phase_duration_seconds histogram', rendered)
+        self.assertIn('example_app_phase_duration_seconds_bucket{phase="render",le="0.1"} 1', rendered)
+        self.assertIn('example_app_phase_duration_seconds_bucket{phase="render",le="1.0"} 2', rendered)
+        self.assertIn('example_app_phase_duration_seconds_bucket{phase="render",le="+Inf"} 3', rendered)
+        self.assertIn('example_app_phase_duration_seconds_sum{phase="render"} 5.55', rendered)
+        self.assertIn('example_app_phase_duration_seconds_count{phase="render"} 3', rendered)
+
+    def test_renders_cache_hit_ratios(self):
+        cache = LRUCache()
+        cache.set('key', 'value')
+        cache.get('key')
+        cache.get('other')
+        metrics = MetricsRegistry()
+        metrics.track_caches({'page': cache})
+
+        rendered = metrics.render()
+
+        self.assertIn('example_app_cache_hits_total{cache="page"} 1', rendered)
+        self.assertIn('example_app_cache_misses_total{cache="page"} 1', rendered)
+        self.assertIn('example_app_cache_hit_ratio{cache="page"} 0.5', rendered)
+
+    def test_escapes_label_values(self):
+        metrics = MetricsRegistry()
+        metrics.observe('request_duration_seconds', (('route', '/"quoted"'),), 0.1)
+
+        self.assertIn('route="/\\"quoted\\""', metrics.render())
+
+
+class TimedTest(TestCase):
+    def tearDown(self):
+        set_current_timings(None)
+        registry.clear()
+
+    def test_does_nothing_outside_of_measured_requests(self):
+        with timed('render'):
+            pass
+
+        self.assertNotIn('phase="render"', registry.render())
+
+    def test_adds_phases_to_the_current_request(self):
+        timings = RequestTimings()
+        set_current_timings(timings)
+
+        with timed('contentful', query='entries:course'):
+            pass
+
+        self.assertEqual(['contentful'], [phase for phase, _ in timings.phases])
+        rendered = registry.render()
+        self.assertIn('phase_duration_seconds_count{phase="contentful"} 1', rendered)
+        self.assertIn('upstream_query_duration_seconds_count{query="entries:course"} 1', rendered)
+
+    def test_follows_requests_into_upstream_workers(self):
+        timings = RequestTimings()
+        set_current_timings(timings)
+
+        concurrently(partial(timed_call, 'first'), partial(timed_call, 'second'))
+
+        self.assertEqual(['first', 'second'], sorted(phase for phase, _ in timings.phases))
+
+    def test_server_timing_sums_phases(self):
+        timings = RequestTimings()
+        timings.add('contentful', 0.002)
+        timings.add('render', 0.001)
+        timings.add('contentful', 0.003)
+
+        self.assertRegex(
+            timings.server_timing(),
+            r'^contentful;dur=5\.00;desc="2 calls", render;dur=1\.00, total;dur=[0-9.]+$'
+        )
+
+
+class ConfigureMetricsTest(TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+
+        @self.app.route('/courses/<slug>')
+        def course(slug):
+            with timed('render'):
+                return slug
+
+    def tearDown(self):
+        registry.enabled = False
+        registry.clear()
+
+    def test_times_requests_when_enabled(self):
+        configure_metrics(self.app, True)
+
+        response = self.app.test_client().get('/courses/hello')
+
+        self.assertTrue(re.match(r'^render;dur=[0-9.]+, total;dur=[0-9.]+$', response.headers['Server-Timing']))
+        self.assertIsNone(current_timings())
+        rendered = registry.render()
+        self.assertIn('request_duration_seconds_count{route="/courses/<slug>",method="GET"} 1', rendered)
+        self.assertIn('example_app_requests_in_flight 0', rendered)
+
+    def test_registers_nothing_when_disabled(self):
+        configure_metrics(self.app, False)
+
+        response = self.app.test_client().get('/courses/hello')
+
+        self.assertNotIn('Server-Timing', response.headers)
+        self.assertEqual({}, self.app.before_request_funcs)
@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from flask import Flask, session
+from flask.sessions import SecureCookieSessionInterface
+
+from lib.sessions import configure_session_store, MemorySessionStore, SQLiteSessionStore
+
+
+def build_app(store='memory', path=None):
+    app = Flask(__name__)
+    app.secret_key = 'secret'
+    configure_session_store(app, store, path=path)
+
+    @app.route('/read')
+    def read():
+        if not session.permanent:
+            session.permanent = True
+        return session.get('space_id', 'none')
+
+    @app.route('/write/<value>')
+    def write(value):
+        session['space_id'] = value
+        return value
+
+    @app.route('/clear')
+    def clear():
+        session.clear()
+        return 'cleared'
+
+    return app
+
+
+def session_cookie(response):
+    return [header for header in response.headers.getlist('Set-Cookie') if header.startswith('session=')]
+
+
+class ServerSideSessionTest(TestCase):
+    def setUp(self):
+        self.app = build_app()
+        self.client = self.app.test_client()
+
+    def test_cookie_only_holds_the_session_id(self):
+        response = self.client.get('/write/secret-space')
+
+        cookie = session_cookie(response)[0]
+        self.assertNotIn('secret-space', cookie)
+        self.assertEqual('secret-space', self.client.get('/read').get_data(as_text=True))
+
+    def test_unmodified_sessions_are_not_sent_again(self):
+        self.client.get('/write/space')
+        self.client.get('/read')
+
+        self.assertEqual([], session_cookie(self.client.get('/read')))
+
+    def test_empty_sessions_set_no_cookie(self):
+        self.assertEqual([], session_cookie(self.app.test_client().get('/clear')))
+
+    def test_sessions_only_made_permanent_are_not_stored(self):
+        response = self.client.get('/read')
+
+        self.assertEqual([], session_cookie(response))
+        self.assertEqual(0, len(self.app.session_interface.store.cache))
+
+    def test_cleared_sessions_are_deleted(self):
+        self.client.get('/write/space')
+        sid = session_cookie(self.client.get('/write/space2'))[0].split(';')[0].split('=', 1)[1]
+
+        self.client.get('/clear')
+
+        self.assertIsNone(self.app.session_interface.store.get(sid))
+        self.assertEqual('none', self.client.get('/read').get_data(as_text=True))
+
+    def test_takes_over_signed_cookie_sessions(self):
+        value = SecureCookieSessionInterface().get_signing_serializer(self.app).dumps({'space_id': 'old'})
+        self.client.set_cookie('localhost', 'session', value)
+
+        self.assertEqual('old', self.client.get('/read').get_data(as_text=True))
+        self.assertEqual('old', self.client.get('/read').get_data(as_text=True))
+
+    def test_unknown_session_ids_start_over(self):
+        self.client.set_cookie('localhost', 'session', 'unknown')
+
+        self.assertEqual('none', self.client.get('/read').get_data(as_text=True))
+
+
+class SessionStoresTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_memory_store_expires_sessions(self):
+        store = MemorySessionStore()
+        store.set('sid', {'space_id': 'space'}, 0)
+
+        self.assertIsNone(store.get('sid'))
+
+    def test_sqlite_store_is_shared_between_instances(self):
+        path = os.path.join(self.directory, 'sessions.sqlite3')
+        SQLiteSessionStore(path).set('sid', {'visited_lessons': 'AAAA'}, 4102444800)
+
+        self.assertEqual(({'visited_lessons': 'AAAA'}, 4102444800), SQLiteSessionStore(path).get('sid'))
+
+    def test_sqlite_store_expires_sessions(self):
+        store = SQLiteSessionStore(os.path.join(self.directory, 'sessions.sqlite3'))
+        store.set('sid', {'space_id': 'space'}, 0)
+
+        self.assertIsNone(store.get('sid'))
+
+    def test_sessions_are_shared_between_apps_of_one_sqlite_store(self):
+        path = os.path.join(self.directory, 'sessions.sqlite3')
+        first = build_app('sqlite', path).test_client()
+        second = build_app('sqlite', path).test_client()
+
+        cookie = session_cookie(first.get('/write/space'))[0].split(';')[0].split('=', 1)[1]
+        second.set_cookie('localhost', 'session', cookie)
+
+        self.assertEqual('space', second.get('/read').get_data(as_text=True))
+
+    def test_cookie_store_keeps_flask_sessions(self):
+        app = build_app('cookie')
+
+        self.assertIsInstance(app.session_interface, SecureCookieSessionInterface)
+
+    def test_rejects_unknown_stores(self):
+        with self.assertRaises(ValueError):
+            build_app('redis')
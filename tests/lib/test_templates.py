@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from flask import Flask
+
+from lib.templates import configure_template_cache, \
+                          load_templates, \
+                          stale_templates, \
+                          template_names
+
+
+def write_template(folder, name, content):
+    target = os.path.join(folder, name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'w') as template:
+        template.write(content)
+
+
+class TemplatesTest(TestCase):
+    def setUp(self):
+        self.template_folder = tempfile.mkdtemp()
+        self.cache_folder = tempfile.mkdtemp()
+        write_template(self.template_folder, 'layout.dhtml', '<p>{% block content %}{% endblock %}</p>')
+        write_template(self.template_folder, 'partials/card.dhtml', '{{ title }}')
+        write_template(self.template_folder, 'legacy.html', '{{ title }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.template_folder)
+        shutil.rmtree(self.cache_folder)
+
+    def build_app(self, cache_folder=None):
+        app = Flask(__name__, template_folder=self.template_folder)
+        configure_template_cache(app, cache_folder or self.cache_folder)
+        return app
+
+    def test_lists_app_templates(self):
+        self.assertEqual(['layout.dhtml', 'partials/card.dhtml'], template_names(self.build_app()))
+
+    def test_does_not_cache_until_the_cache_is_built(self):
+        app = self.build_app(os.path.join(self.cache_folder, 'missing'))
+
+        self.assertIsNone(app.jinja_env.bytecode_cache)
+        self.assertEqual(2, len(stale_templates(app)))
+
+    def test_loading_compiles_templates_into_the_cache(self):
+        app = self.build_app()
+        self.assertEqual(['layout.dhtml', 'partials/card.dhtml'], stale_templates(app))
+
+        self.assertEqual(2, load_templates(app))
+
+        self.assertEqual(2, len(os.listdir(self.cache_folder)))
+        self.assertEqual([], stale_templates(self.build_app()))
+
+    def test_changed_templates_are_stale(self):
+        load_templates(self.build_app())
+        write_template(self.template_folder, 'partials/card.dhtml', '<h1>{{ title }}</h1>')
+
+        app = self.build_app()
+
+        self.assertEqual(['partials/card.dhtml'], stale_templates(app))
+        with app.app_context():
+            self.assertEqual('<h1>Hello</h1>', app.jinja_env.get_template('partials/card.dhtml').render(title='Hello'))
+
+    def test_compiled_templates_are_found_from_another_root(self):
+        load_templates(self.build_app())
+        moved_folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, moved_folder)
+        moved_folder = os.path.join(moved_folder, 'app')
+        shutil.copytree(self.template_folder, moved_folder)
+
+        app = Flask(__name__, template_folder=moved_folder)
+        configure_template_cache(app, self.cache_folder)
+
+        self.assertEqual([], stale_templates(app))
@@ -0,0 +1,58 @@
+from unittest import TestCase
+
+from lib.visited import VisitedEntries
+
+
+class VisitedEntriesTest(TestCase):
+    def test_membership(self):
+        visited = VisitedEntries()
+        visited.add('lesson')
+
+        self.assertIn('lesson', visited)
+        self.assertNotIn('other', visited)
+
+    def test_round_trips_through_the_session_value(self):
+        visited = VisitedEntries()
+        for entry_id in ['course', 'first', 'second']:
+            visited.add(entry_id)
+
+        loaded = VisitedEntries.load(visited.dump())
+
+        self.assertEqual(3, len(loaded))
+        self.assertEqual(frozenset(['course', 'second']), loaded.intersection(['course', 'second', 'other']))
+
+    def test_stays_compact(self):
+        visited = VisitedEntries()
+        for index in range(50):
+            visited.add('5KsDBWseXY6QegucYAoacS{0}'.format(index))
+
+        self.assertEqual(268, len(visited.dump()))
+
+    def test_loads_lists_of_ids(self):
+        visited = VisitedEntries.load(['course', 'lesson'])
+
+        self.assertIn('course', visited)
+        self.assertIn('lesson', visited)
+
+    def test_unreadable_values_start_over(self):
+        self.assertEqual(0, len(VisitedEntries.load(None)))
+        self.assertEqual(0, len(VisitedEntries.load('not base64!')))
+
+    def test_drops_the_least_recently_visited(self):
+        visited = VisitedEntries(max_size=2)
+        visited.add('first')
+        visited.add('second')
+        visited.add('first')
+        visited.add('third')
+
+        self.assertIn('first', visited)
+        self.assertNotIn('second', visited)
+        self.assertIn('third', visited)
+
+    def test_add_reports_changes(self):
+        visited = VisitedEntries()
+
+        self.assertTrue(visited.add('first'))
+        self.assertFalse(visited.add('first'))
+        visited.add('second')
+        self.assertTrue(visited.add('first'))
@@ -0,0 +1,136 @@
+import threading
+from unittest import TestCase
+
+from flask import Flask, request
+
+from lib.warmup import warm_up, warmup_paths, start_warmup, state
+
+
+class MockLocale(object):
+    def __init__(self, code, default=False):
+        self.code = code
+        self.default = default
+
+
+class MockEntry(object):
+    def __init__(self, slug, lessons=None):
+        self.slug = slug
+        self._fields = {'slug': slug, 'lessons': lessons or []}
+
+    def fields(self):
+        return self._fields
+
+
+class MockLink(object):
+    pass
+
+
+class MockService(object):
+    def __call__(self):
+        return self
+
+    def locales(self, _api_id):
+        return [MockLocale('en-US', True), MockLocale('de-DE')]
+
+    def categories(self, _api_id, _locale):
+        return [MockEntry('getting-started')]
+
+    def courses(self, _api_id, _locale):
+        return [MockEntry('hello', [MockEntry('intro'), MockLink()])]
+
+
+class WarmupTest(TestCase):
+    def setUp(self):
+        state.reset()
+        self.requests = []
+        self.app = Flask(__name__)
+
+        @self.app.route('/', defaults={'path': ''})
+        @self.app.route('/<path:path>')
+        def page(path):
+            self.requests.append(request.full_path.rstrip('?'))
+            if path == 'courses/hello':
+                raise RuntimeError('Broken page')
+            return 'page'
+
+    def tearDown(self):
+        state.reset()
+
+    def test_lists_every_page_for_each_locale_and_api(self):
+        paths = warmup_paths(MockService())
+
+        self.assertEqual([
+            '/',
+            '/courses',
+            '/courses/categories/getting-started',
+            '/courses/hello',
+            '/courses/hello/lessons/intro'
+        ], paths[:5])
+        self.assertIn('/courses/hello/lessons/intro?locale=de-DE', paths)
+        self.assertIn('/courses?api=cpa', paths)
+        self.assertIn('/courses/hello?api=cpa&locale=de-DE', paths)
+        self.assertEqual(20, len(paths))
+
+    def test_requests_every_page_and_counts_failures(self):
+        stats = warm_up(self.app, MockService(), apis=['cda'])
+
+        self.assertEqual(10, len(self.requests))
+        self.assertEqual(8, stats['warmed'])
+        self.assertEqual(2, stats['failed'])
+        self.assertTrue(stats['ready'])
+
+    def test_stays_not_ready_when_pages_cannot_be_listed(self):
+        class FailingService(MockService):
+            def locales(self, _api_id):
+                raise RuntimeError('Contentful is down')
+
+        stats = warm_up(self.app, FailingService(), apis=['cda'], attempts=2, retry_delay=0)
+
+        self.assertFalse(stats['ready'])
+        self.assertEqual(2, stats['attempts'])
+        self.assertEqual('pages could not be listed', stats['error'])
+        self.assertEqual([], self.requests)
+
+    def test_stays_not_ready_when_no_page_renders(self):
+        @self.app.before_request
+        def fail():
+            raise RuntimeError('Broken app')
+
+        stats = warm_up(self.app, MockService(), apis=['cda'], attempts=1)
+
+        self.assertFalse(stats['ready'])
+        self.assertEqual('no page rendered', stats['error'])
+
+    def test_retries_failed_warm_ups(self):
+        failures = ['Contentful is down']
+
+        class FlakyService(MockService):
+            def locales(self, api_id):
+                if failures:
+                    raise RuntimeError(failures.pop())
+                return super(FlakyService, self).locales(api_id)
+
+        stats = warm_up(self.app, FlakyService(), apis=['cda'], retry_delay=0)
+
+        self.assertTrue(stats['ready'])
+        self.assertEqual(2, stats['attempts'])
+        self.assertEqual(8, stats['warmed'])
+
+    def test_is_not_ready_while_warming_up(self):
+        self.assertTrue(state.ready)
+        listed = threading.Event()
+        release = threading.Event()
+
+        class BlockingService(MockService):
+            def locales(self, api_id):
+                listed.set()
+                release.wait(5)
+                return super(BlockingService, self).locales(api_id)
+
+        thread = start_warmup(self.app, BlockingService(), apis=['cda'])
+        listed.wait(5)
+        self.assertFalse(state.ready)
+        release.set()
+        thread.join()
+
+        self.assertTrue(state.ready)
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from flask import Flask
+
+from lib.assets import build_assets
+from routes.assets import assets
+from tests.lib.test_assets import write_file, STYLESHEET
+
+
+class AssetsRouteTest(TestCase):
+    def setUp(self):
+        self.static_folder = tempfile.mkdtemp()
+        write_file(self.static_folder, 'stylesheets/style.css', STYLESHEET)
+        self.manifest = build_assets(self.static_folder)
+
+        app = Flask(__name__, static_url_path='', static_folder=self.static_folder)
+        app.register_blueprint(assets)
+        self.app = app.test_client()
+        self.url = '/build/{0}'.format(self.manifest['stylesheets/style.css'])
+
+    def tearDown(self):
+        shutil.rmtree(self.static_folder)
+
+    def test_serves_precompressed_assets(self):
+        response = self.app.get(self.url, headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('br', response.headers['Content-Encoding'])
+        self.assertEqual('text/css; charset=utf-8', response.headers['Content-Type'])
+        self.assertEqual('Accept-Encoding', response.headers['Vary'])
+
+    def test_serves_uncompressed_assets_to_other_clients(self):
+        response = self.app.get(self.url)
+
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertEqual(STYLESHEET, response.data)
+
+    def test_assets_are_cached_forever(self):
+        response = self.app.get(self.url)
+
+        self.assertIn('immutable', response.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', response.headers['Cache-Control'])
+
+    def test_unknown_assets_are_not_found(self):
+        self.assertEqual(404, self.app.get('/build/missing.css').status_code)
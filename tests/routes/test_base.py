@@ -0,0 +1,108 @@
+import threading
+from unittest import TestCase
+
+from flask import request, session, g
+
+from app import app
+from routes.base import space_id, \
+                        delivery_token, \
+                        is_using_custom_credentials, \
+                        update_session_for, \
+                        clear_request_cache, \
+                        check_errors, \
+                        mark_as_visited, \
+                        DEFAULT_LOCALE
+from services.contentful import VALIDATION_CACHE, credentials_digest
+
+
+class BaseTest(TestCase):
+    # request_cached
+    def test_helpers_are_computed_once_per_request(self):
+        with app.test_request_context('/'):
+            original_space_id = space_id()
+            session['space_id'] = 'changed'
+
+            self.assertEqual(original_space_id, space_id())
+
+    def test_cache_is_not_shared_between_requests(self):
+        with app.test_request_context('/'):
+            space_id()
+
+        with app.test_request_context('/'):
+            session['space_id'] = 'changed'
+
+            self.assertEqual('changed', space_id())
+
+    def test_updating_the_session_clears_the_cache(self):
+        with app.test_request_context('/?delivery_token=foo'):
+            delivery_token()
+            self.assertFalse(is_using_custom_credentials(session))
+
+            update_session_for('delivery_token')
+
+            self.assertEqual('foo', delivery_token())
+            self.assertTrue(is_using_custom_credentials(session))
+
+    def test_clear_request_cache(self):
+        with app.test_request_context('/'):
+            space_id()
+            session['space_id'] = 'changed'
+            clear_request_cache()
+
+            self.assertEqual('changed', space_id())
+
+    # visited lessons
+    def test_migrates_visited_lessons_stored_as_lists(self):
+        with app.test_request_context('/'):
+            session['visited_lessons'] = ['course', 'lesson']
+
+            visited = mark_as_visited('lesson')
+
+            self.assertIn('course', visited)
+            self.assertIsInstance(session['visited_lessons'], str)
+
+    def test_revisits_do_not_update_the_session(self):
+        with app.test_request_context('/'):
+            mark_as_visited('lesson')
+            session.modified = False
+
+            mark_as_visited('lesson')
+
+            self.assertFalse(session.modified)
+
+    def test_request_state_is_isolated_between_threads(self):
+        barrier = threading.Barrier(2)
+        seen = {}
+
+        def handle_request(name):
+            with app.test_request_context('/?space_id={0}'.format(name)):
+                session['space_id'] = request.args['space_id']
+                space_id()
+                # Both requests are in flight before either one reads back.
+                barrier.wait(timeout=5)
+                seen[name] = space_id()
+
+        threads = [
+            threading.Thread(target=handle_request, args=(name,))
+            for name in ['first', 'second']
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({'first': 'first', 'second': 'second'}, seen)
+
+    # check_errors
+    def test_check_errors_uses_cached_validations(self):
+        VALIDATION_CACHE.set(credentials_digest('space', 'delivery'), None)
+        VALIDATION_CACHE.set(credentials_digest('space', 'preview', True), 401)
+        try:
+            with app.test_request_context('/'):
+                # Error messages are translated without querying locales.
+                g.request_cache = {'locale': DEFAULT_LOCALE}
+                errors = check_errors('space', 'delivery', 'preview')
+        finally:
+            VALIDATION_CACHE.clear()
+
+        self.assertEqual(['previewToken'], list(errors.keys()))
@@ -0,0 +1,17 @@
+from tests import IntegrationTestBase
+
+from lib.metrics import registry
+
+
+class MetricsTest(IntegrationTestBase):
+    def test_served_when_enabled(self):
+        registry.enabled = True
+        try:
+            response = self.app.get('/metrics')
+        finally:
+            registry.enabled = False
+
+        self.assertSuccess(response)
+        self.assertIn('text/plain', response.headers['Content-Type'])
+        self.assertIn('example_app_requests_in_flight', response.data.decode('utf-8'))
+        self.assertNotIn('Set-Cookie', response.headers)
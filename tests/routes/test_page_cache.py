@@ -0,0 +1,132 @@
+from os import environ
+from unittest import TestCase
+from flask import Flask, g
+from contentful.resource import Link
+
+from routes.base import mark_as_visited
+from routes.page_cache import cached_page, \
+                              configure_page_cache, \
+                              vary_on_visited_lessons, \
+                              PAGE_CACHE
+from lib.cache import invalidate_tags
+from services.contentful import content_type_tag, entity_tag
+
+
+def build_app(renders):
+    app = Flask(__name__)
+    app.secret_key = 'secret'
+
+    @app.route('/pages/<slug>')
+    @cached_page(content_types=['course'])
+    def show_page(slug):
+        renders.append(slug)
+        return 'page {0}'.format(slug)
+
+    @app.route('/lessons/<lesson_id>')
+    @cached_page()
+    def show_lesson(lesson_id):
+        renders.append(lesson_id)
+        visited = mark_as_visited(lesson_id)
+        vary_on_visited_lessons(lesson_id, ['a', 'b'])
+        return ','.join(sorted(visited.intersection(['a', 'b'])))
+
+    @app.route('/entries/<entry_id>')
+    @cached_page()
+    def show_entry(entry_id):
+        renders.append(entry_id)
+        g.rendered_resources = [Link({'sys': {'id': entry_id, 'type': 'Link', 'linkType': 'Entry'}})]
+        return 'entry {0}'.format(entry_id)
+
+    @app.route('/missing')
+    @cached_page()
+    def show_missing():
+        renders.append('missing')
+        return 'missing', 404
+
+    return app
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        PAGE_CACHE.clear()
+        configure_page_cache(enabled=True)
+        self.renders = []
+        self.app = build_app(self.renders).test_client()
+
+    def tearDown(self):
+        configure_page_cache(enabled=False)
+        PAGE_CACHE.clear()
+
+    def test_renders_pages_once(self):
+        first = self.app.get('/pages/foo')
+        second = self.app.get('/pages/foo')
+
+        self.assertEqual(b'page foo', second.data)
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        self.assertEqual(['foo'], self.renders)
+
+    def test_pages_vary_by_query_string(self):
+        self.app.get('/pages/foo?locale=de-DE')
+        self.app.get('/pages/foo?locale=en-US')
+
+        self.assertEqual(['foo', 'foo'], self.renders)
+
+    def test_settings_parameters_are_not_part_of_the_key(self):
+        self.app.get('/pages/foo?locale=de-DE&delivery_token=one')
+        self.app.get('/pages/foo?delivery_token=two&locale=de-DE&editorial_features=enabled')
+
+        self.assertEqual(['foo'], self.renders)
+
+    def test_answers_conditional_requests_with_304(self):
+        etag = self.app.get('/pages/foo').headers['ETag']
+        response = self.app.get('/pages/foo', headers={'If-None-Match': etag})
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b'', response.data)
+
+    def test_does_not_cache_errors(self):
+        self.app.get('/missing')
+        self.app.get('/missing')
+
+        self.assertEqual(['missing', 'missing'], self.renders)
+
+    def test_keeps_visited_lessons_per_visitor(self):
+        self.assertEqual(b'a', self.app.get('/lessons/a').data)
+        self.assertEqual(b'a,b', self.app.get('/lessons/b').data)
+
+        same_path = build_app(self.renders).test_client()
+        self.assertEqual(b'a', same_path.get('/lessons/a').data)
+        self.assertEqual(b'a,b', same_path.get('/lessons/b').data)
+
+        other_path = build_app(self.renders).test_client()
+        self.assertEqual(b'b', other_path.get('/lessons/b').data)
+
+        self.assertEqual(['a', 'b', 'b'], self.renders)
+
+    def test_drops_pages_on_content_type_invalidation(self):
+        self.app.get('/pages/foo')
+        invalidate_tags([content_type_tag(environ['CONTENTFUL_SPACE_ID'], 'course', 'cda')])
+        self.app.get('/pages/foo')
+
+        self.assertEqual(['foo', 'foo'], self.renders)
+
+    def test_drops_pages_without_content_types_only_with_their_entries(self):
+        space_id = environ['CONTENTFUL_SPACE_ID']
+        self.app.get('/entries/foo')
+
+        invalidate_tags([content_type_tag(space_id, 'course', 'cda')])
+        invalidate_tags([entity_tag(space_id, 'foo', 'cpa')])
+        self.app.get('/entries/foo')
+        self.assertEqual(['foo'], self.renders)
+
+        invalidate_tags([entity_tag(space_id, 'foo', 'cda')])
+        self.app.get('/entries/foo')
+        self.assertEqual(['foo', 'foo'], self.renders)
+
+    def test_renders_every_time_when_disabled(self):
+        configure_page_cache(enabled=False)
+        self.app.get('/pages/foo')
+        response = self.app.get('/pages/foo')
+
+        self.assertNotIn('ETag', response.headers)
+        self.assertEqual(['foo', 'foo'], self.renders)
@@ -0,0 +1,26 @@
+import json
+from tests import IntegrationTestBase
+
+from lib.warmup import state
+
+
+class ReadyTest(IntegrationTestBase):
+    def tearDown(self):
+        state.reset()
+
+    def test_ready_without_warm_up(self):
+        response = self.app.get('/ready')
+
+        self.assertSuccess(response)
+        self.assertTrue(json.loads(response.data.decode('utf-8'))['ready'])
+
+    def test_unavailable_while_warming_up(self):
+        state.start()
+
+        self.assertEqual(503, self.app.get('/ready').status_code)
+
+        state.finish()
+        self.assertSuccess(self.app.get('/ready'))
+
+    def test_does_not_set_session_cookies(self):
+        self.assertNotIn('Set-Cookie', self.app.get('/ready').headers)
@@ -0,0 +1,74 @@
+import json
+from tests import IntegrationTestBase
+
+from app import app
+from services.contentful import INDEX_CACHE, entity_tag
+
+
+def payload(entity_id, space_id='foo'):
+    return {
+        'sys': {
+            'id': entity_id,
+            'type': 'Entry',
+            'space': {'sys': {'type': 'Link', 'linkType': 'Space', 'id': space_id}},
+            'contentType': {'sys': {'type': 'Link', 'linkType': 'ContentType', 'id': 'lesson'}}
+        }
+    }
+
+
+class WebhooksTest(IntegrationTestBase):
+    def setUp(self):
+        super(WebhooksTest, self).setUp()
+        app.config['CONTENTFUL_WEBHOOK_SECRET'] = 'secret'
+        INDEX_CACHE.set('index', 'value', tags=[entity_tag('foo', 'intro', 'cda')])
+        INDEX_CACHE.set('preview', 'value', tags=[entity_tag('foo', 'intro', 'cpa')])
+
+    def tearDown(self):
+        app.config['CONTENTFUL_WEBHOOK_SECRET'] = None
+        INDEX_CACHE.clear()
+
+    def post(self, body, secret='secret', topic='ContentManagement.Entry.publish'):
+        return self.app.post(
+            '/webhooks/contentful',
+            data=json.dumps(body),
+            headers={
+                'X-Contentful-Webhook-Secret': secret,
+                'X-Contentful-Topic': topic,
+                'Content-Type': 'application/vnd.contentful.management.v1+json'
+            }
+        )
+
+    def test_invalidates_content_referencing_the_entry(self):
+        response = self.post(payload('intro'))
+
+        self.assertSuccess(response)
+        self.assertIn(b'"invalidated": 2', response.data)
+        self.assertNotIn('index', INDEX_CACHE)
+        self.assertNotIn('preview', INDEX_CACHE)
+
+    def test_saves_only_invalidate_preview_content(self):
+        response = self.post(payload('intro'), topic='ContentManagement.Entry.auto_save')
+
+        self.assertIn(b'"invalidated": 1', response.data)
+        self.assertIn('index', INDEX_CACHE)
+        self.assertNotIn('preview', INDEX_CACHE)
+
+    def test_keeps_content_of_other_spaces(self):
+        self.assertSuccess(self.post(payload('intro', 'bar')))
+        self.assertIn('index', INDEX_CACHE)
+
+    def test_ignores_topics_not_changing_content(self):
+        self.assertSuccess(self.post(payload('intro'), topic='ContentManagement.Entry.create'))
+        self.assertIn('index', INDEX_CACHE)
+
+    def test_rejects_invalid_secret(self):
+        self._assertStatusCode(401, self.post(payload('intro'), secret='wrong'))
+        self.assertIn('index', INDEX_CACHE)
+
+    def test_rejects_invalid_payload(self):
+        self._assertStatusCode(400, self.post({'sys': {}}))
+
+    def test_is_disabled_without_secret(self):
+        app.config['CONTENTFUL_WEBHOOK_SECRET'] = None
+
+        self.assertNotFound(self.post(payload('intro')))
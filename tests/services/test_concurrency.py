@@ -0,0 +1,94 @@
+import threading
+import time
+from functools import partial
+from unittest import TestCase
+
+from contentful.errors import EntryNotFoundError
+
+from services import concurrency
+from services.concurrency import concurrently, \
+                                 configure_concurrency, \
+                                 UpstreamTimeoutError, \
+                                 UPSTREAM_WORKERS
+
+
+class ConcurrentlyTest(TestCase):
+    def test_returns_results_in_call_order(self):
+        results = concurrently(
+            partial(time.sleep, 0.05),
+            lambda: 'foo',
+            lambda: 'bar'
+        )
+
+        self.assertEqual([None, 'foo', 'bar'], results)
+
+    def test_runs_calls_at_the_same_time(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        self.assertEqual([0, 1], sorted(concurrently(barrier.wait, barrier.wait)))
+
+    def test_reraises_call_errors(self):
+        def not_found():
+            raise EntryNotFoundError('errorMessage404Course')
+
+        with self.assertRaises(EntryNotFoundError):
+            concurrently(lambda: 'foo', not_found)
+
+    def test_raises_timeout_error_for_slow_calls(self):
+        with self.assertRaises(UpstreamTimeoutError):
+            concurrently(partial(time.sleep, 0.5), lambda: 'foo', timeout=0.05)
+
+    def test_nested_calls_run_inline(self):
+        def nested():
+            return concurrently(threading.get_ident, threading.get_ident)
+
+        outer, _ = concurrently(nested, lambda: None)
+
+        self.assertEqual(outer[0], outer[1])
+
+    def test_cached_calls_run_inline(self):
+        caller = threading.get_ident()
+
+        results = concurrently(
+            threading.get_ident,
+            threading.get_ident,
+            threading.get_ident,
+            cached=[True, False, False]
+        )
+
+        self.assertEqual(caller, results[0])
+        self.assertNotIn(caller, results[1:])
+
+    def test_single_uncached_call_runs_inline(self):
+        caller = threading.get_ident()
+
+        self.assertEqual(
+            [caller, caller],
+            concurrently(threading.get_ident, threading.get_ident, cached=[False, True])
+        )
+
+    def test_waiting_for_a_pool_thread_does_not_count_against_the_timeout(self):
+        configure_concurrency(max_workers=1)
+        try:
+            self.assertEqual(
+                [None, None],
+                concurrently(partial(time.sleep, 0.1), partial(time.sleep, 0.1), timeout=0.15)
+            )
+        finally:
+            configure_concurrency(max_workers=UPSTREAM_WORKERS)
+
+    def test_calls_run_inline_when_no_pool_thread_is_free(self):
+        released = threading.Event()
+        configure_concurrency(max_workers=1)
+        try:
+            # Keeps the only pool thread busy.
+            concurrency._executor.submit(released.wait, 5)
+            started_at = time.monotonic()
+
+            results = concurrently(lambda: 'foo', lambda: 'bar', timeout=0.05)
+        finally:
+            released.set()
+            configure_concurrency(max_workers=UPSTREAM_WORKERS)
+
+        self.assertEqual(['foo', 'bar'], results)
+        self.assertLess(time.monotonic() - started_at, 1)
@@ -0,0 +1,334 @@
+import threading
+from unittest import TestCase
+
+from contentful.errors import EntryNotFoundError, HTTPError
+
+from services.contentful import Contentful, \
+                                KeepAliveClient, \
+                                METADATA_CACHE, \
+                                INDEX_CACHE, \
+                                SERVICE_POOL, \
+                                CLIENT_POOL, \
+                                VALIDATION_CACHE, \
+                                MAX_IDS_PER_QUERY, \
+                                MAX_ENTRIES_PER_QUERY
+
+
+class MockEntry(object):
+    def __init__(self, entry_id, fields):
+        self.id = entry_id
+        self._fields = fields
+
+    def fields(self):
+        return self._fields
+
+
+LESSON = MockEntry('lesson', {'slug': 'content-model'})
+CATEGORY = MockEntry('category', {'slug': 'getting-started'})
+COLLECTIONS = {
+    'course': [
+        MockEntry('hello', {'slug': 'hello-contentful', 'lessons': [LESSON], 'categories': [CATEGORY]}),
+        MockEntry('other', {'slug': 'other'})
+    ],
+    'category': [CATEGORY],
+    'layout': [MockEntry('home', {'slug': 'home'})]
+}
+
+
+class MockResponse(object):
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ''
+
+    def json(self):
+        return {}
+
+
+class MockClient(object):
+    def __init__(self, space_id, access_token, is_preview=False, host=None):
+        if access_token == 'invalid':
+            raise HTTPError(MockResponse(401))
+        self.space_id = space_id
+        self.is_preview = is_preview
+        self.calls = []
+
+    def space(self):
+        self.calls.append('space')
+        return 'space-{0}'.format(self.space_id)
+
+    def locales(self):
+        self.calls.append('locales')
+        return ['locales-{0}-{1}'.format(self.space_id, self.is_preview)]
+
+    def entries(self, query=None):
+        self.calls.append(query)
+        if 'content_type' in query:
+            return [
+                entry for entry in COLLECTIONS[query['content_type']]
+                if query.get('fields.slug', entry.fields()['slug']) == entry.fields()['slug']
+            ]
+        return query.get('sys.id[in]', '').split(',')
+
+
+class MockPage(list):
+    def __init__(self, items, total):
+        super(MockPage, self).__init__(items)
+        self.total = total
+
+
+class PagedMockClient(MockClient):
+    """Serves a collection larger than a page, like the API."""
+
+    def entries(self, query=None):
+        self.calls.append(query)
+        collection = [
+            MockEntry('{0}-{1}'.format(query['content_type'], i), {'slug': 'slug-{0}'.format(i)})
+            for i in range(MAX_ENTRIES_PER_QUERY + 1)
+        ]
+        skip = query.get('skip', 0)
+        return MockPage(collection[skip:skip + query['limit']], len(collection))
+
+
+class MockContentful(Contentful):
+    built = 0
+    clients_built = 0
+
+    @classmethod
+    def create_client(klass, space_id, access_token, is_preview=False, host=None):
+        MockContentful.clients_built += 1
+        return MockClient(space_id, access_token, is_preview, host)
+
+    def __init__(self, *args, **kwargs):
+        MockContentful.built += 1
+        super(MockContentful, self).__init__(*args, **kwargs)
+
+
+class ContentfulTest(TestCase):
+    def setUp(self):
+        METADATA_CACHE.clear()
+        INDEX_CACHE.clear()
+        SERVICE_POOL.clear()
+        CLIENT_POOL.clear()
+        VALIDATION_CACHE.clear()
+        MockContentful.built = 0
+        MockContentful.clients_built = 0
+
+    def tearDown(self):
+        METADATA_CACHE.clear()
+        INDEX_CACHE.clear()
+        SERVICE_POOL.clear()
+        CLIENT_POOL.clear()
+        VALIDATION_CACHE.clear()
+        MockContentful.configure_validation_cache(error_ttl=30)
+
+    # locales
+    def test_locales_are_fetched_once_per_space_and_api(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        service.locales('cda')
+        service.locales('cda')
+        service.locales('cpa')
+
+        self.assertEqual(['locales'], service.delivery_client.calls)
+        self.assertEqual(['locales'], service.preview_client.calls)
+
+    def test_locales_are_shared_across_service_instances(self):
+        MockContentful('space', 'delivery', 'preview').locales('cda')
+        service = MockContentful('space', 'other-delivery', 'other-preview')
+
+        self.assertEqual(['locales-space-False'], service.locales('cda'))
+        self.assertEqual([], service.delivery_client.calls)
+
+    def test_locales_are_not_shared_across_spaces(self):
+        MockContentful('space', 'delivery', 'preview').locales('cda')
+        service = MockContentful('other', 'delivery', 'preview')
+
+        self.assertEqual(['locales-other-False'], service.locales('cda'))
+
+    # space
+    def test_space_is_cached(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        self.assertEqual('space-space', service.space('cda'))
+        self.assertEqual('space-space', service.space('cda'))
+        self.assertEqual(['space'], service.delivery_client.calls)
+
+    # indexes
+    def test_slug_lookups_share_a_single_collection_query(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        course = service.course('hello-contentful', 'cda', 'en-US')
+        self.assertEqual('other', service.course('other', 'cda', 'en-US').id)
+        self.assertEqual(2, len(service.courses('cda', 'en-US')))
+        self.assertIs(LESSON, service.lesson(course, 'content-model', 'cda', 'en-US'))
+        self.assertEqual([course], service.courses_by_category('category', 'cda', 'en-US'))
+
+        self.assertEqual(1, len(service.delivery_client.calls))
+        self.assertNotIn('fields.slug', service.delivery_client.calls[0])
+
+    def test_indexes_are_kept_per_locale_and_api(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        service.categories('cda', 'en-US')
+        service.categories('cda', 'de-DE')
+        service.categories('cpa', 'en-US')
+
+        self.assertEqual(2, len(service.delivery_client.calls))
+        self.assertEqual(1, len(service.preview_client.calls))
+
+    def test_indexes_page_through_large_collections(self):
+        service = MockContentful('space', 'delivery', 'preview')
+        service.delivery_client = PagedMockClient('space', 'delivery')
+        last = 'slug-{0}'.format(MAX_ENTRIES_PER_QUERY)
+
+        self.assertEqual(MAX_ENTRIES_PER_QUERY + 1, len(service.courses('cda', 'en-US')))
+        self.assertEqual(last, service.course(last, 'cda', 'en-US').fields()['slug'])
+        self.assertEqual(last, service.category(last, 'cda', 'en-US').fields()['slug'])
+        self.assertEqual(
+            [0, MAX_ENTRIES_PER_QUERY] * 2,
+            [query['skip'] for query in service.delivery_client.calls]
+        )
+
+    def test_unknown_slugs_raise_not_found(self):
+        service = MockContentful('space', 'delivery', 'preview')
+        course = service.course('hello-contentful', 'cda', 'en-US')
+
+        with self.assertRaises(EntryNotFoundError):
+            service.course('foobar', 'cda', 'en-US')
+        with self.assertRaises(EntryNotFoundError):
+            service.category('foobar', 'cda', 'en-US')
+        with self.assertRaises(EntryNotFoundError):
+            service.lesson(course, 'foobar', 'cda', 'en-US')
+        with self.assertRaises(EntryNotFoundError):
+            service.landing_page('foobar', 'cda', 'en-US')
+
+    def test_landing_pages_are_cached_by_slug(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        self.assertEqual('home', service.landing_page('home', 'cda', 'en-US').id)
+        self.assertEqual('home', service.landing_page('home', 'cda', 'en-US').id)
+        self.assertEqual(1, len(service.delivery_client.calls))
+
+    # entries_by_id
+    def test_invalidate_drops_indexes_by_content_type(self):
+        service = MockContentful('foo', 'delivery', 'preview')
+        service.course('hello-contentful', 'cda', 'en-US')
+        service.category('getting-started', 'cda', 'en-US')
+
+        self.assertEqual(1, Contentful.invalidate('foo', content_type_ids=['course']))
+        self.assertEqual(0, Contentful.invalidate('bar', content_type_ids=['category']))
+        service.course('hello-contentful', 'cda', 'en-US')
+
+        course_queries = [
+            q for q in service.delivery_client.calls
+            if isinstance(q, dict) and q.get('content_type', None) == 'course'
+        ]
+        self.assertEqual(2, len(course_queries))
+
+    def test_invalidate_only_drops_indexes_of_the_given_apis(self):
+        service = MockContentful('foo', 'delivery', 'preview')
+        service.course('hello-contentful', 'cda', 'en-US')
+        service.course('hello-contentful', 'cpa', 'en-US')
+
+        self.assertEqual(1, Contentful.invalidate('foo', content_type_ids=['course'], api_ids=['cpa']))
+        service.course('hello-contentful', 'cda', 'en-US')
+        service.course('hello-contentful', 'cpa', 'en-US')
+
+        self.assertEqual(1, len(service.delivery_client.calls))
+        self.assertEqual(2, len(service.preview_client.calls))
+
+    def test_entries_by_id_uses_a_single_query(self):
+        service = MockContentful('space', 'delivery', 'preview')
+
+        self.assertEqual(['a', 'b'], service.entries_by_id(['a', 'b'], 'cda'))
+        self.assertEqual(
+            [{'sys.id[in]': 'a,b', 'include': 6, 'limit': 2}],
+            service.delivery_client.calls
+        )
+
+    def test_entries_by_id_batches_large_id_lists(self):
+        service = MockContentful('space', 'delivery', 'preview')
+        entry_ids = [str(i) for i in range(MAX_IDS_PER_QUERY + 1)]
+
+        self.assertEqual(entry_ids, service.entries_by_id(entry_ids, 'cpa'))
+        self.assertEqual(2, len(service.preview_client.calls))
+
+    # instance
+    def test_instance_reuses_services_for_alternating_credentials(self):
+        default = MockContentful.instance('space', 'delivery', 'preview')
+        custom = MockContentful.instance('other', 'delivery', 'preview')
+
+        self.assertIs(default, MockContentful.instance('space', 'delivery', 'preview'))
+        self.assertIs(custom, MockContentful.instance('other', 'delivery', 'preview'))
+        self.assertEqual(2, MockContentful.built)
+        self.assertEqual(2, MockContentful.pool_stats()['hits'])
+
+    def test_instance_is_keyed_by_host(self):
+        MockContentful.instance('space', 'delivery', 'preview')
+        MockContentful.instance('space', 'delivery', 'preview', 'other-host')
+
+        self.assertEqual(2, MockContentful.built)
+
+    def test_instance_is_only_built_once_under_concurrency(self):
+        threads = [
+            threading.Thread(
+                target=MockContentful.instance,
+                args=('space', 'delivery', 'preview')
+            ) for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, MockContentful.built)
+
+    # validate
+    def test_validate_reuses_the_clients_of_pooled_services(self):
+        service = MockContentful.instance('space', 'delivery', 'preview')
+
+        self.assertIsNone(MockContentful.validate('space', 'delivery'))
+        self.assertIsNone(MockContentful.validate('space', 'preview', True))
+        self.assertEqual(2, MockContentful.clients_built)
+        self.assertEqual(['space'], service.delivery_client.calls)
+
+    def test_validated_clients_are_reused_by_services(self):
+        MockContentful.validate('space', 'delivery')
+        MockContentful.validate('space', 'preview', True)
+        MockContentful.instance('space', 'delivery', 'preview')
+
+        self.assertEqual(2, MockContentful.clients_built)
+
+    def test_validate_caches_valid_credentials(self):
+        service = MockContentful.instance('space', 'delivery', 'preview')
+        for _ in range(3):
+            MockContentful.validate('space', 'delivery')
+
+        self.assertEqual(['space'], service.delivery_client.calls)
+
+    def test_validate_caches_failures_for_a_shorter_time(self):
+        MockContentful.configure_validation_cache(error_ttl=0)
+
+        self.assertEqual(401, MockContentful.validate('space', 'invalid'))
+        self.assertEqual(401, MockContentful.validate('space', 'invalid'))
+        self.assertEqual(2, MockContentful.clients_built)
+
+    def test_validate_keys_results_by_credentials(self):
+        self.assertIsNone(MockContentful.validate('space', 'delivery'))
+        self.assertEqual(401, MockContentful.validate('space', 'invalid'))
+        self.assertIsNone(MockContentful.validate('space', 'delivery', True))
+        self.assertIsNone(MockContentful.validate('space', 'delivery', False, 'other-host'))
+        self.assertEqual(4, MockContentful.clients_built)
+        self.assertEqual(3, len(CLIENT_POOL))
+
+    # create_client
+    def test_clients_keep_alive_a_connection_per_request_thread(self):
+        client = KeepAliveClient(
+            'space',
+            'token',
+            connections=50,
+            content_type_cache=False
+        )
+        adapter = client.http_session.get_adapter('https://cdn.contentful.com')
+
+        self.assertEqual(50, adapter._pool_maxsize)
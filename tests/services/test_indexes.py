@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from services.indexes import EntryIndex, CourseIndex
+
+
+class MockLink(object):
+    def __init__(self, entry_id):
+        self.id = entry_id
+
+
+class MockEntry(MockLink):
+    def __init__(self, entry_id, **fields):
+        super(MockEntry, self).__init__(entry_id)
+        self._fields = fields
+
+    def fields(self):
+        return self._fields
+
+
+class EntryIndexTest(TestCase):
+    def test_indexes_entries_by_slug_and_id(self):
+        entry = MockEntry('a', slug='foo')
+        index = EntryIndex([entry, MockEntry('b')])
+
+        self.assertIs(entry, index.by_slug['foo'])
+        self.assertIs(entry, index.by_id['a'])
+        self.assertIn('b', index.by_id)
+        self.assertEqual(['foo'], list(index.by_slug))
+
+    def test_keeps_first_entry_for_duplicated_slugs(self):
+        first = MockEntry('a', slug='foo')
+        index = EntryIndex([first, MockEntry('b', slug='foo')])
+
+        self.assertIs(first, index.by_slug['foo'])
+
+
+class CourseIndexTest(TestCase):
+    def test_indexes_courses_by_category(self):
+        course = MockEntry('course', slug='hello', categories=[MockLink('category')])
+        index = CourseIndex([course, MockEntry('other', slug='other')])
+
+        self.assertEqual([course], index.by_category['category'])
+
+    def test_indexes_resolved_lessons_by_course_and_slug(self):
+        lesson = MockEntry('lesson', slug='intro')
+        index = CourseIndex([
+            MockEntry('course', slug='hello', lessons=[lesson, MockLink('unresolved')])
+        ])
+
+        self.assertEqual({('course', 'intro'): lesson}, index.lessons)
@@ -0,0 +1,197 @@
+from unittest import TestCase
+from contentful.errors import EntryNotFoundError
+
+from services.contentful import Contentful, INDEX_CACHE, SERVICE_POOL, CLIENT_POOL, REVISION_INDEX, resource_ids
+from services.mirror import ContentMirror
+from benchmarks.standin import StandInServer, link, raw_entry, raw_locales, sync_page
+
+
+def course(entry_id, slug, title, lessons, categories, created_at):
+    return raw_entry(entry_id, 'course', {
+        'slug': {'en-US': slug},
+        'title': {'en-US': title, 'de-DE': '{0} (de)'.format(title)},
+        'lessons': {'en-US': [link(lesson) for lesson in lessons]},
+        'categories': {'en-US': [link(category) for category in categories]}
+    }, created_at=created_at)
+
+
+def lesson(entry_id, slug):
+    return raw_entry(entry_id, 'lesson', {
+        'slug': {'en-US': slug},
+        'title': {'en-US': slug.capitalize()}
+    })
+
+
+class ContentMirrorTest(TestCase):
+    def setUp(self):
+        self.standin = StandInServer().start()
+        self.standin.respond(
+            '/environments/master/locales',
+            raw_locales(('en-US', None), ('de-DE', 'en-US'))
+        )
+        self.standin.respond('/sync', sync_page(self.standin, [
+            course('hello', 'hello-contentful', 'Hello', ['intro', 'draft'], ['basics'], '2017-12-14T00:00:00.000Z'),
+            course('advanced', 'advanced', 'Advanced', ['intro'], [], '2017-12-15T00:00:00.000Z'),
+            lesson('intro', 'intro'),
+            raw_entry('basics', 'category', {'slug': {'en-US': 'basics'}})
+        ], 'second-page', next_page=True), {'initial': 'true'})
+        self.standin.respond('/sync', sync_page(self.standin, [
+            lesson('other', 'other')
+        ], 'first-delta'), {'sync_token': 'second-page'})
+
+        self.mirror = ContentMirror(self.standin.client())
+        self.mirror.sync()
+
+    def tearDown(self):
+        self.mirror.stop()
+        self.standin.stop()
+
+    # sync
+    def test_initial_sync_follows_all_pages(self):
+        self.assertEqual('first-delta', self.mirror.sync_token)
+        self.assertEqual(1, len(self.mirror.entries({'content_type': 'lesson', 'fields.slug': 'other'})))
+
+    def test_delta_sync_applies_changes_and_deletions(self):
+        self.standin.respond('/sync', sync_page(self.standin, [
+            lesson('intro', 'introduction'),
+            {'sys': {'id': 'advanced', 'type': 'DeletedEntry'}}
+        ], 'second-delta'), {'sync_token': 'first-delta'})
+
+        self.mirror.sync()
+
+        self.assertEqual('second-delta', self.mirror.sync_token)
+        self.assertEqual(['hello'], [c.id for c in self.mirror.entries({'content_type': 'course'})])
+        self.assertEqual('introduction', self.mirror.entry('intro').slug)
+
+    def test_failed_sync_keeps_the_synced_content(self):
+        with self.assertRaises(Exception):
+            self.mirror.sync()
+
+        self.assertEqual(2, len(self.mirror.entries({'content_type': 'course'})))
+
+    # entries
+    def test_syncs_on_next_use_once_marked_changed(self):
+        self.standin.respond('/sync', sync_page(self.standin, [
+            lesson('intro', 'introduction')
+        ], 'second-delta'), {'sync_token': 'first-delta'})
+
+        self.mirror.ensure_synced()
+        self.assertEqual('first-delta', self.mirror.sync_token)
+
+        self.mirror.mark_changed()
+        self.mirror.ensure_synced()
+        self.assertEqual('introduction', self.mirror.entry('intro').slug)
+
+    def test_failed_sync_once_marked_changed_keeps_the_synced_content(self):
+        self.mirror.mark_changed()
+        self.mirror.ensure_synced()
+
+        self.assertIsNotNone(self.mirror.last_error)
+        self.assertEqual(2, len(self.mirror.entries({'content_type': 'course'})))
+
+    def test_filters_and_orders_entries(self):
+        courses = self.mirror.entries({
+            'content_type': 'course',
+            'order': '-sys.createdAt',
+            'include': 6
+        })
+
+        self.assertEqual(['advanced', 'hello'], [c.id for c in courses])
+
+    def test_filters_by_field_and_linked_ids(self):
+        by_slug = self.mirror.entries({'content_type': 'course', 'fields.slug': 'hello-contentful'})
+        by_category = self.mirror.entries({'content_type': 'course', 'fields.categories.sys.id': 'basics'})
+        by_ids = self.mirror.entries({'sys.id[in]': 'hello,intro'})
+
+        self.assertEqual(['hello'], [c.id for c in by_slug])
+        self.assertEqual(['hello'], [c.id for c in by_category])
+        self.assertEqual(set(['hello', 'intro']), set(e.id for e in by_ids))
+
+    def test_resolves_links_and_drops_missing_ones(self):
+        hello = self.mirror.entries({'fields.slug': 'hello-contentful', 'include': 6})[0]
+
+        self.assertEqual(['intro'], [l.id for l in hello.lessons])
+        self.assertEqual('Intro', hello.lessons[0].title)
+
+    def test_localizes_fields_with_fallbacks(self):
+        hello = self.mirror.entries({'fields.slug': 'hello-contentful', 'locale': 'de-DE'})[0]
+
+        self.assertEqual('Hello (de)', hello.title)
+        self.assertEqual('hello-contentful', hello.slug)
+
+    def test_paginates(self):
+        courses = self.mirror.entries({'content_type': 'course', 'order': 'sys.createdAt', 'skip': 1, 'limit': 1})
+
+        self.assertEqual(['advanced'], [c.id for c in courses])
+        self.assertEqual(2, courses.total)
+
+    # resource_ids
+    def test_resource_ids_include_linked_and_unresolved_entries(self):
+        courses = self.mirror.entries({'fields.slug': 'hello-contentful', 'include': 6})
+
+        self.assertEqual(set(['hello', 'intro', 'draft', 'basics']), resource_ids(courses))
+
+    # entry
+    def test_entry_raises_when_not_found(self):
+        with self.assertRaises(EntryNotFoundError):
+            self.mirror.entry('foobar')
+
+
+class MirroredContentful(Contentful):
+    standin = None
+
+    @classmethod
+    def create_client(klass, space_id, access_token, is_preview=False, host=None):
+        return klass.standin.client(access_token)
+
+
+class MirroredContentfulTest(TestCase):
+    def setUp(self):
+        self.standin = StandInServer().start()
+        self.standin.respond(
+            '/environments/master/locales',
+            raw_locales(('en-US', None))
+        )
+        self.standin.respond('/sync', sync_page(self.standin, [
+            course('hello', 'hello-contentful', 'Hello', ['intro'], [], '2017-12-14T00:00:00.000Z'),
+            lesson('intro', 'intro')
+        ], 'delta'), {'initial': 'true'})
+
+        MirroredContentful.standin = self.standin
+        MirroredContentful.configure_mirror(enabled=True, sync_interval=3600)
+        self.service = MirroredContentful.instance('standin', 'delivery', 'preview')
+
+    def tearDown(self):
+        for mirror in self.service.mirrors.values():
+            mirror.stop()
+        INDEX_CACHE.clear()
+        SERVICE_POOL.clear()
+        CLIENT_POOL.clear()
+        REVISION_INDEX.clear()
+        self.standin.stop()
+
+    def test_answers_queries_without_querying_entries(self):
+        self.assertEqual('Hello', self.service.course('hello-contentful', 'cda', 'en-US').title)
+        self.assertEqual(1, len(self.service.courses('cpa', 'en-US')))
+        self.assertEqual('hello', self.service.entry('hello', 'cda').id)
+
+        self.assertFalse(any(
+            path.endswith('/entries') for path, _query in self.standin.requests
+        ))
+
+    def test_mirror_configuration_is_per_service_class(self):
+        self.assertFalse(Contentful.mirror_enabled)
+
+    def test_invalidate_drops_indexes_linking_the_entry_and_syncs_on_next_query(self):
+        self.service.course('hello-contentful', 'cda', 'en-US')
+        self.standin.respond('/sync', sync_page(self.standin, [
+            lesson('intro', 'introduction')
+        ], 'second-delta'), {'sync_token': 'delta'})
+        syncs = len(self.standin.requests)
+
+        # The course index and the published revision of the lesson.
+        self.assertEqual(2, Contentful.invalidate('standin', entity_ids=['intro']))
+        self.assertEqual(syncs, len(self.standin.requests))
+
+        course = self.service.course('hello-contentful', 'cda', 'en-US')
+        self.assertEqual('introduction', course.lessons[0].slug)
@@ -0,0 +1,127 @@
+from functools import partial
+from unittest import TestCase
+
+from contentful import Entry
+
+from lib.cache import invalidate_tags
+from services.contentful import Contentful, \
+                                REVISION_INDEX, \
+                                SERVICE_POOL, \
+                                CLIENT_POOL, \
+                                entity_tag
+from services.revisions import RevisionIndex, PublishedRevision
+from benchmarks.standin import raw_entry, link
+
+
+def delivery_entry(entry_id, revision=1, lessons=None, includes=None):
+    fields = {'slug': entry_id}
+    if lessons is not None:
+        fields['lessons'] = [link(lesson) for lesson in lessons]
+    return Entry(
+        raw_entry(entry_id, 'course', fields, revision=revision),
+        includes=includes or []
+    )
+
+
+class RevisionClient(object):
+    def __init__(self, entries):
+        self.entries_by_id = {entry.id: entry for entry in entries}
+        self.calls = []
+
+    def entries(self, query=None):
+        self.calls.append(query['sys.id[in]'])
+        return [
+            self.entries_by_id[entry_id]
+            for entry_id in query['sys.id[in]'].split(',')
+            if entry_id in self.entries_by_id
+        ]
+
+
+class RevisionContentful(Contentful):
+    delivery = None
+
+    @classmethod
+    def create_client(klass, space_id, access_token, is_preview=False, host=None):
+        return klass.delivery
+
+
+class RevisionIndexTest(TestCase):
+    def setUp(self):
+        self.index = RevisionIndex(tag_for=partial(entity_tag, api_id='cda'))
+
+    def test_indexes_delivered_entries_and_their_includes(self):
+        lesson = raw_entry('lesson', 'lesson', {'slug': 'lesson'}, revision=4)
+        self.index.record('space', None, [
+            delivery_entry('course', 2, lessons=['lesson'], includes=[lesson])
+        ])
+
+        revisions, missing = self.index.lookup('space', None, ['course', 'lesson', 'other'])
+
+        self.assertEqual(2, revisions['course'].revision)
+        self.assertEqual(4, revisions['lesson'].revision)
+        self.assertEqual(['other'], missing)
+
+    def test_keeps_unpublished_entries(self):
+        self.index.record_unpublished('space', None, ['draft'])
+
+        self.assertEqual(({'draft': None}, []), self.index.lookup('space', None, ['draft']))
+
+    def test_stale_responses_do_not_publish_unpublished_entries(self):
+        self.index.record_unpublished('space', None, ['course'])
+        self.index.record('space', None, delivery_entry('course', 3))
+
+        self.assertEqual(({'course': None}, []), self.index.lookup('space', None, ['course']))
+
+    def test_ignores_older_revisions(self):
+        self.index.record('space', None, delivery_entry('course', 3))
+        self.index.record('space', None, delivery_entry('course', 2))
+
+        self.assertEqual(3, self.index.lookup('space', None, ['course'])[0]['course'].revision)
+
+    def test_is_kept_per_space_and_host(self):
+        self.index.record('space', None, delivery_entry('course'))
+
+        self.assertEqual(['course'], self.index.lookup('other', None, ['course'])[1])
+        self.assertEqual(['course'], self.index.lookup('space', 'host', ['course'])[1])
+
+    def test_entries_are_dropped_by_tag(self):
+        self.index.record('space', None, [delivery_entry('course'), delivery_entry('other')])
+
+        invalidate_tags([entity_tag('space', 'course', 'cda')])
+
+        self.assertEqual(['course'], self.index.lookup('space', None, ['course', 'other'])[1])
+
+
+class PublishedRevisionsTest(TestCase):
+    def setUp(self):
+        RevisionContentful.delivery = RevisionClient([delivery_entry('hello', 2)])
+        self.service = RevisionContentful('space', 'delivery', 'preview')
+
+    def tearDown(self):
+        REVISION_INDEX.clear()
+        SERVICE_POOL.clear()
+        CLIENT_POOL.clear()
+
+    def test_only_queries_entries_missing_from_the_index(self):
+        REVISION_INDEX.record('space', None, delivery_entry('indexed'))
+
+        revisions = self.service.published_revisions(['indexed', 'hello', 'draft'])
+
+        self.assertEqual(['hello,draft'], RevisionContentful.delivery.calls)
+        self.assertEqual(1, revisions['indexed'].revision)
+        self.assertEqual(2, revisions['hello'].revision)
+        self.assertIsNone(revisions['draft'])
+
+    def test_later_lookups_are_answered_from_the_index(self):
+        self.service.published_revisions(['hello', 'draft'])
+        revisions = self.service.published_revisions(['hello', 'draft'])
+
+        self.assertEqual(1, len(RevisionContentful.delivery.calls))
+        self.assertEqual({'hello': PublishedRevision(2, revisions['hello'].updated_at), 'draft': None}, revisions)
+
+    def test_delivery_queries_feed_the_index(self):
+        self.service.entries_by_id(['hello'], 'cpa')
+        self.assertEqual(['hello'], REVISION_INDEX.lookup('space', None, ['hello'])[1])
+
+        self.service.entries_by_id(['hello'], 'cda')
+        self.assertEqual([], REVISION_INDEX.lookup('space', None, ['hello'])[1])
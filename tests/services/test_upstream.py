@@ -0,0 +1,126 @@
+from functools import partial
+from unittest import TestCase
+
+from flask import Flask
+
+from services.concurrency import concurrently
+from services.contentful import upstream_query_name
+from services.upstream import UpstreamRecorder, UpstreamBudget, UpstreamBudgetExceeded, \
+                              configure_upstream_budget, record_upstream_call, \
+                              set_current_recorder, parse_budgets, budget
+
+ENTRIES_URL = 'https://cdn.contentful.com/spaces/space/environments/master/entries'
+
+
+def query_entry(entry_id):
+    record_upstream_call(ENTRIES_URL, 'entries', {'sys.id': entry_id}, 'token')
+
+
+class UpstreamRecorderTest(TestCase):
+    def setUp(self):
+        self.recorder = UpstreamRecorder()
+
+    def test_detects_repeated_queries(self):
+        self.recorder.record(ENTRIES_URL, 'entries:course', {'content_type': 'course'}, 'token')
+        self.recorder.record(ENTRIES_URL, 'entries:course', {'content_type': 'course'}, 'token')
+        self.recorder.record(ENTRIES_URL, 'entries:course', {'content_type': 'course'}, 'other')
+
+        duplicates = self.recorder.duplicates()
+
+        self.assertEqual(1, len(duplicates))
+        self.assertEqual((('content_type', 'course'),), duplicates[0].query)
+
+    def test_does_not_keep_access_tokens(self):
+        self.recorder.record(ENTRIES_URL, 'entries', {'access_token': 'secret'}, 'secret')
+
+        self.assertNotIn('secret', repr(self.recorder.calls))
+
+    def test_detects_n_plus_one_queries(self):
+        for entry_id in ['first', 'second', 'third']:
+            self.recorder.record(ENTRIES_URL, 'entries', {'sys.id': entry_id}, 'token')
+
+        self.assertEqual(
+            [('cdn.contentful.com', 'entries', ('sys.id',))],
+            self.recorder.n_plus_one(threshold=3)
+        )
+
+    def test_pages_are_not_n_plus_one_queries(self):
+        for skip in [0, 100, 200]:
+            self.recorder.record(ENTRIES_URL, 'entries', {'skip': skip, 'limit': 100}, 'token')
+
+        self.assertEqual([], self.recorder.n_plus_one(threshold=3))
+
+
+class UpstreamBudgetTest(TestCase):
+    def test_reports_overruns_by_route(self):
+        checked = UpstreamBudget()
+        checked.default = 1
+        checked.routes = {'/courses': 2}
+        recorder = UpstreamRecorder()
+        recorder.record(ENTRIES_URL, 'entries:course', {'content_type': 'course'})
+        recorder.record(ENTRIES_URL, 'entries:category', {'content_type': 'category'})
+
+        self.assertEqual([], checked.problems('/courses', recorder))
+        self.assertEqual(
+            ['2 Contentful queries, the budget of / is 1'],
+            checked.problems('/', recorder)
+        )
+
+    def test_parse_budgets(self):
+        self.assertEqual({}, parse_budgets(''))
+        self.assertEqual({'/': 8, '/courses/<slug>': 6}, parse_budgets('/=8, /courses/<slug>=6'))
+
+    def test_query_names(self):
+        self.assertEqual('entries:course', upstream_query_name('/environments/master/entries', {'content_type': 'course'}))
+        self.assertEqual('locales', upstream_query_name('/environments/master/locales', {}))
+        self.assertEqual('space', upstream_query_name('', {}))
+
+
+class ConfigureUpstreamBudgetTest(TestCase):
+    def setUp(self):
+        # The budget is shared with the app the integration tests run.
+        self.previous_mode = budget.mode
+        self.app = Flask(__name__)
+        self.app.testing = True
+
+        @self.app.route('/courses')
+        def courses():
+            for entry_id in ['first', 'second', 'third']:
+                query_entry(entry_id)
+            return 'courses'
+
+        @self.app.route('/concurrent')
+        def concurrent():
+            concurrently(partial(query_entry, 'first'), partial(query_entry, 'first'))
+            return 'concurrent'
+
+    def tearDown(self):
+        budget.mode = self.previous_mode
+        set_current_recorder(None)
+
+    def test_warns_on_n_plus_one_queries(self):
+        configure_upstream_budget(self.app, 'warn')
+
+        with self.assertLogs('services.upstream', 'WARNING') as logs:
+            response = self.app.test_client().get('/courses')
+
+        self.assertEqual(200, response.status_code)
+        self.assertIn('N+1 queries of entries', logs.output[0])
+
+    def test_raises_on_repeated_queries_from_upstream_workers(self):
+        configure_upstream_budget(self.app, 'raise')
+
+        with self.assertRaises(UpstreamBudgetExceeded) as raised:
+            self.app.test_client().get('/concurrent')
+
+        self.assertIn('repeated query', raised.exception.message)
+
+    def test_registers_nothing_when_disabled(self):
+        configure_upstream_budget(self.app, 'disabled')
+
+        self.assertEqual({}, self.app.before_request_funcs)
+        self.assertEqual('disabled', budget.mode)
+
+    def test_rejects_unknown_modes(self):
+        with self.assertRaises(ValueError):
+            configure_upstream_budget(self.app, 'fail')
@@ -48,3 +48,9 @@ class AppTest(IntegrationTestBase):
 
         # Doesn't add additional parameters
         self.assertNotIn(b'/courses?api=cpa&amp;locale=en-US&amp;', response)
+
+    def test_static_files_set_no_session_cookie(self):
+        response = self.app.get('/favicon.ico')
+
+        self.assertSuccess(response)
+        self.assertNotIn('Set-Cookie', response.headers)
@@ -0,0 +1,72 @@
+import importlib
+import os
+from unittest import TestCase, mock
+
+from flask import Flask
+from gunicorn.config import Config
+
+import gunicorn_config
+
+
+class GunicornConfigTest(TestCase):
+    def tearDown(self):
+        importlib.reload(gunicorn_config)
+
+    def load(self, **environ):
+        with mock.patch.dict(os.environ, environ):
+            return importlib.reload(gunicorn_config)
+
+    def test_defaults_to_threaded_workers(self):
+        with mock.patch.dict(os.environ):
+            for name in ['WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_WORKER_CLASS', 'PORT']:
+                os.environ.pop(name, None)
+            config = importlib.reload(gunicorn_config)
+
+        self.assertEqual('gthread', config.worker_class)
+        self.assertEqual(2, config.workers)
+        self.assertEqual(100, config.threads)
+        self.assertEqual('0.0.0.0:3000', config.bind)
+
+    def test_reads_the_environment(self):
+        config = self.load(
+            WEB_CONCURRENCY='4',
+            GUNICORN_THREADS='50',
+            GUNICORN_TIMEOUT='60',
+            PORT='8000'
+        )
+
+        self.assertEqual(4, config.workers)
+        self.assertEqual(50, config.threads)
+        self.assertEqual(60, config.timeout)
+        self.assertEqual('0.0.0.0:8000', config.bind)
+
+    def test_settings_are_valid_for_gunicorn(self):
+        config = self.load(WEB_CONCURRENCY='3', GUNICORN_THREADS='20')
+        settings = Config()
+        for name in ['bind', 'workers', 'worker_class', 'threads', 'timeout', 'keepalive', 'preload_app']:
+            settings.set(name, getattr(config, name))
+
+        self.assertEqual(3, settings.workers)
+        self.assertEqual(20, settings.threads)
+        self.assertEqual('ThreadWorker', settings.worker_class.__name__)
+
+    def test_workers_load_templates_and_warm_up_before_serving_requests(self):
+        app = Flask(__name__)
+        worker = mock.Mock(wsgi=app)
+        config = self.load(WARMUP='enabled')
+
+        with mock.patch('lib.templates.load_templates') as load_templates, \
+                mock.patch('lib.warmup.start_warmup') as start_warmup:
+            config.post_worker_init(worker)
+
+        load_templates.assert_called_once_with(app)
+        start_warmup.assert_called_once_with(app)
+
+    def test_warm_up_can_be_disabled(self):
+        config = self.load(WARMUP='disabled')
+
+        with mock.patch('lib.templates.load_templates'), \
+                mock.patch('lib.warmup.start_warmup') as start_warmup:
+            config.post_worker_init(mock.Mock(wsgi=Flask(__name__)))
+
+        start_warmup.assert_not_called()
@@ -1,3 +1,38 @@
+"""Warms up a running app by requesting every page once.
+
+Usage:
+
+    $ python warmup.py [base_url]
+"""
+
+import os
+import sys
+import urllib.error
 import urllib.request
-s = urllib.request.urlopen("http://localhost:3000").read()
-print(s)
+
+from dotenv import load_dotenv
+
+from lib.warmup import default_service, warmup_paths
+
+
+DEFAULT_BASE_URL = 'http://localhost:3000'
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+
+
+def request(url):
+    try:
+        return urllib.request.urlopen(url).status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+if __name__ == '__main__':
+    base_url = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_BASE_URL
+    failed = 0
+    for path in warmup_paths(default_service()):
+        status = request(base_url.rstrip('/') + path)
+        print('{0} {1}'.format(status, path))
+        if status >= 500:
+            failed += 1
+    sys.exit(1 if failed else 0)